@@ -7,7 +7,8 @@ import YianaExtraction
 /// across documents.
 ///
 /// Not synced via iCloud (SQLite doesn't survive iCloud sync).
-/// Rebuildable from `.addresses/*.json` at any time via `ingestAll()`.
+/// Rebuildable from `.addresses/*.json` at any time via `ingestAll()`,
+/// and rebuilt automatically when opened empty.
 final class EntityDatabaseService {
     static let shared = EntityDatabaseService()
 
@@ -49,6 +50,27 @@ final class EntityDatabaseService {
             logger.error("Failed to initialise entity database: \(error)")
             database = nil
         }
+        rebuildIfEmpty()
+    }
+
+    /// Backfill an empty database from `.addresses/` in the background.
+    ///
+    /// A fresh install and a schema migration that clears the derived
+    /// tables both leave it empty, and per-document ingestion alone would
+    /// only refill it as each document happens to be reopened.
+    private func rebuildIfEmpty() {
+        guard let db = database, let dirURL = addressesDirectoryURL,
+              let stats = try? db.statistics(), stats.documentCount == 0 else { return }
+
+        let logger = self.logger
+        Task.detached(priority: .utility) {
+            do {
+                let result = try db.ingestChanges(inDirectory: dirURL)
+                logger.info("Rebuilt entity database: \(result.ingested) ingested, \(result.failures.count) failed")
+            } catch {
+                logger.error("Entity database rebuild failed: \(error)")
+            }
+        }
     }
 
     /// Ingest a single document's address file. Idempotent via content hash.
@@ -28,7 +28,10 @@ let package = Package(
         ),
         .testTarget(
             name: "YianaExtractionTests",
-            dependencies: ["YianaExtraction"],
+            dependencies: [
+                "YianaExtraction",
+                .product(name: "GRDB", package: "GRDB.swift"),
+            ],
             resources: [
                 .copy("Fixtures"),
             ]
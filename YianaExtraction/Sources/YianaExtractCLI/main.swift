@@ -19,7 +19,7 @@ struct OCRPage: Codable {
 func runIngestAll() throws {
     let args = CommandLine.arguments
     guard let idx = args.firstIndex(of: "--ingest-all"), idx + 1 < args.count else {
-        FileHandle.standardError.write("Usage: --ingest-all <addresses-directory> [--entity-db <path>]\n".data(using: .utf8)!)
+        FileHandle.standardError.write("Usage: --ingest-all <addresses-directory> [--entity-db <path>] [--incremental] [--workers <n>]\n".data(using: .utf8)!)
         exit(1)
     }
     let dirPath = args[idx + 1]
@@ -29,26 +29,37 @@ func runIngestAll() throws {
         entityDbPath = args[dbIdx + 1]
     }
 
+    // Threads for parsing; writing is always single-threaded
+    var workers = ProcessInfo.processInfo.activeProcessorCount
+    if let wIdx = args.firstIndex(of: "--workers"), wIdx + 1 < args.count,
+       let n = Int(args[wIdx + 1]), n > 0 {
+        workers = n
+    }
+
+    let dirURL = URL(fileURLWithPath: dirPath)
+    if args.contains("--incremental") {
+        try runIngestChanges(dirURL: dirURL, entityDbPath: entityDbPath, workers: workers)
+        return
+    }
+
     // Remove existing DB for clean validation
     try? FileManager.default.removeItem(atPath: entityDbPath)
 
     let db = try EntityDatabase(path: entityDbPath)
-    let dirURL = URL(fileURLWithPath: dirPath)
     let files = try FileManager.default.contentsOfDirectory(
         at: dirURL, includingPropertiesForKeys: nil, options: []
-    ).filter { $0.pathExtension == "json" && !$0.lastPathComponent.contains(".overrides.") }
+    )
+    .filter { $0.pathExtension == "json" && !$0.lastPathComponent.contains(".overrides.") }
+    .sorted { $0.lastPathComponent < $1.lastPathComponent }
 
-    var ingested = 0
-    var failed = 0
-    for fileURL in files {
-        do {
-            try db.ingestAddressFile(at: fileURL)
-            ingested += 1
-        } catch {
-            FileHandle.standardError.write("Failed: \(fileURL.lastPathComponent): \(error)\n".data(using: .utf8)!)
-            failed += 1
-        }
+    // The DB was just deleted, so this is a full rebuild: use the bulk loader.
+    // Sorted input makes the result independent of directory listing order.
+    let result = try db.bulkIngestAddressFiles(at: files, workers: workers)
+    for failure in result.failures {
+        FileHandle.standardError.write("Failed: \(failure.url.lastPathComponent): \(failure.message)\n".data(using: .utf8)!)
     }
+    let ingested = result.ingested
+    let failed = result.failures.count
 
     let stats = try db.statistics()
     print("")
@@ -66,6 +77,179 @@ func runIngestAll() throws {
     print("  Entity DB written to: \(entityDbPath)")
 }
 
+/// `--ingest-all <dir> --incremental`: keep the existing DB and apply only
+/// what changed in the directory since the last run.
+func runIngestChanges(dirURL: URL, entityDbPath: String, workers: Int) throws {
+    let db = try EntityDatabase(path: entityDbPath)
+    let result = try db.ingestChanges(inDirectory: dirURL, workers: workers)
+    for failure in result.failures {
+        FileHandle.standardError.write("Failed: \(failure.url.lastPathComponent): \(failure.message)\n".data(using: .utf8)!)
+    }
+
+    let stats = try db.statistics()
+    print("")
+    print("Swift Entity Database Incremental Ingest")
+    print("=============================================")
+    print("  Unchanged:                    \(String(format: "%6d", result.unchanged))")
+    print("  Ingested (new or changed):    \(String(format: "%6d", result.ingested))")
+    print("  Touched (same content):       \(String(format: "%6d", result.touched))")
+    print("  Removed:                      \(String(format: "%6d", result.removed))")
+    print("  Failed:                       \(String(format: "%6d", result.failures.count))")
+    print("  Documents:                    \(String(format: "%6d", stats.documentCount))")
+    print("  Extractions:                  \(String(format: "%6d", stats.extractionCount))")
+    print("  Patients (deduplicated):      \(String(format: "%6d", stats.patientCount))")
+    print("  Practitioners:                \(String(format: "%6d", stats.practitionerCount))")
+    print("  Patient-Practitioner links:   \(String(format: "%6d", stats.linkCount))")
+    print("")
+    print("  Entity DB updated: \(entityDbPath)")
+}
+
+// MARK: - Duplicate Candidates Mode
+
+/// `--merge-candidates [--entity-db <path>] [--min-score <0..1>]`: list
+/// patient pairs in an existing entity DB that are probably the same person.
+func runMergeCandidates() throws {
+    let args = CommandLine.arguments
+    var entityDbPath = "/tmp/yiana_entities_validation.db"
+    if let dbIdx = args.firstIndex(of: "--entity-db"), dbIdx + 1 < args.count {
+        entityDbPath = args[dbIdx + 1]
+    }
+    var minScore = 0.85
+    if let idx = args.firstIndex(of: "--min-score"), idx + 1 < args.count,
+       let value = Double(args[idx + 1]) {
+        minScore = value
+    }
+
+    let db = try EntityDatabase(path: entityDbPath)
+    let candidates = try db.mergeCandidates(minScore: minScore)
+    for candidate in candidates {
+        let a = candidate.patient, b = candidate.other
+        print([
+            String(format: "%.3f", candidate.score),
+            "\(a.fullName) (\(a.dateOfBirth ?? "?"), \(a.documentCount) docs)",
+            "\(b.fullName) (\(b.dateOfBirth ?? "?"), \(b.documentCount) docs)",
+            "dob=\(candidate.dateOfBirthMatch.rawValue)",
+            candidate.sharedKeys.joined(separator: ","),
+        ].joined(separator: "\t"))
+    }
+    FileHandle.standardError.write("\(candidates.count) candidate pairs\n".data(using: .utf8)!)
+}
+
+// MARK: - Extraction
+
+/// Run the extraction cascade on one OCR file, enriching GP data from the NHS DB if available.
+func extract(_ ocrFile: OCRFile, documentId: String, cascade: ExtractionCascade,
+             lookup: NHSLookupService?) -> DocumentAddressFile {
+    // Build ExtractionInput per page
+    let inputs = ocrFile.pages.map { page in
+        ExtractionInput(
+            documentId: documentId,
+            pageNumber: page.pageNumber,
+            text: page.text,
+            confidence: page.confidence ?? 0.85
+        )
+    }
+
+    // Run extraction cascade
+    var result = cascade.extractDocument(documentId: documentId, pages: inputs)
+
+    // NHS lookup enrichment
+    if let lookup {
+        for i in result.pages.indices {
+            let page = result.pages[i]
+            guard let postcode = page.gp?.postcode ?? page.address?.postcode else {
+                continue
+            }
+            let candidates = try? lookup.lookupGP(
+                postcode: postcode,
+                nameHint: page.gp?.practice ?? page.gp?.name,
+                addressHint: page.gp?.address
+            )
+            if let candidates, !candidates.isEmpty {
+                if result.pages[i].gp == nil {
+                    result.pages[i].gp = GPInfo()
+                }
+                result.pages[i].gp?.nhsCandidates = candidates
+            }
+        }
+    }
+    return result
+}
+
+func openLookup(_ dbPath: String?) -> NHSLookupService? {
+    guard let dbPath else { return nil }
+    guard let service = try? NHSLookupService(databasePath: dbPath) else {
+        FileHandle.standardError.write("Warning: could not open NHS DB at \(dbPath)\n".data(using: .utf8)!)
+        return nil
+    }
+    return service
+}
+
+// MARK: - Batch Worker Mode
+
+/// One line of `--batch` input: extract the OCR file at `path`, or the
+/// inline `ocr` document (e.g. read from an OCR pack) when given.
+struct BatchRequest: Codable {
+    var id: Int
+    var path: String?
+    var ocr: OCRFile?
+    var documentId: String?
+}
+
+struct BatchRequestError: Error, CustomStringConvertible {
+    var description: String
+}
+
+/// One line of `--batch` output. Exactly one of `result` / `error` is set.
+struct BatchResponse: Codable {
+    var id: Int?
+    var result: DocumentAddressFile?
+    var error: String?
+}
+
+/// Long-lived worker: newline-delimited JSON requests on stdin, one JSON
+/// response line per request on stdout, in request order. The NHS DB and
+/// cascade are set up once for the life of the process.
+func runBatch(lookup: NHSLookupService?) {
+    let decoder = JSONDecoder()
+    let encoder = JSONEncoder()
+    encoder.outputFormatting = [.sortedKeys]
+    let cascade = ExtractionCascade()
+
+    while let line = readLine(strippingNewline: true) {
+        guard !line.isEmpty else { continue }
+        var response = BatchResponse()
+        do {
+            let request = try decoder.decode(BatchRequest.self, from: Data(line.utf8))
+            response.id = request.id
+            let ocrFile: OCRFile
+            if let inline = request.ocr {
+                ocrFile = inline
+            } else if let path = request.path {
+                let data = try Data(contentsOf: URL(fileURLWithPath: path))
+                ocrFile = try decoder.decode(OCRFile.self, from: data)
+            } else {
+                throw BatchRequestError(description: "request has neither path nor ocr")
+            }
+            response.result = extract(
+                ocrFile, documentId: request.documentId ?? ocrFile.documentId,
+                cascade: cascade, lookup: lookup)
+        } catch {
+            response.error = "\(error)"
+        }
+        var output: Data
+        if let encoded = try? encoder.encode(response) {
+            output = encoded
+        } else {
+            // An error-only response always encodes
+            output = try! encoder.encode(
+                BatchResponse(id: response.id, error: "could not encode result"))
+        }
+        output.append(0x0A)
+        FileHandle.standardOutput.write(output)
+    }
+}
+
 // MARK: - Main
 
 func run() throws {
@@ -86,6 +270,17 @@ func run() throws {
         return
     }
 
+    if args.contains("--merge-candidates") {
+        try runMergeCandidates()
+        return
+    }
+
+    // Check for batch worker mode
+    if args.contains("--batch") {
+        runBatch(lookup: openLookup(dbPath))
+        return
+    }
+
     // Read OCR JSON from stdin
     let inputData = FileHandle.standardInput.readDataToEndOfFile()
     guard !inputData.isEmpty else {
@@ -98,44 +293,8 @@ func run() throws {
     // Use --document-id override (filename stem) if provided, otherwise JSON field
     let documentId = documentIdOverride ?? ocrFile.documentId
 
-    // Build ExtractionInput per page
-    let inputs = ocrFile.pages.map { page in
-        ExtractionInput(
-            documentId: documentId,
-            pageNumber: page.pageNumber,
-            text: page.text,
-            confidence: page.confidence ?? 0.85
-        )
-    }
-
-    // Run extraction cascade
-    let cascade = ExtractionCascade()
-    var result = cascade.extractDocument(documentId: documentId, pages: inputs)
-
-    // NHS lookup enrichment
-    if let dbPath {
-        if let service = try? NHSLookupService(databasePath: dbPath) {
-            for i in result.pages.indices {
-                let page = result.pages[i]
-                guard let postcode = page.gp?.postcode ?? page.address?.postcode else {
-                    continue
-                }
-                let candidates = try? service.lookupGP(
-                    postcode: postcode,
-                    nameHint: page.gp?.practice ?? page.gp?.name,
-                    addressHint: page.gp?.address
-                )
-                if let candidates, !candidates.isEmpty {
-                    if result.pages[i].gp == nil {
-                        result.pages[i].gp = GPInfo()
-                    }
-                    result.pages[i].gp?.nhsCandidates = candidates
-                }
-            }
-        } else {
-            FileHandle.standardError.write("Warning: could not open NHS DB at \(dbPath)\n".data(using: .utf8)!)
-        }
-    }
+    let result = extract(ocrFile, documentId: documentId,
+                         cascade: ExtractionCascade(), lookup: openLookup(dbPath))
 
     // Encode and write to stdout
     let encoder = JSONEncoder()
@@ -16,11 +16,34 @@ struct DocumentRecord: Codable, FetchableRecord, PersistableRecord, Sendable {
     var ingestedAt: String?
     var updatedAt: String?
 
+    var sourceFile: String?
+    var sourceMtime: Double?
+    var sourceSize: Int64?
+    var overridesMtime: Double?
+    var overridesSize: Int64?
+
     enum CodingKeys: String, CodingKey {
         case id, documentId = "document_id", jsonHash = "json_hash"
         case schemaVersion = "schema_version", extractedAt = "extracted_at"
         case pageCount = "page_count", ingestedAt = "ingested_at"
         case updatedAt = "updated_at"
+        case sourceFile = "source_file", sourceMtime = "source_mtime"
+        case sourceSize = "source_size", overridesMtime = "overrides_mtime"
+        case overridesSize = "overrides_size"
+    }
+
+    var sourceStamp: SourceStamp? {
+        guard let sourceFile, let sourceMtime, let sourceSize else { return nil }
+        return SourceStamp(file: sourceFile, mtime: sourceMtime, size: sourceSize,
+                           overridesMtime: overridesMtime, overridesSize: overridesSize)
+    }
+
+    mutating func setSourceStamp(_ stamp: SourceStamp?) {
+        sourceFile = stamp?.file
+        sourceMtime = stamp?.mtime
+        sourceSize = stamp?.size
+        overridesMtime = stamp?.overridesMtime
+        overridesSize = stamp?.overridesSize
     }
 
     mutating func didInsert(_ inserted: InsertionSuccess) {
@@ -163,6 +186,39 @@ struct ExtractionRecord: Codable, FetchableRecord, PersistableRecord, Sendable {
     }
 }
 
+/// One document's contribution to an entity's `document_count`: how many
+/// times ingesting the document counted the patient, practitioner or
+/// patient-practitioner link. Kept so a changed or removed document can be
+/// retracted and only the entities it touched recounted.
+struct DocumentEntityRecord: Codable, FetchableRecord, PersistableRecord, Sendable {
+    static let databaseTableName = "document_entities"
+
+    static let patient = "patient"
+    static let practitioner = "practitioner"
+    static let link = "link"
+
+    var documentId: String
+    var entityType: String
+    var entityId: Int64
+    var occurrences: Int
+
+    enum CodingKeys: String, CodingKey {
+        case documentId = "document_id", entityType = "entity_type"
+        case entityId = "entity_id", occurrences
+    }
+}
+
+/// File name, modification time and size of an address file and its
+/// `.overrides.json` sidecar — enough to tell that neither has changed
+/// without reading them.
+struct SourceStamp: Equatable, Sendable {
+    var file: String
+    var mtime: Double
+    var size: Int64
+    var overridesMtime: Double?
+    var overridesSize: Int64?
+}
+
 struct PatientDocumentRecord: Codable, FetchableRecord, PersistableRecord, Sendable {
     static let databaseTableName = "patient_documents"
 
@@ -212,6 +268,42 @@ public struct EntityStatistics: Sendable {
     public let extractionCount: Int
 }
 
+/// A file that could not be ingested during a bulk load.
+public struct BulkIngestFailure: Sendable {
+    public let url: URL
+    public let message: String
+}
+
+/// Outcome of `EntityDatabase.bulkIngestAddressFiles(at:chunkSize:)`.
+public struct BulkIngestResult: Sendable {
+    public let ingested: Int
+    public let failures: [BulkIngestFailure]
+}
+
+/// Outcome of `EntityDatabase.ingestChanges(inDirectory:)`.
+public struct IncrementalIngestResult: Sendable {
+    /// Files whose name, mtime and size (and their overrides sidecar's) were unchanged
+    public let unchanged: Int
+    /// New or changed files that were (re-)ingested
+    public let ingested: Int
+    /// Files that were touched but whose content hash had not changed
+    public let touched: Int
+    /// Documents whose file has gone, retracted from the database
+    public let removed: Int
+    public let failures: [BulkIngestFailure]
+}
+
+/// Two patients that are probably the same person.
+public struct MergeCandidate: Sendable {
+    public let patient: PatientRecord
+    public let other: PatientRecord
+    /// Duplicate likelihood, 0…1
+    public let score: Double
+    /// Blocking keys the two patients share
+    public let sharedKeys: [String]
+    public let dateOfBirthMatch: PatientBlocking.DateOfBirthMatch
+}
+
 // MARK: - Entity Database
 
 /// Entity resolution database — a derived cache built from `.addresses/*.json` files.
@@ -224,15 +316,20 @@ public final class EntityDatabase: Sendable {
     private let dbQueue: DatabaseQueue
 
     /// Open or create an entity database at the given path.
+    ///
+    /// Recreates any of `deferredIndexes` that are missing, so a bulk load
+    /// that was killed before it finished repairs itself here.
     public init(path: String) throws {
         dbQueue = try DatabaseQueue(path: path)
         try migrator.migrate(dbQueue)
+        try dbQueue.writeWithoutTransaction { db in try Self.createDeferredIndexes(db) }
     }
 
     /// Create an in-memory entity database (for testing).
     public init() throws {
         dbQueue = try DatabaseQueue()
         try migrator.migrate(dbQueue)
+        try dbQueue.writeWithoutTransaction { db in try Self.createDeferredIndexes(db) }
     }
 
     /// Get statistics about the entity database.
@@ -251,12 +348,207 @@ public final class EntityDatabase: Sendable {
     // MARK: - Ingestion
 
     /// Ingest a .addresses/*.json file, resolving entities and creating links.
+    ///
+    /// Overrides in a `{documentId}.overrides.json` sidecar next to the file
+    /// take the place of the file's own, as in the app.
     public func ingestAddressFile(at url: URL) throws {
-        let data = try Data(contentsOf: url)
-        let hash = Self.contentHash(of: data)
-        let doc = try JSONDecoder().decode(DocumentAddressFile.self, from: data)
+        let loaded = try Self.loadAddressFile(at: url)
         try dbQueue.write { db in
-            try self.ingestDocument(db, doc: doc, hash: hash)
+            _ = try self.ingestDocument(db, loaded)
+        }
+    }
+
+    /// Bring the database up to date with an `.addresses` directory.
+    ///
+    /// Files whose name, mtime and size — and those of their overrides
+    /// sidecar — match what was recorded at the last ingest are skipped
+    /// without being read. Changed files are re-ingested: the old version's
+    /// extractions and links are retracted and `document_count` is
+    /// recomputed for just the patients, practitioners and links it touched.
+    /// Documents whose file has gone are retracted the same way. Cost is
+    /// proportional to the change, not the directory.
+    ///
+    /// The directory is taken to be the whole source of the database:
+    /// documents ingested from files not in it are removed. Changed files
+    /// are parsed on `workers` threads, as in `bulkIngestAddressFiles`.
+    public func ingestChanges(inDirectory dirURL: URL, chunkSize: Int = 500,
+                              workers: Int = ProcessInfo.processInfo.activeProcessorCount
+    ) throws -> IncrementalIngestResult {
+        let mainFiles = try FileManager.default.contentsOfDirectory(
+            at: dirURL, includingPropertiesForKeys: nil, options: []
+        )
+        .filter { $0.pathExtension == "json" && !$0.lastPathComponent.contains(".overrides.") }
+        .sorted { $0.lastPathComponent < $1.lastPathComponent }
+
+        let recorded = try dbQueue.read { db in
+            try DocumentRecord
+                .filter(Column("source_file") != nil)
+                .fetchAll(db)
+        }
+        var recordedByFile: [String: SourceStamp] = [:]
+        for record in recorded {
+            if let stamp = record.sourceStamp { recordedByFile[stamp.file] = stamp }
+        }
+
+        var changed: [URL] = []
+        var unchanged = 0
+        for url in mainFiles {
+            if let current = try? Self.sourceStamp(for: url),
+               recordedByFile[current.file] == current {
+                unchanged += 1
+            } else {
+                changed.append(url)
+            }
+        }
+
+        let present = Set(mainFiles.map(\.lastPathComponent))
+        let gone = recorded.filter { !present.contains($0.sourceFile ?? "") }
+        if !gone.isEmpty {
+            try dbQueue.write { db in
+                for record in gone {
+                    try self.removeDocument(db, documentId: record.documentId)
+                }
+            }
+        }
+
+        let result = try ingestInChunks(changed, chunkSize: chunkSize, workers: workers)
+        return IncrementalIngestResult(
+            unchanged: unchanged, ingested: result.ingested,
+            touched: result.touched, removed: gone.count,
+            failures: result.failures)
+    }
+
+    // MARK: - Bulk Load
+
+    /// Secondary indexes that no ingestion lookup reads. A bulk load drops
+    /// them and builds each once at the end instead of on every insert.
+    static let deferredIndexes: [(name: String, table: String, columns: [String])] = [
+        ("idx_patients_name", "patients", ["full_name"]),
+        ("idx_practitioners_ods", "practitioners", ["ods_code"]),
+        ("idx_extractions_patient", "extractions", ["patient_id"]),
+        ("idx_extractions_practitioner", "extractions", ["practitioner_id"]),
+        ("idx_patient_documents_patient", "patient_documents", ["patient_id"]),
+        ("idx_pp_practitioner", "patient_practitioners", ["practitioner_id"]),
+    ]
+
+    /// Create whichever of `deferredIndexes` do not exist. Cheap when
+    /// they all do.
+    private static func createDeferredIndexes(_ db: Database) throws {
+        for index in deferredIndexes {
+            try db.execute(sql: """
+                CREATE INDEX IF NOT EXISTS \(index.name) \
+                ON \(index.table)(\(index.columns.joined(separator: ", ")))
+                """)
+        }
+    }
+
+    /// Ingest many .addresses/*.json files, for full rebuilds.
+    ///
+    /// Resolves entities exactly as `ingestAddressFile(at:)` called once per
+    /// file in the same order, but commits `chunkSize` files per transaction,
+    /// loads with WAL and `synchronous = NORMAL`, and defers the indexes in
+    /// `deferredIndexes` to the end (or to the next open, if the process
+    /// dies first). Each file runs in its own savepoint, so
+    /// a file that fails is rolled back and reported without losing the rest
+    /// of its chunk. Journal mode and sync level are restored afterwards.
+    ///
+    /// Reading, decoding, hashing and name normalisation run on `workers`
+    /// threads, one chunk ahead of the writer; the writer stays single and
+    /// takes files in `urls` order, so the result is the same for any
+    /// worker count.
+    public func bulkIngestAddressFiles(
+        at urls: [URL], chunkSize: Int = 500,
+        workers: Int = ProcessInfo.processInfo.activeProcessorCount
+    ) throws -> BulkIngestResult {
+        let (journalMode, synchronous) = try dbQueue.read { db in
+            (try String.fetchOne(db, sql: "PRAGMA journal_mode") ?? "delete",
+             try Int.fetchOne(db, sql: "PRAGMA synchronous") ?? 2)
+        }
+        try dbQueue.writeWithoutTransaction { db in
+            try db.execute(sql: "PRAGMA journal_mode = WAL")
+            try db.execute(sql: "PRAGMA synchronous = NORMAL")
+            for index in Self.deferredIndexes {
+                try db.execute(sql: "DROP INDEX IF EXISTS \(index.name)")
+            }
+        }
+
+        let result: (ingested: Int, touched: Int, failures: [BulkIngestFailure])
+        do {
+            result = try ingestInChunks(urls, chunkSize: chunkSize, workers: workers)
+        } catch {
+            try? finishBulkLoad(journalMode: journalMode, synchronous: synchronous)
+            throw error
+        }
+        try finishBulkLoad(journalMode: journalMode, synchronous: synchronous)
+        return BulkIngestResult(ingested: result.ingested + result.touched,
+                                failures: result.failures)
+    }
+
+    /// Ingest files `chunkSize` per transaction, one savepoint per file.
+    /// Returns how many were ingested, how many had an unchanged content
+    /// hash, and the failures.
+    ///
+    /// Files are parsed on `workers` threads while the previous chunk is
+    /// written, so at most two chunks are held in memory. Writes happen
+    /// on this thread alone, in `urls` order.
+    private func ingestInChunks(
+        _ urls: [URL], chunkSize: Int, workers: Int
+    ) throws -> (ingested: Int, touched: Int, failures: [BulkIngestFailure]) {
+        var ingested = 0
+        var touched = 0
+        var failures: [BulkIngestFailure] = []
+        let step = max(1, chunkSize)
+        let chunks = stride(from: 0, to: urls.count, by: step).map {
+            Array(urls[$0..<min($0 + step, urls.count)])
+        }
+        guard !chunks.isEmpty else { return (0, 0, []) }
+
+        var pending = PendingLoad(chunks[0], workers: workers)
+        for (chunkIndex, chunkURLs) in chunks.enumerated() {
+            let results = pending.wait()
+            if chunkIndex + 1 < chunks.count {
+                pending = PendingLoad(chunks[chunkIndex + 1], workers: workers)
+            }
+
+            var documents: [(url: URL, loaded: LoadedAddressFile)] = []
+            for (url, result) in zip(chunkURLs, results) {
+                switch result {
+                case .success(let loaded):
+                    documents.append((url, loaded))
+                case .failure(let error):
+                    failures.append(BulkIngestFailure(url: url, message: "\(error)"))
+                }
+            }
+
+            let chunk: (Int, [BulkIngestFailure]) = try dbQueue.write { db in
+                var changed = 0
+                var chunkFailures: [BulkIngestFailure] = []
+                for (url, loaded) in documents {
+                    do {
+                        try db.inSavepoint {
+                            if try self.ingestDocument(db, loaded) {
+                                changed += 1
+                            }
+                            return .commit
+                        }
+                    } catch {
+                        chunkFailures.append(BulkIngestFailure(url: url, message: "\(error)"))
+                    }
+                }
+                return (changed, chunkFailures)
+            }
+            ingested += chunk.0
+            touched += documents.count - chunk.0 - chunk.1.count
+            failures += chunk.1
+        }
+        return (ingested, touched, failures)
+    }
+
+    private func finishBulkLoad(journalMode: String, synchronous: Int) throws {
+        try dbQueue.writeWithoutTransaction { db in
+            try Self.createDeferredIndexes(db)
+            try db.execute(sql: "PRAGMA synchronous = \(synchronous)")
+            try db.execute(sql: "PRAGMA journal_mode = \(journalMode)")
         }
     }
 
@@ -309,6 +601,86 @@ public final class EntityDatabase: Sendable {
         }
     }
 
+    // MARK: - Duplicate Candidates
+
+    /// Pairs of patients that are probably the same person: name variants,
+    /// DOB typos, or a shared MRN.
+    ///
+    /// Only patients that share a blocking key (see `PatientBlocking`) are
+    /// compared, so the cost follows the number of same-block pairs rather
+    /// than the square of the patient count. Blocks with more than
+    /// `maxBlockSize` patients (e.g. a postcode shared by a care home) carry
+    /// too little signal to be worth pairing and are skipped. Results are
+    /// ordered by descending score.
+    public func mergeCandidates(minScore: Double = 0.85,
+                                maxBlockSize: Int = 50) throws -> [MergeCandidate] {
+        try dbQueue.read { db in
+            let rows = try Row.fetchAll(db, sql: """
+                WITH usable AS (
+                    SELECT block_key FROM patient_blocks
+                    GROUP BY block_key HAVING COUNT(*) BETWEEN 2 AND ?)
+                SELECT a.patient_id AS a, b.patient_id AS b,
+                       group_concat(a.block_key, '|') AS keys
+                FROM usable
+                JOIN patient_blocks a ON a.block_key = usable.block_key
+                JOIN patient_blocks b ON b.block_key = usable.block_key
+                                     AND b.patient_id > a.patient_id
+                GROUP BY a.patient_id, b.patient_id
+                """, arguments: [maxBlockSize])
+            let pairs = rows.map { row -> (Int64, Int64, String) in
+                (row["a"], row["b"], row["keys"])
+            }
+            return try scoreCandidates(db, pairs: pairs, minScore: minScore)
+        }
+    }
+
+    /// Likely duplicates of one patient, found through indexed block lookups.
+    public func mergeCandidates(forPatient patientId: Int64,
+                                minScore: Double = 0.85) throws -> [MergeCandidate] {
+        try dbQueue.read { db in
+            let rows = try Row.fetchAll(db, sql: """
+                SELECT b.patient_id AS b, group_concat(a.block_key, '|') AS keys
+                FROM patient_blocks a
+                JOIN patient_blocks b ON b.block_key = a.block_key
+                                     AND b.patient_id != a.patient_id
+                WHERE a.patient_id = ?
+                GROUP BY b.patient_id
+                """, arguments: [patientId])
+            let pairs = rows.map { row -> (Int64, Int64, String) in
+                (patientId, row["b"], row["keys"])
+            }
+            return try scoreCandidates(db, pairs: pairs, minScore: minScore)
+        }
+    }
+
+    private func scoreCandidates(_ db: Database, pairs: [(Int64, Int64, String)],
+                                 minScore: Double) throws -> [MergeCandidate] {
+        let ids = Set(pairs.flatMap { [$0.0, $0.1] })
+        var patients: [Int64: PatientRecord] = [:]
+        for patient in try PatientRecord.fetchAll(db, keys: Array(ids)) {
+            if let id = patient.id { patients[id] = patient }
+        }
+
+        var candidates: [MergeCandidate] = []
+        for (a, b, keys) in pairs {
+            guard let patient = patients[a], let other = patients[b] else { continue }
+            let sharedKeys = keys.split(separator: "|").map(String.init).sorted()
+            let score = PatientBlocking.score(
+                nameA: patient.fullNameNormalized, dobA: patient.dateOfBirth,
+                nameB: other.fullNameNormalized, dobB: other.dateOfBirth,
+                sharesMRN: sharedKeys.contains { $0.hasPrefix("mrn:") })
+            guard score >= minScore else { continue }
+            candidates.append(MergeCandidate(
+                patient: patient, other: other, score: score, sharedKeys: sharedKeys,
+                dateOfBirthMatch: PatientBlocking.compareDatesOfBirth(
+                    patient.dateOfBirth, other.dateOfBirth)))
+        }
+        return candidates.sorted {
+            ($0.score, $1.patient.id ?? 0, $1.other.id ?? 0)
+                > ($1.score, $0.patient.id ?? 0, $0.other.id ?? 0)
+        }
+    }
+
     // MARK: - Search
 
     /// Search patients by name substring (case-insensitive) or DOB fragment.
@@ -351,8 +723,9 @@ public final class EntityDatabase: Sendable {
 
     // MARK: - Entity Resolution
 
-    func resolvePatient(_ db: Database, name: String, dob: String?) throws -> Int64? {
-        let normalized = ExtractionHelpers.normalizeName(name)
+    func resolvePatient(_ db: Database, name: String, dob: String?,
+                        normalized: String? = nil) throws -> Int64? {
+        let normalized = normalized ?? ExtractionHelpers.normalizeName(name)
         guard !normalized.isEmpty else { return nil }
         let now = Self.iso8601Now()
 
@@ -391,8 +764,9 @@ public final class EntityDatabase: Sendable {
     func resolvePractitioner(_ db: Database, name: String, type: String,
                              practiceName: String?, address: String?,
                              postcode: String?, odsCode: String?,
-                             officialName: String?) throws -> Int64? {
-        let normalized = ExtractionHelpers.normalizeName(name)
+                             officialName: String?,
+                             normalized: String? = nil) throws -> Int64? {
+        let normalized = normalized ?? ExtractionHelpers.normalizeName(name)
         guard !normalized.isEmpty else { return nil }
         let now = Self.iso8601Now()
 
@@ -421,9 +795,10 @@ public final class EntityDatabase: Sendable {
         return db.lastInsertedRowID
     }
 
+    @discardableResult
     func linkPatientPractitioner(_ db: Database, patientId: Int64,
                                  practitionerId: Int64,
-                                 relationshipType: String) throws {
+                                 relationshipType: String) throws -> Int64? {
         let now = Self.iso8601Now()
         if var existing = try PatientPractitionerRecord
             .filter(Column("patient_id") == patientId)
@@ -433,47 +808,127 @@ public final class EntityDatabase: Sendable {
             existing.documentCount += 1
             existing.lastSeenAt = now
             try existing.update(db)
-        } else {
-            let link = PatientPractitionerRecord(
-                id: nil, patientId: patientId, practitionerId: practitionerId,
-                relationshipType: relationshipType,
-                documentCount: 1, firstSeenAt: now, lastSeenAt: now
-            )
-            try link.insert(db)
+            return existing.id
+        }
+        let link = PatientPractitionerRecord(
+            id: nil, patientId: patientId, practitionerId: practitionerId,
+            relationshipType: relationshipType,
+            documentCount: 1, firstSeenAt: now, lastSeenAt: now
+        )
+        try link.insert(db)
+        return db.lastInsertedRowID
+    }
+
+    // MARK: - Retraction
+
+    /// Delete everything a document contributed — extractions, patient
+    /// links and counted entity occurrences — and return the entities
+    /// whose `document_count` must be recomputed.
+    private func retractDocument(_ db: Database,
+                                 documentId: String) throws -> [DocumentEntityRecord] {
+        let contributions = try DocumentEntityRecord
+            .filter(Column("document_id") == documentId).fetchAll(db)
+        try DocumentEntityRecord
+            .filter(Column("document_id") == documentId).deleteAll(db)
+        try ExtractionRecord
+            .filter(Column("document_id") == documentId).deleteAll(db)
+        try PatientDocumentRecord
+            .filter(Column("document_id") == documentId).deleteAll(db)
+        return contributions
+    }
+
+    /// Retract a document and delete its row.
+    private func removeDocument(_ db: Database, documentId: String) throws {
+        let retracted = try retractDocument(db, documentId: documentId)
+        try DocumentRecord.filter(Column("document_id") == documentId).deleteAll(db)
+        try recountEntities(db, retracted)
+    }
+
+    /// Recompute `document_count` from `document_entities` for the given
+    /// entities only. Entities no document counts any more are deleted, as
+    /// a rebuild without the retracted documents would never create them.
+    private func recountEntities(_ db: Database,
+                                 _ entities: [DocumentEntityRecord]) throws {
+        // Links first: they reference the patients and practitioners
+        let tables = [
+            (DocumentEntityRecord.link, PatientPractitionerRecord.databaseTableName),
+            (DocumentEntityRecord.patient, PatientRecord.databaseTableName),
+            (DocumentEntityRecord.practitioner, PractitionerRecord.databaseTableName),
+        ]
+        for (entityType, table) in tables {
+            let ids = Set(entities.filter { $0.entityType == entityType }.map(\.entityId))
+            guard !ids.isEmpty else { continue }
+            let idList = ids.map { String($0) }.joined(separator: ",")
+            try db.execute(sql: """
+                UPDATE \(table) SET document_count = COALESCE((
+                    SELECT SUM(occurrences) FROM document_entities
+                    WHERE entity_type = ? AND entity_id = \(table).id), 0)
+                WHERE id IN (\(idList))
+                """, arguments: [entityType])
+            if entityType == DocumentEntityRecord.patient {
+                try db.execute(sql: """
+                    DELETE FROM patient_blocks WHERE patient_id IN (
+                        SELECT id FROM patients WHERE id IN (\(idList)) AND document_count = 0)
+                    """)
+            }
+            try db.execute(sql: """
+                DELETE FROM \(table) WHERE id IN (\(idList)) AND document_count = 0
+                """)
         }
     }
 
     // MARK: - Private Helpers
 
-    private func ingestDocument(_ db: Database, doc: DocumentAddressFile,
-                                hash: String) throws {
+    /// Ingest one decoded document. Returns false if it was already
+    /// ingested with the same content hash (only its source stamp is updated).
+    private func ingestDocument(_ db: Database, _ loaded: LoadedAddressFile) throws -> Bool {
+        let doc = loaded.doc
+        let hash = loaded.hash
+        let source = loaded.source
         let now = Self.iso8601Now()
         let documentId = doc.documentId
 
+        // A file whose document ID changed leaves its old document behind
+        if let previous = try DocumentRecord
+            .filter(Column("source_file") == source.file)
+            .filter(Column("document_id") != documentId).fetchOne(db) {
+            try removeDocument(db, documentId: previous.documentId)
+        }
+
         // 1. Document upsert with hash check
+        var retracted: [DocumentEntityRecord] = []
         if let existing = try DocumentRecord
             .filter(Column("document_id") == documentId).fetchOne(db) {
-            if existing.jsonHash == hash { return }
-            try ExtractionRecord
-                .filter(Column("document_id") == documentId).deleteAll(db)
-            try PatientDocumentRecord
-                .filter(Column("document_id") == documentId).deleteAll(db)
+            if existing.jsonHash == hash {
+                if existing.sourceStamp != source {
+                    var touched = existing
+                    touched.setSourceStamp(source)
+                    try touched.update(db)
+                }
+                return false
+            }
+            retracted = try retractDocument(db, documentId: documentId)
             var updated = existing
             updated.jsonHash = hash
             updated.schemaVersion = doc.schemaVersion
             updated.extractedAt = doc.extractedAt
             updated.pageCount = doc.pageCount
             updated.updatedAt = now
+            updated.setSourceStamp(source)
             try updated.update(db)
         } else {
-            let docRecord = DocumentRecord(
+            var docRecord = DocumentRecord(
                 id: nil, documentId: documentId, jsonHash: hash,
                 schemaVersion: doc.schemaVersion, extractedAt: doc.extractedAt,
                 pageCount: doc.pageCount, ingestedAt: now, updatedAt: nil
             )
+            docRecord.setSourceStamp(source)
             try docRecord.insert(db)
         }
 
+        // Occurrences of each entity counted by this document
+        var counted: [String: [Int64: Int]] = [:]
+
         // 2. Build override map: (pageNumber:addressType) -> override
         var overrideMap: [String: AddressOverrideEntry] = [:]
         for override in doc.overrides {
@@ -488,11 +943,14 @@ public final class EntityDatabase: Sendable {
         }
 
         // 3. Resolve filename patient (document owner)
-        let filenamePatient = ExtractionHelpers.parsePatientFilename(documentId)
         var filenamePatientId: Int64?
-        if let fp = filenamePatient {
+        if let fp = loaded.filenamePatient {
             filenamePatientId = try resolvePatient(
-                db, name: fp.fullName, dob: fp.dateOfBirth)
+                db, name: fp.fullName, dob: fp.dateOfBirth,
+                normalized: loaded.normalizedNames[fp.fullName])
+            if let pid = filenamePatientId {
+                counted[DocumentEntityRecord.patient, default: [:]][pid, default: 0] += 1
+            }
         }
 
         // 4. Process pages
@@ -501,6 +959,7 @@ public final class EntityDatabase: Sendable {
         var seenPatients = Set<Int64>()
         var seenPractitioners: [(Int64, String)] = []
         var linkedPairs = Set<String>()
+        var patientMRNs: [String] = []
 
         for page in doc.pages {
             let pageNum = page.pageNumber
@@ -520,6 +979,7 @@ public final class EntityDatabase: Sendable {
                 try updatePatientData(db, patientId: pid,
                                       address: effectiveAddress,
                                       phones: effectivePatient?.phones)
+                if let mrn = effectivePatient?.mrn { patientMRNs.append(mrn) }
             }
 
             // GP practitioner
@@ -531,7 +991,8 @@ public final class EntityDatabase: Sendable {
                     address: effectiveGP?.address,
                     postcode: effectiveGP?.postcode,
                     odsCode: effectiveGP?.odsCode,
-                    officialName: effectiveGP?.officialName)
+                    officialName: effectiveGP?.officialName,
+                    normalized: loaded.normalizedNames[gpName])
             }
 
             // Specialist practitioner
@@ -541,7 +1002,8 @@ public final class EntityDatabase: Sendable {
                 specialistId = try resolvePractitioner(
                     db, name: specName, type: "Consultant",
                     practiceName: nil, address: nil, postcode: nil,
-                    odsCode: nil, officialName: nil)
+                    odsCode: nil, officialName: nil,
+                    normalized: loaded.normalizedNames[specName])
             }
 
             // Extraction record
@@ -582,10 +1044,12 @@ public final class EntityDatabase: Sendable {
             if let gid = gpId {
                 pagePractitioners[pageNum, default: []].append((gid, "GP"))
                 seenPractitioners.append((gid, "GP"))
+                counted[DocumentEntityRecord.practitioner, default: [:]][gid, default: 0] += 1
             }
             if let sid = specialistId {
                 pagePractitioners[pageNum, default: []].append((sid, "Consultant"))
                 seenPractitioners.append((sid, "Consultant"))
+                counted[DocumentEntityRecord.practitioner, default: [:]][sid, default: 0] += 1
             }
         }
 
@@ -595,11 +1059,12 @@ public final class EntityDatabase: Sendable {
             for patientId in patientIds {
                 for (practId, relType) in pagePractitioners[pageNum] ?? [] {
                     let key = "\(patientId):\(practId):\(relType)"
-                    if linkedPairs.insert(key).inserted {
-                        try linkPatientPractitioner(
-                            db, patientId: patientId,
-                            practitionerId: practId,
-                            relationshipType: relType)
+                    if linkedPairs.insert(key).inserted,
+                       let linkId = try linkPatientPractitioner(
+                           db, patientId: patientId,
+                           practitionerId: practId,
+                           relationshipType: relType) {
+                        counted[DocumentEntityRecord.link, default: [:]][linkId, default: 0] += 1
                     }
                 }
             }
@@ -608,11 +1073,12 @@ public final class EntityDatabase: Sendable {
         if seenPatients.count == 1, let sole = seenPatients.first {
             for (practId, relType) in seenPractitioners {
                 let key = "\(sole):\(practId):\(relType)"
-                if linkedPairs.insert(key).inserted {
-                    try linkPatientPractitioner(
-                        db, patientId: sole,
-                        practitionerId: practId,
-                        relationshipType: relType)
+                if linkedPairs.insert(key).inserted,
+                   let linkId = try linkPatientPractitioner(
+                       db, patientId: sole,
+                       practitionerId: practId,
+                       relationshipType: relType) {
+                    counted[DocumentEntityRecord.link, default: [:]][linkId, default: 0] += 1
                 }
             }
         }
@@ -623,6 +1089,41 @@ public final class EntityDatabase: Sendable {
                 id: nil, patientId: pid, documentId: documentId)
             try link.insert(db)
         }
+
+        // 7. Blocking keys for duplicate-candidate search
+        if let pid = filenamePatientId {
+            try updatePatientBlocks(db, patientId: pid, mrns: patientMRNs)
+        }
+
+        // 8. Record what was counted, then recount what the old version counted
+        for (entityType, occurrences) in counted {
+            for (entityId, count) in occurrences {
+                try DocumentEntityRecord(
+                    documentId: documentId, entityType: entityType,
+                    entityId: entityId, occurrences: count
+                ).insert(db)
+            }
+        }
+        try recountEntities(db, retracted)
+        return true
+    }
+
+    /// File a patient under its current blocking keys. Name and postcode
+    /// keys follow the patient record; MRN keys accumulate.
+    private func updatePatientBlocks(_ db: Database, patientId: Int64,
+                                     mrns: [String]) throws {
+        guard let patient = try PatientRecord.fetchOne(db, key: patientId) else { return }
+        try db.execute(
+            sql: "DELETE FROM patient_blocks WHERE patient_id = ? AND block_key NOT LIKE 'mrn:%'",
+            arguments: [patientId])
+        let keys = PatientBlocking.keys(
+            normalizedName: patient.fullNameNormalized, dateOfBirth: patient.dateOfBirth,
+            postcode: patient.postcode, mrns: mrns)
+        for key in keys {
+            try db.execute(
+                sql: "INSERT OR IGNORE INTO patient_blocks (block_key, patient_id) VALUES (?, ?)",
+                arguments: [key, patientId])
+        }
     }
 
     private func updatePatientData(_ db: Database, patientId: Int64,
@@ -651,6 +1152,90 @@ public final class EntityDatabase: Sendable {
 
     // MARK: - Utilities
 
+    /// An address file as the parse stage hands it to the writer: decoded,
+    /// hashed, and with the names it will resolve already normalised.
+    struct LoadedAddressFile: Sendable {
+        var doc: DocumentAddressFile
+        var hash: String
+        var source: SourceStamp
+        /// Patient parsed from the document ID, if it follows the convention
+        var filenamePatient: ExtractionHelpers.FilenamePatient?
+        /// `ExtractionHelpers.normalizeName` of every patient and
+        /// practitioner name in the file, keyed by the raw name
+        var normalizedNames: [String: String]
+    }
+
+    /// `{stem}.overrides.json` next to an address file.
+    static func overridesURL(for url: URL) -> URL {
+        let stem = url.deletingPathExtension().lastPathComponent
+        return url.deletingLastPathComponent()
+            .appendingPathComponent("\(stem).overrides.json")
+    }
+
+    /// Name, mtime and size of an address file and its overrides sidecar.
+    static func sourceStamp(for url: URL) throws -> SourceStamp {
+        let fileManager = FileManager.default
+        let attributes = try fileManager.attributesOfItem(atPath: url.path)
+        let overrides = try? fileManager.attributesOfItem(atPath: overridesURL(for: url).path)
+        return SourceStamp(
+            file: url.lastPathComponent,
+            mtime: (attributes[.modificationDate] as? Date)?.timeIntervalSince1970 ?? 0,
+            size: (attributes[.size] as? NSNumber)?.int64Value ?? 0,
+            overridesMtime: (overrides?[.modificationDate] as? Date)?.timeIntervalSince1970,
+            overridesSize: (overrides?[.size] as? NSNumber)?.int64Value)
+    }
+
+    /// Read and decode an address file, merging its overrides sidecar if
+    /// there is one. The hash covers both files; the source stamp is taken
+    /// before reading, so a write during the read shows up as a change on
+    /// the next incremental run.
+    static func loadAddressFile(at url: URL) throws -> LoadedAddressFile {
+        let source = try sourceStamp(for: url)
+        let data = try Data(contentsOf: url)
+        var doc = try JSONDecoder().decode(DocumentAddressFile.self, from: data)
+        var hash = contentHash(of: data)
+        if source.overridesMtime != nil {
+            let overridesURL = overridesURL(for: url)
+            let overridesData = try Data(contentsOf: overridesURL)
+            let sidecar = try JSONDecoder().decode(OverridesFile.self, from: overridesData)
+            if !sidecar.overrides.isEmpty {
+                doc.overrides = sidecar.overrides
+            }
+            let digest = SHA256.hash(data: Data((hash + contentHash(of: overridesData)).utf8))
+            hash = digest.map { String(format: "%02x", $0) }.joined()
+        }
+
+        let filenamePatient = ExtractionHelpers.parsePatientFilename(doc.documentId)
+        var names: [String] = filenamePatient.map { [$0.fullName] } ?? []
+        for page in doc.pages {
+            names += [page.gp?.name, page.specialistName].compactMap { $0 }
+        }
+        for override in doc.overrides {
+            names += [override.gp?.name, override.specialistName].compactMap { $0 }
+        }
+        var normalizedNames: [String: String] = [:]
+        for name in names where normalizedNames[name] == nil {
+            normalizedNames[name] = ExtractionHelpers.normalizeName(name)
+        }
+        return LoadedAddressFile(doc: doc, hash: hash, source: source,
+                                 filenamePatient: filenamePatient,
+                                 normalizedNames: normalizedNames)
+    }
+
+    /// Load `urls` on up to `workers` threads. Results are in input
+    /// order, so what the writer sees does not depend on the worker count.
+    static func loadAddressFiles(_ urls: [URL],
+                                 workers: Int) -> [Result<LoadedAddressFile, Error>] {
+        let slots = LoadSlots(count: urls.count)
+        let threads = max(1, min(workers, urls.count))
+        DispatchQueue.concurrentPerform(iterations: threads) { worker in
+            for index in stride(from: worker, to: urls.count, by: threads) {
+                slots[index] = Result { try loadAddressFile(at: urls[index]) }
+            }
+        }
+        return slots.results
+    }
+
     static func contentHash(of data: Data) -> String {
         if var dict = try? JSONSerialization.jsonObject(with: data)
             as? [String: Any] {
@@ -669,6 +1254,54 @@ public final class EntityDatabase: Sendable {
         ISO8601DateFormatter().string(from: Date())
     }
 
+    /// Parse-stage output slots, one per file, filled from worker threads.
+    private final class LoadSlots: @unchecked Sendable {
+        private let lock = NSLock()
+        private var slots: [Result<LoadedAddressFile, Error>?]
+
+        init(count: Int) {
+            slots = Array(repeating: nil, count: count)
+        }
+
+        subscript(index: Int) -> Result<LoadedAddressFile, Error>? {
+            get {
+                lock.lock()
+                defer { lock.unlock() }
+                return slots[index]
+            }
+            set {
+                lock.lock()
+                defer { lock.unlock() }
+                slots[index] = newValue
+            }
+        }
+
+        var results: [Result<LoadedAddressFile, Error>] {
+            lock.lock()
+            defer { lock.unlock() }
+            return slots.map { $0! }
+        }
+    }
+
+    /// A chunk being parsed in the background while the writer works on
+    /// the previous one.
+    private final class PendingLoad: @unchecked Sendable {
+        private let group = DispatchGroup()
+        private var results: [Result<LoadedAddressFile, Error>] = []
+
+        init(_ urls: [URL], workers: Int) {
+            DispatchQueue.global(qos: .userInitiated).async(group: group) {
+                self.results = EntityDatabase.loadAddressFiles(urls, workers: workers)
+            }
+        }
+
+        /// Block until the chunk is parsed.
+        func wait() -> [Result<LoadedAddressFile, Error>] {
+            group.wait()
+            return results
+        }
+    }
+
     // MARK: - Schema Migration
 
     private var migrator: DatabaseMigrator {
@@ -830,6 +1463,60 @@ public final class EntityDatabase: Sendable {
                           on: "name_aliases", columns: ["alias", "entity_type"])
         }
 
+        migrator.registerMigration("v2") { db in
+            // v1 kept no per-document contributions, so its counts cannot be
+            // retracted. The database is a derived cache: empty it and let
+            // the next ingest rebuild it.
+            for table in ["patient_documents", "patient_practitioners", "extractions",
+                          "documents", "patients", "practitioners"] {
+                try db.execute(sql: "DELETE FROM \(table)")
+            }
+
+            try db.alter(table: "documents") { t in
+                t.add(column: "source_file", .text)
+                t.add(column: "source_mtime", .double)
+                t.add(column: "source_size", .integer)
+                t.add(column: "overrides_mtime", .double)
+                t.add(column: "overrides_size", .integer)
+            }
+            try db.create(index: "idx_documents_source_file",
+                          on: "documents", columns: ["source_file"])
+
+            try db.create(table: "document_entities") { t in
+                t.column("document_id", .text).notNull()
+                    .references("documents", column: "document_id")
+                t.column("entity_type", .text).notNull()
+                t.column("entity_id", .integer).notNull()
+                t.column("occurrences", .integer).notNull()
+                t.primaryKey(["document_id", "entity_type", "entity_id"])
+            }
+            try db.create(index: "idx_document_entities_entity",
+                          on: "document_entities", columns: ["entity_type", "entity_id"])
+        }
+
+        migrator.registerMigration("v3") { db in
+            try db.create(table: "patient_blocks") { t in
+                t.column("block_key", .text).notNull()
+                t.column("patient_id", .integer).notNull().references("patients")
+                t.primaryKey(["block_key", "patient_id"])
+            }
+            try db.create(index: "idx_patient_blocks_patient",
+                          on: "patient_blocks", columns: ["patient_id"])
+
+            // MRNs were not kept before v3; name and postcode keys can be backfilled
+            for patient in try PatientRecord.fetchAll(db) {
+                guard let id = patient.id else { continue }
+                let keys = PatientBlocking.keys(
+                    normalizedName: patient.fullNameNormalized,
+                    dateOfBirth: patient.dateOfBirth, postcode: patient.postcode)
+                for key in keys {
+                    try db.execute(
+                        sql: "INSERT INTO patient_blocks (block_key, patient_id) VALUES (?, ?)",
+                        arguments: [key, id])
+                }
+            }
+        }
+
         return migrator
     }
 }
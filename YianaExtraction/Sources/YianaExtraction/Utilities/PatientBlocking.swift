@@ -0,0 +1,182 @@
+import Foundation
+
+/// Blocking keys and fuzzy comparison for finding likely-duplicate patients.
+///
+/// Patient resolution itself is exact (normalised name + DOB). Comparing every
+/// patient with every other to find near-duplicates — name variants, DOB
+/// typos — is quadratic, so each patient is filed under a few blocking keys
+/// and only patients sharing a key are compared:
+///
+/// - `name_dob:` phonetic (Soundex) surname + DOB — catches spelling variants
+/// - `postcode:` canonical postcode + first initial — catches DOB typos
+/// - `mrn:` hospital number — catches both, when the letter carries one
+public enum PatientBlocking {
+
+    /// How a pair of DOBs compare.
+    public enum DateOfBirthMatch: String, Sendable {
+        case same
+        /// One digit wrong, two adjacent digits swapped, or day and month swapped
+        case near
+        case different
+        /// One or both unknown
+        case missing
+    }
+
+    // MARK: - Keys
+
+    /// Blocking keys for a patient.
+    static func keys(normalizedName: String, dateOfBirth: String?,
+                     postcode: String?, mrns: [String] = []) -> Set<String> {
+        var keys = Set<String>()
+        let (first, surname) = nameParts(normalizedName)
+        if let dob = dateOfBirth, !dob.isEmpty, let code = soundex(surname) {
+            keys.insert("name_dob:\(code):\(dob)")
+        }
+        if let postcode = postcode.map(canonicalPostcode), !postcode.isEmpty,
+           let initial = first.first {
+            keys.insert("postcode:\(postcode):\(initial)")
+        }
+        for mrn in mrns {
+            let canonical = mrn.uppercased().filter { $0.isLetter || $0.isNumber }
+            if !canonical.isEmpty { keys.insert("mrn:\(canonical)") }
+        }
+        return keys
+    }
+
+    /// First name and surname of a normalised "first … surname" name.
+    static func nameParts(_ normalizedName: String) -> (first: String, surname: String) {
+        let tokens = normalizedName.split(separator: " ").map(String.init)
+        return (tokens.first ?? "", tokens.last ?? "")
+    }
+
+    /// Uppercase postcode with spaces removed.
+    static func canonicalPostcode(_ postcode: String) -> String {
+        postcode.uppercased().filter { !$0.isWhitespace }
+    }
+
+    /// American Soundex code of a surname (letters only), e.g. "R163" for
+    /// Robert/Rupert. Nil if the name has no ASCII letters.
+    static func soundex(_ name: String) -> String? {
+        let letters = name.uppercased().unicodeScalars.filter { $0.isASCII && CharacterSet.uppercaseLetters.contains($0) }
+        guard let head = letters.first else { return nil }
+
+        func digit(_ c: Unicode.Scalar) -> Character? {
+            switch c {
+            case "B", "F", "P", "V": return "1"
+            case "C", "G", "J", "K", "Q", "S", "X", "Z": return "2"
+            case "D", "T": return "3"
+            case "L": return "4"
+            case "M", "N": return "5"
+            case "R": return "6"
+            default: return nil
+            }
+        }
+
+        var code = String(Character(head))
+        var previous = digit(head)
+        for c in letters.dropFirst() {
+            let d = digit(c)
+            if let d, d != previous {
+                code.append(d)
+                if code.count == 4 { break }
+            }
+            // H and W do not separate letters with the same code; vowels do
+            if c != "H" && c != "W" { previous = d }
+        }
+        return code.padding(toLength: 4, withPad: "0", startingAt: 0)
+    }
+
+    // MARK: - Comparison
+
+    /// Jaro-Winkler similarity of two strings, 0…1.
+    static func jaroWinkler(_ a: String, _ b: String) -> Double {
+        let s1 = Array(a), s2 = Array(b)
+        if s1.isEmpty && s2.isEmpty { return 1 }
+        if s1.isEmpty || s2.isEmpty { return 0 }
+
+        let window = max(0, max(s1.count, s2.count) / 2 - 1)
+        var matched1 = [Bool](repeating: false, count: s1.count)
+        var matched2 = [Bool](repeating: false, count: s2.count)
+        var matches = 0
+        for i in s1.indices {
+            let lo = max(0, i - window), hi = min(s2.count - 1, i + window)
+            guard lo <= hi else { continue }
+            for j in lo...hi where !matched2[j] && s1[i] == s2[j] {
+                matched1[i] = true
+                matched2[j] = true
+                matches += 1
+                break
+            }
+        }
+        guard matches > 0 else { return 0 }
+
+        var transpositions = 0
+        var j = 0
+        for i in s1.indices where matched1[i] {
+            while !matched2[j] { j += 1 }
+            if s1[i] != s2[j] { transpositions += 1 }
+            j += 1
+        }
+        let m = Double(matches)
+        let jaro = (m / Double(s1.count) + m / Double(s2.count)
+                    + (m - Double(transpositions) / 2) / m) / 3
+
+        var prefix = 0
+        for (x, y) in zip(s1, s2).prefix(4) {
+            guard x == y else { break }
+            prefix += 1
+        }
+        return jaro + Double(prefix) * 0.1 * (1 - jaro)
+    }
+
+    /// Similarity of two normalised names, 0…1. The surname carries most of
+    /// the weight; a bare initial matches a first name it abbreviates.
+    static func nameSimilarity(_ a: String, _ b: String) -> Double {
+        let (firstA, surnameA) = nameParts(a)
+        let (firstB, surnameB) = nameParts(b)
+        let firstSimilarity: Double
+        if firstA.count == 1 || firstB.count == 1 {
+            firstSimilarity = firstA.first == firstB.first ? 0.9 : 0
+        } else {
+            firstSimilarity = jaroWinkler(firstA, firstB)
+        }
+        return 0.6 * jaroWinkler(surnameA, surnameB) + 0.4 * firstSimilarity
+    }
+
+    /// Compare two DOBs written the same way (e.g. DD/MM/YYYY).
+    static func compareDatesOfBirth(_ a: String?, _ b: String?) -> DateOfBirthMatch {
+        guard let a, let b, !a.isEmpty, !b.isEmpty else { return .missing }
+        if a == b { return .same }
+        let x = Array(a), y = Array(b)
+        guard x.count == y.count else { return .different }
+
+        let differing = x.indices.filter { x[$0] != y[$0] }
+        if differing.count == 1 { return .near }
+        if differing.count == 2, differing[1] == differing[0] + 1,
+           x[differing[0]] == y[differing[1]], x[differing[1]] == y[differing[0]] {
+            return .near
+        }
+        // Day and month swapped
+        let partsA = a.split(separator: "/"), partsB = b.split(separator: "/")
+        if partsA.count == 3, partsB.count == 3,
+           partsA[0] == partsB[1], partsA[1] == partsB[0], partsA[2] == partsB[2] {
+            return .near
+        }
+        return .different
+    }
+
+    /// Duplicate likelihood of two patients, 0…1. A shared MRN is nearly
+    /// conclusive; otherwise name similarity and DOB agreement are combined.
+    static func score(nameA: String, dobA: String?, nameB: String, dobB: String?,
+                      sharesMRN: Bool) -> Double {
+        let dobScore: Double
+        switch compareDatesOfBirth(dobA, dobB) {
+        case .same: dobScore = 1
+        case .near: dobScore = 0.8
+        case .missing: dobScore = 0.5
+        case .different: dobScore = 0
+        }
+        let combined = 0.7 * nameSimilarity(nameA, nameB) + 0.3 * dobScore
+        return sharesMRN ? max(combined, 0.95) : combined
+    }
+}
@@ -1,4 +1,5 @@
 import Foundation
+import GRDB
 import Testing
 @testable import YianaExtraction
 
@@ -525,3 +526,312 @@ struct PractitionerSearchTests {
         #expect(results.isEmpty)
     }
 }
+
+// MARK: - Bulk Load Tests
+
+struct BulkIngestionTests {
+
+    private static var addressesURL: URL {
+        URL(fileURLWithPath: #filePath)
+            .deletingLastPathComponent()
+            .deletingLastPathComponent()
+            .deletingLastPathComponent()
+            .deletingLastPathComponent()
+            .appendingPathComponent("migration/fixtures/entity/addresses")
+    }
+
+    private func fixtureFiles() throws -> [URL] {
+        try FileManager.default.contentsOfDirectory(
+            at: Self.addressesURL, includingPropertiesForKeys: nil
+        )
+        .filter { $0.pathExtension == "json" && !$0.lastPathComponent.contains(".overrides.") }
+        .sorted { $0.lastPathComponent < $1.lastPathComponent }
+    }
+
+    @Test func matchesPerFileIngestion() throws {
+        let files = try fixtureFiles()
+
+        let serial = try EntityDatabase()
+        for url in files { try serial.ingestAddressFile(at: url) }
+
+        // A chunk size that does not divide the file count exercises chunk boundaries
+        let bulk = try EntityDatabase()
+        let result = try bulk.bulkIngestAddressFiles(at: files, chunkSize: 7)
+        #expect(result.ingested == files.count)
+        #expect(result.failures.isEmpty)
+
+        let s1 = try serial.statistics(), s2 = try bulk.statistics()
+        #expect(s1.documentCount == s2.documentCount)
+        #expect(s1.patientCount == s2.patientCount)
+        #expect(s1.practitionerCount == s2.practitionerCount)
+        #expect(s1.linkCount == s2.linkCount)
+        #expect(s1.extractionCount == s2.extractionCount)
+
+        func patients(_ db: EntityDatabase) throws -> [String] {
+            try db.allPatients().map {
+                "\($0.fullNameNormalized)|\($0.dateOfBirth ?? "")|\($0.documentCount)|\($0.postcode ?? "")"
+            }.sorted()
+        }
+        func practitioners(_ db: EntityDatabase) throws -> [String] {
+            try db.allPractitioners().map {
+                "\($0.fullNameNormalized ?? "")|\($0.type)|\($0.documentCount)"
+            }.sorted()
+        }
+        #expect(try patients(serial) == patients(bulk))
+        #expect(try practitioners(serial) == practitioners(bulk))
+
+        for url in files {
+            let documentId = url.deletingPathExtension().lastPathComponent
+            let links1 = try serial.practitionersForDocument(documentId)
+                .map { "\($0.practitioner.fullNameNormalized ?? ""):\($0.relationshipType)" }.sorted()
+            let links2 = try bulk.practitionersForDocument(documentId)
+                .map { "\($0.practitioner.fullNameNormalized ?? ""):\($0.relationshipType)" }.sorted()
+            #expect(links1 == links2, "\(documentId): links differ")
+        }
+    }
+
+    @Test func workerCountDoesNotChangeResult() throws {
+        let files = try fixtureFiles()
+
+        func rows(workers: Int) throws -> [String] {
+            let db = try EntityDatabase()
+            let result = try db.bulkIngestAddressFiles(at: files, chunkSize: 7, workers: workers)
+            #expect(result.failures.isEmpty)
+            // Row IDs included: the writer must see files in the same order
+            let patients = try db.allPatients().map {
+                "P\($0.id ?? 0)|\($0.fullNameNormalized)|\($0.dateOfBirth ?? "")|\($0.documentCount)|\($0.postcode ?? "")"
+            }
+            let practitioners = try db.allPractitioners().map {
+                "D\($0.id ?? 0)|\($0.fullNameNormalized ?? "")|\($0.type)|\($0.documentCount)"
+            }
+            return patients + practitioners
+        }
+
+        let serial = try rows(workers: 1)
+        #expect(try rows(workers: 4) == serial)
+        #expect(try rows(workers: 16) == serial)
+    }
+
+    @Test func failedFileDoesNotLoseItsChunk() throws {
+        let files = try fixtureFiles()
+        let badURL = FileManager.default.temporaryDirectory
+            .appendingPathComponent(UUID().uuidString + ".json")
+        try Data("{ not json".utf8).write(to: badURL)
+        defer { try? FileManager.default.removeItem(at: badURL) }
+
+        let db = try EntityDatabase()
+        let result = try db.bulkIngestAddressFiles(
+            at: Array(files.prefix(3)) + [badURL] + Array(files.dropFirst(3)),
+            chunkSize: 500)
+
+        #expect(result.ingested == files.count)
+        #expect(result.failures.map(\.url) == [badURL])
+        #expect(try db.statistics().documentCount == files.count)
+    }
+
+    @Test func reingestingUnchangedFilesIsANoOp() throws {
+        let files = try fixtureFiles()
+        let db = try EntityDatabase()
+        _ = try db.bulkIngestAddressFiles(at: files)
+        let before = try db.statistics()
+        _ = try db.bulkIngestAddressFiles(at: files)
+        let after = try db.statistics()
+
+        #expect(before.patientCount == after.patientCount)
+        #expect(before.linkCount == after.linkCount)
+        #expect(before.extractionCount == after.extractionCount)
+    }
+
+    @Test func openingRecreatesIndexesDroppedByAnInterruptedLoad() throws {
+        let dbPath = FileManager.default.temporaryDirectory
+            .appendingPathComponent("test_entity_\(UUID().uuidString).db").path
+        defer { try? FileManager.default.removeItem(atPath: dbPath) }
+
+        _ = try EntityDatabase(path: dbPath)
+        // What bulkIngestAddressFiles leaves behind if killed mid-load
+        let queue = try DatabaseQueue(path: dbPath)
+        try queue.writeWithoutTransaction { db in
+            for index in EntityDatabase.deferredIndexes {
+                try db.execute(sql: "DROP INDEX \(index.name)")
+            }
+        }
+        try queue.close()
+
+        _ = try EntityDatabase(path: dbPath)
+        let names = try DatabaseQueue(path: dbPath).read { db in
+            try String.fetchSet(db, sql: "SELECT name FROM sqlite_master WHERE type = 'index'")
+        }
+        for index in EntityDatabase.deferredIndexes {
+            #expect(names.contains(index.name))
+        }
+    }
+}
+
+// MARK: - Incremental Ingestion Tests
+
+struct IncrementalIngestionTests {
+
+    private static var addressesURL: URL {
+        URL(fileURLWithPath: #filePath)
+            .deletingLastPathComponent()
+            .deletingLastPathComponent()
+            .deletingLastPathComponent()
+            .deletingLastPathComponent()
+            .appendingPathComponent("migration/fixtures/entity/addresses")
+    }
+
+    /// Copy the entity fixtures into a fresh temporary directory.
+    private func makeWorkingCopy() throws -> URL {
+        let dir = FileManager.default.temporaryDirectory
+            .appendingPathComponent("entity_incremental_\(UUID().uuidString)")
+        try FileManager.default.copyItem(at: Self.addressesURL, to: dir)
+        return dir
+    }
+
+    /// Entities and counts, independent of row IDs and ingest order.
+    private func snapshot(_ db: EntityDatabase) throws -> [String] {
+        let stats = try db.statistics()
+        let patients = try db.allPatients().map {
+            "patient \($0.fullNameNormalized)|\($0.dateOfBirth ?? "")|\($0.documentCount)"
+        }
+        let practitioners = try db.allPractitioners().map {
+            "practitioner \($0.fullNameNormalized ?? "")|\($0.type)|\($0.documentCount)"
+        }
+        return (patients + practitioners).sorted() + [
+            "documents \(stats.documentCount)", "extractions \(stats.extractionCount)",
+            "links \(stats.linkCount)",
+        ]
+    }
+
+    /// A database rebuilt from scratch over the directory's current contents.
+    private func rebuilt(_ dir: URL) throws -> EntityDatabase {
+        let db = try EntityDatabase()
+        _ = try db.ingestChanges(inDirectory: dir)
+        return db
+    }
+
+    /// Rename every GP in the first fixture that has one; returns its file.
+    private func renameGP(in dir: URL) throws -> URL {
+        let files = try FileManager.default.contentsOfDirectory(
+            at: dir, includingPropertiesForKeys: nil
+        ).sorted { $0.lastPathComponent < $1.lastPathComponent }
+        for url in files {
+            var json = try JSONSerialization.jsonObject(
+                with: Data(contentsOf: url)) as! [String: Any]
+            var pages = json["pages"] as? [[String: Any]] ?? []
+            guard pages.contains(where: { ($0["gp"] as? [String: Any])?["name"] != nil })
+            else { continue }
+            for i in pages.indices where pages[i]["gp"] is [String: Any] {
+                var gp = pages[i]["gp"] as! [String: Any]
+                gp["name"] = "Dr Quentin Oddfellow"
+                pages[i]["gp"] = gp
+            }
+            json["pages"] = pages
+            try JSONSerialization.data(withJSONObject: json).write(to: url)
+            return url
+        }
+        throw CocoaError(.fileNoSuchFile)
+    }
+
+    @Test func secondRunSkipsEverything() throws {
+        let dir = try makeWorkingCopy()
+        defer { try? FileManager.default.removeItem(at: dir) }
+
+        let db = try EntityDatabase()
+        let first = try db.ingestChanges(inDirectory: dir)
+        #expect(first.ingested > 0)
+        #expect(first.unchanged == 0)
+
+        let second = try db.ingestChanges(inDirectory: dir)
+        #expect(second.ingested == 0)
+        #expect(second.unchanged == first.ingested)
+        #expect(second.removed == 0)
+    }
+
+    @Test func matchesPerFileIngestion() throws {
+        let dir = try makeWorkingCopy()
+        defer { try? FileManager.default.removeItem(at: dir) }
+
+        let serial = try EntityDatabase()
+        for url in try FileManager.default.contentsOfDirectory(
+            at: dir, includingPropertiesForKeys: nil) {
+            try serial.ingestAddressFile(at: url)
+        }
+        #expect(try snapshot(rebuilt(dir)) == snapshot(serial))
+    }
+
+    @Test func changedFileIsRetractedAndRecounted() throws {
+        let dir = try makeWorkingCopy()
+        defer { try? FileManager.default.removeItem(at: dir) }
+
+        let db = try EntityDatabase()
+        _ = try db.ingestChanges(inDirectory: dir)
+        let changedURL = try renameGP(in: dir)
+
+        let result = try db.ingestChanges(inDirectory: dir)
+        #expect(result.ingested == 1)
+        #expect(try snapshot(db) == snapshot(rebuilt(dir)))
+
+        let documentId = changedURL.deletingPathExtension().lastPathComponent
+        let names = try db.practitionersForDocument(documentId)
+            .compactMap(\.practitioner.fullNameNormalized)
+        #expect(names.contains("quentin oddfellow"))
+    }
+
+    @Test func removedFileIsRetracted() throws {
+        let dir = try makeWorkingCopy()
+        defer { try? FileManager.default.removeItem(at: dir) }
+
+        let db = try EntityDatabase()
+        _ = try db.ingestChanges(inDirectory: dir)
+        try FileManager.default.removeItem(
+            at: dir.appendingPathComponent("Archer_Tom_150380.json"))
+
+        let result = try db.ingestChanges(inDirectory: dir)
+        #expect(result.removed == 1)
+        #expect(result.ingested == 0)
+        #expect(try snapshot(db) == snapshot(rebuilt(dir)))
+    }
+
+    @Test func touchedFileWithSameContentIsNotReingested() throws {
+        let dir = try makeWorkingCopy()
+        defer { try? FileManager.default.removeItem(at: dir) }
+
+        let db = try EntityDatabase()
+        _ = try db.ingestChanges(inDirectory: dir)
+        let url = dir.appendingPathComponent("Archer_Tom_150380.json")
+        try FileManager.default.setAttributes(
+            [.modificationDate: Date().addingTimeInterval(60)], ofItemAtPath: url.path)
+
+        let result = try db.ingestChanges(inDirectory: dir)
+        #expect(result.touched == 1)
+        #expect(result.ingested == 0)
+
+        // The new mtime was recorded, so the next run skips the file
+        #expect(try db.ingestChanges(inDirectory: dir).touched == 0)
+    }
+
+    @Test func overridesSidecarChangeIsPickedUp() throws {
+        let dir = try makeWorkingCopy()
+        defer { try? FileManager.default.removeItem(at: dir) }
+
+        let db = try EntityDatabase()
+        _ = try db.ingestChanges(inDirectory: dir)
+        let documentId = "Archer_Tom_150380"
+        let sidecar = OverridesFile(documentId: documentId, overrides: [
+            AddressOverrideEntry(
+                pageNumber: 1, matchAddressType: "patient",
+                gp: GPInfo(name: "Dr Quentin Oddfellow"),
+                overrideReason: "corrected", overrideDate: "2026-01-01T00:00:00Z"),
+        ])
+        try JSONEncoder().encode(sidecar).write(
+            to: dir.appendingPathComponent("\(documentId).overrides.json"))
+
+        let result = try db.ingestChanges(inDirectory: dir)
+        #expect(result.ingested == 1)
+        let names = try db.practitionersForDocument(documentId)
+            .compactMap(\.practitioner.fullNameNormalized)
+        #expect(names.contains("quentin oddfellow"))
+        #expect(try snapshot(db) == snapshot(rebuilt(dir)))
+    }
+}
@@ -0,0 +1,180 @@
+import Foundation
+import Testing
+@testable import YianaExtraction
+
+// MARK: - Blocking Key Tests
+
+struct PatientBlockingTests {
+
+    @Test func soundexKnownValues() {
+        #expect(PatientBlocking.soundex("Robert") == "R163")
+        #expect(PatientBlocking.soundex("Rupert") == "R163")
+        #expect(PatientBlocking.soundex("Ashcraft") == "A261")
+        #expect(PatientBlocking.soundex("Tymczak") == "T522")
+        #expect(PatientBlocking.soundex("Pfister") == "P236")
+        #expect(PatientBlocking.soundex("O'Brien") == PatientBlocking.soundex("OBrien"))
+        #expect(PatientBlocking.soundex("") == nil)
+    }
+
+    @Test func transposedSurnameSharesNameKey() {
+        let a = PatientBlocking.keys(normalizedName: "tom archer",
+                                     dateOfBirth: "15/03/1980", postcode: nil)
+        let b = PatientBlocking.keys(normalizedName: "tom arhcer",
+                                     dateOfBirth: "15/03/1980", postcode: nil)
+        #expect(!a.isDisjoint(with: b))
+    }
+
+    @Test func postcodeKeyIgnoresSpacingAndCase() {
+        let a = PatientBlocking.keys(normalizedName: "tom archer",
+                                     dateOfBirth: nil, postcode: "zz1 1aa")
+        let b = PatientBlocking.keys(normalizedName: "tom archer",
+                                     dateOfBirth: nil, postcode: "ZZ11AA")
+        #expect(a == b)
+        #expect(a == ["postcode:ZZ11AA:t"])
+    }
+
+    @Test func mrnKey() {
+        let keys = PatientBlocking.keys(normalizedName: "tom archer", dateOfBirth: nil,
+                                        postcode: nil, mrns: ["ab-12345"])
+        #expect(keys == ["mrn:AB12345"])
+    }
+
+    @Test func jaroWinklerKnownValues() {
+        #expect(abs(PatientBlocking.jaroWinkler("martha", "marhta") - 0.9611) < 0.001)
+        #expect(PatientBlocking.jaroWinkler("same", "same") == 1)
+        #expect(PatientBlocking.jaroWinkler("abc", "") == 0)
+    }
+
+    @Test func dateOfBirthComparison() {
+        #expect(PatientBlocking.compareDatesOfBirth("15/03/1980", "15/03/1980") == .same)
+        #expect(PatientBlocking.compareDatesOfBirth("15/03/1980", "16/03/1980") == .near)
+        #expect(PatientBlocking.compareDatesOfBirth("15/03/1980", "51/03/1980") == .near)
+        #expect(PatientBlocking.compareDatesOfBirth("05/03/1980", "03/05/1980") == .near)
+        #expect(PatientBlocking.compareDatesOfBirth("12/05/1990", "04/03/2002") == .different)
+        #expect(PatientBlocking.compareDatesOfBirth("12/05/1990", nil) == .missing)
+    }
+
+    @Test func initialMatchesFirstName() {
+        #expect(PatientBlocking.nameSimilarity("t archer", "tom archer") > 0.9)
+        #expect(PatientBlocking.nameSimilarity("j archer", "tom archer") < 0.7)
+    }
+}
+
+// MARK: - Merge Candidate Tests
+
+struct MergeCandidateTests {
+
+    private static var fixturesPath: String {
+        URL(fileURLWithPath: #filePath)
+            .deletingLastPathComponent()
+            .deletingLastPathComponent()
+            .deletingLastPathComponent()
+            .deletingLastPathComponent()
+            .appendingPathComponent("migration/fixtures/entity")
+            .path
+    }
+
+    /// Write a one-page address file for `documentId` into `dir`.
+    @discardableResult
+    private func writeDocument(in dir: URL, documentId: String, postcode: String,
+                               mrn: String? = nil) throws -> URL {
+        let mrnJSON = mrn.map { "\"\($0)\"" } ?? "null"
+        let json = """
+        {
+            "document_id": "\(documentId)",
+            "schema_version": 2,
+            "extracted_at": "2026-01-01T00:00:00Z",
+            "page_count": 1,
+            "pages": [{
+                "page_number": 1,
+                "address_type": "patient",
+                "patient": { "full_name": "Patient", "mrn": \(mrnJSON) },
+                "address": { "line_1": "1 High Street", "postcode": "\(postcode)" }
+            }],
+            "overrides": []
+        }
+        """
+        let url = dir.appendingPathComponent("\(documentId).json")
+        try Data(json.utf8).write(to: url)
+        return url
+    }
+
+    private func makeTempDir() throws -> URL {
+        let dir = FileManager.default.temporaryDirectory
+            .appendingPathComponent("blocking_\(UUID().uuidString)")
+        try FileManager.default.createDirectory(at: dir, withIntermediateDirectories: true)
+        return dir
+    }
+
+    private func ingest(_ db: EntityDatabase, documentId: String, postcode: String,
+                        mrn: String? = nil) throws {
+        let dir = try makeTempDir()
+        defer { try? FileManager.default.removeItem(at: dir) }
+        try db.ingestAddressFile(at: writeDocument(
+            in: dir, documentId: documentId, postcode: postcode, mrn: mrn))
+    }
+
+    @Test func nameVariantIsACandidate() throws {
+        let db = try EntityDatabase()
+        try ingest(db, documentId: "Archer_Tom_150380", postcode: "ZZ1 1AA")
+        try ingest(db, documentId: "Arhcer_Tom_150380", postcode: "ZZ9 9ZZ")
+
+        // Resolution stays exact: two patients, one candidate pair
+        #expect(try db.statistics().patientCount == 2)
+        let candidates = try db.mergeCandidates()
+        #expect(candidates.count == 1)
+        #expect(candidates[0].dateOfBirthMatch == .same)
+    }
+
+    @Test func dobTypoAtSameAddressIsACandidate() throws {
+        let db = try EntityDatabase()
+        try ingest(db, documentId: "Archer_Tom_150380", postcode: "ZZ1 1AA")
+        try ingest(db, documentId: "Archer_Tom_160380", postcode: "ZZ1 1AA")
+
+        let candidates = try db.mergeCandidates()
+        #expect(candidates.count == 1)
+        #expect(candidates[0].dateOfBirthMatch == .near)
+        #expect(candidates[0].sharedKeys == ["postcode:ZZ11AA:t"])
+    }
+
+    @Test func sharedMRNIsACandidate() throws {
+        let db = try EntityDatabase()
+        try ingest(db, documentId: "Archer_Tom_150380", postcode: "ZZ1 1AA", mrn: "H123456")
+        try ingest(db, documentId: "Archer_Thomas_011279", postcode: "ZZ9 9ZZ", mrn: "h123456")
+
+        let candidates = try db.mergeCandidates()
+        #expect(candidates.count == 1)
+        #expect(candidates[0].sharedKeys.contains("mrn:H123456"))
+
+        let patientId = try #require(candidates[0].patient.id)
+        #expect(try db.mergeCandidates(forPatient: patientId).count == 1)
+    }
+
+    @Test func sameNameDifferentDobIsNotACandidate() throws {
+        // Scenario 15: two real people with the same name
+        let db = try EntityDatabase()
+        for name in ["Nash_Kate_120590.json", "Nash_Kate_040302.json"] {
+            try db.ingestAddressFile(at: URL(fileURLWithPath:
+                Self.fixturesPath + "/addresses/" + name))
+        }
+        #expect(try db.statistics().patientCount == 2)
+        #expect(try db.mergeCandidates().isEmpty)
+    }
+
+    @Test func removedPatientLeavesNoBlocks() throws {
+        let dir = try makeTempDir()
+        defer { try? FileManager.default.removeItem(at: dir) }
+        try writeDocument(in: dir, documentId: "Archer_Tom_150380", postcode: "ZZ1 1AA")
+        let variant = try writeDocument(in: dir, documentId: "Arhcer_Tom_150380",
+                                        postcode: "ZZ1 1AA")
+
+        let db = try EntityDatabase()
+        _ = try db.ingestChanges(inDirectory: dir)
+        #expect(try db.mergeCandidates().count == 1)
+
+        try FileManager.default.removeItem(at: variant)
+        _ = try db.ingestChanges(inDirectory: dir)
+        #expect(try db.statistics().patientCount == 1)
+        #expect(try db.mergeCandidates().isEmpty)
+    }
+}
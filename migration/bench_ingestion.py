@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Benchmark entity ingestion: backend_db.py (BackendDatabase) vs the Swift
+EntityDatabase (`yiana-extract --ingest-all`).
+
+Each engine ingests the same address directories into a fresh SQLite DB,
+in its own child process so start-up and peak memory are measured the same
+way for both. The corpora are the 55-file correctness fixtures plus load
+corpora of the requested sizes from generate_entity_load_fixtures.py
+(fixed seed, cached under --work-dir between runs).
+
+Reported per corpus and engine: wall time, files/sec, pages/sec, peak RSS,
+final DB size (including any WAL), and the entity row counts. Counts are
+checked against fixtures/entity/expected.json for the fixtures, and against
+the generator's document total for load corpora; engines that ingested the
+same corpus must also agree with each other.
+
+Results are written as a JSON baseline (--output) with stable key order,
+so baselines from different releases diff cleanly; --baseline compares a
+run against an earlier one.
+
+Usage:
+    python3 migration/bench_ingestion.py --swift-bin .build/release/yiana-extract
+    python3 migration/bench_ingestion.py --sizes 1000,10000,100000 \\
+        --output migration/validation/ingestion_baseline.json
+    python3 migration/bench_ingestion.py --engines python --sizes 10000 \\
+        --baseline migration/validation/ingestion_baseline.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures" / "entity"
+EXPECTED_PATH = FIXTURES_DIR / "expected.json"
+GENERATOR = Path(__file__).parent / "generate_entity_load_fixtures.py"
+DEFAULT_WORK_DIR = Path(__file__).parent / ".cache" / "bench_ingestion"
+
+ENGINES = ("python", "swift")
+# Tables both engines create; counted after every run
+COUNT_TABLES = (
+    "documents", "patients", "practitioners",
+    "patient_documents", "patient_practitioners", "extractions",
+)
+# Generator parameters for load corpora; part of the cache key and the baseline
+LOAD_SEED = 1
+LOAD_MAX_PAGES = 4
+
+
+def run_python_worker(addresses_dir: str, db_path: str) -> None:
+    """Child-process entry point: ingest addresses_dir with BackendDatabase."""
+    sys.path.insert(0, str(Path(__file__).parent.parent / "AddressExtractor"))
+    from backend_db import BackendDatabase
+
+    db = BackendDatabase(db_path=db_path)
+    db.connect()
+    db.init_schema()
+    db.ingest_directory(addresses_dir=addresses_dir)
+
+
+def engine_command(engine: str, addresses_dir: Path, db_path: Path, swift_bin) -> list[str]:
+    if engine == "python":
+        return [sys.executable, __file__, "--python-worker", str(addresses_dir), str(db_path)]
+    return [str(swift_bin), "--ingest-all", str(addresses_dir), "--entity-db", str(db_path)]
+
+
+def max_rss_bytes(usage) -> int:
+    # ru_maxrss is bytes on macOS, kilobytes on Linux
+    if sys.platform == "darwin":
+        return usage.ru_maxrss
+    return usage.ru_maxrss * 1024
+
+
+def run_engine(cmd: list[str]) -> tuple[float, int, int, str]:
+    """Run one ingestion child. Returns (seconds, exit status, peak RSS, stderr tail)."""
+    start = time.perf_counter()
+    with tempfile.TemporaryFile() as err:
+        proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=err)
+        # wait4 gives this child's own rusage, not the running max over all children
+        _, status, usage = os.wait4(proc.pid, 0)
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        elapsed = time.perf_counter() - start
+        err.seek(0)
+        tail = err.read()[-2000:].decode("utf-8", "replace").strip()
+    return elapsed, proc.returncode, max_rss_bytes(usage), tail
+
+
+def db_size(db_path: Path) -> int:
+    return sum(
+        p.stat().st_size
+        for p in (db_path, Path(f"{db_path}-wal"))
+        if p.exists()
+    )
+
+
+def count_entities(db_path: Path) -> dict:
+    import sqlite3
+    conn = sqlite3.connect(db_path)
+    try:
+        tables = {row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table'")}
+        return {
+            table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in COUNT_TABLES if table in tables
+        }
+    finally:
+        conn.close()
+
+
+def corpus_files(addresses_dir: Path) -> list[Path]:
+    """Address files the engines ingest (override sidecars are skipped)."""
+    return sorted(
+        p for p in addresses_dir.glob("*.json") if ".overrides." not in p.name
+    )
+
+
+def count_pages(addresses_dir: Path) -> int:
+    pages = 0
+    for path in corpus_files(addresses_dir):
+        with open(path) as f:
+            pages += len(json.load(f).get("pages", []))
+    return pages
+
+
+def fixture_corpus() -> dict:
+    with open(EXPECTED_PATH) as f:
+        totals = json.load(f)["totals"]
+    addresses_dir = FIXTURES_DIR / "addresses"
+    return {
+        "name": "entity_fixtures",
+        "addresses_dir": addresses_dir,
+        "files": len(corpus_files(addresses_dir)),
+        "pages": count_pages(addresses_dir),
+        "expected": {
+            "documents": totals["expected_total_documents"],
+            "patients": totals["expected_total_patients"],
+            "practitioners": totals["expected_total_practitioners"],
+        },
+    }
+
+
+def load_corpus(size: int, work_dir: Path) -> dict:
+    """Generate (or reuse) a load corpus of `size` documents."""
+    out = work_dir / f"load_{size}_s{LOAD_SEED}_p{LOAD_MAX_PAGES}"
+    summary_path = out / "summary.json"
+    if not summary_path.exists():
+        if out.exists():
+            shutil.rmtree(out)
+        print(f"Generating {size} documents in {out}...")
+        subprocess.run(
+            [sys.executable, str(GENERATOR), "--out", str(out),
+             "--documents", str(size), "--seed", str(LOAD_SEED),
+             "--max-pages", str(LOAD_MAX_PAGES), "--indent", "0"],
+            check=True, stdout=subprocess.DEVNULL,
+        )
+    with open(summary_path) as f:
+        totals = json.load(f)["totals"]
+    return {
+        "name": f"load_{size}",
+        "addresses_dir": out / "addresses",
+        "files": totals["documents"],
+        "pages": totals["pages"],
+        # Name variants and DOB typos are meant to split patients, so only
+        # the document total is fixed; patients are checked across engines
+        "expected": {"documents": totals["documents"]},
+    }
+
+
+def check_counts(counts: dict, expected: dict) -> list[str]:
+    return [
+        f"{table}: got {counts.get(table)}, expected {want}"
+        for table, want in expected.items()
+        if counts.get(table) != want
+    ]
+
+
+def bench_corpus(corpus: dict, engines, swift_bin, repeat: int, keep_dbs: Path | None) -> list[dict]:
+    runs = []
+    for engine in engines:
+        best = None
+        for attempt in range(repeat):
+            db_dir = Path(tempfile.mkdtemp(prefix="bench_ingestion_"))
+            db_path = db_dir / f"{corpus['name']}_{engine}.db"
+            cmd = engine_command(engine, corpus["addresses_dir"], db_path, swift_bin)
+            seconds, status, rss, stderr = run_engine(cmd)
+            if status != 0:
+                shutil.rmtree(db_dir)
+                print(f"  {engine}: FAILED (exit {status})")
+                if stderr:
+                    print("    " + stderr.splitlines()[-1])
+                best = {"engine": engine, "error": f"exit {status}"}
+                break
+            result = {
+                "engine": engine,
+                "seconds": round(seconds, 3),
+                "files_per_sec": round(corpus["files"] / seconds, 1),
+                "pages_per_sec": round(corpus["pages"] / seconds, 1),
+                "peak_rss_mb": round(rss / (1024 * 1024), 1),
+                "db_bytes": db_size(db_path),
+                "counts": count_entities(db_path),
+            }
+            if keep_dbs is not None and attempt == 0:
+                keep_dbs.mkdir(parents=True, exist_ok=True)
+                shutil.copy2(db_path, keep_dbs / db_path.name)
+            shutil.rmtree(db_dir)
+            if best is None or result["seconds"] < best["seconds"]:
+                best = result
+        if "error" not in best:
+            best["issues"] = check_counts(best["counts"], corpus["expected"])
+            print(f"  {engine}: {best['seconds']:.2f}s, "
+                  f"{best['files_per_sec']:.0f} files/s, {best['pages_per_sec']:.0f} pages/s, "
+                  f"peak {best['peak_rss_mb']:.0f} MB, DB {best['db_bytes'] / 1e6:.1f} MB"
+                  f"{'' if not best['issues'] else ' — COUNT MISMATCH'}")
+        runs.append(best)
+
+    # Engines that both completed must have resolved the same entities
+    done = [r for r in runs if "error" not in r]
+    if len(done) > 1:
+        reference = done[0]
+        for other in done[1:]:
+            for table in ("patients", "practitioners", "patient_practitioners"):
+                a, b = reference["counts"].get(table), other["counts"].get(table)
+                if a != b:
+                    other["issues"].append(
+                        f"{table}: {other['engine']} has {b}, {reference['engine']} has {a}")
+    return runs
+
+
+def compare_baseline(result: dict, baseline_path: Path, tolerance: float) -> list[str]:
+    """Print throughput against an earlier baseline; return regressions beyond tolerance."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    previous = {
+        (c["name"], r["engine"]): r
+        for c in baseline["corpora"] for r in c["runs"] if "error" not in r
+    }
+    regressions = []
+    print(f"\nAgainst baseline {baseline_path} ({baseline.get('created', '?')}):")
+    for corpus in result["corpora"]:
+        for run in corpus["runs"]:
+            old = previous.get((corpus["name"], run["engine"]))
+            if old is None or "error" in run:
+                continue
+            change = run["files_per_sec"] / old["files_per_sec"] - 1
+            rss_change = run["peak_rss_mb"] - old["peak_rss_mb"]
+            print(f"  {corpus['name']:<18} {run['engine']:<7} "
+                  f"{old['files_per_sec']:>9.0f} -> {run['files_per_sec']:>9.0f} files/s "
+                  f"({change:+.1%}), peak RSS {rss_change:+.0f} MB")
+            if change < -tolerance:
+                regressions.append(f"{corpus['name']}/{run['engine']}: files/s {change:+.1%}")
+            if run["counts"] != old["counts"]:
+                regressions.append(f"{corpus['name']}/{run['engine']}: entity counts changed")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--engines", default=",".join(ENGINES),
+                        help="Comma-separated engines to run (python, swift)")
+    parser.add_argument("--swift-bin", type=Path, help="Path to the yiana-extract binary")
+    parser.add_argument("--sizes", default="1000,10000",
+                        help="Comma-separated load corpus sizes in documents (empty for none)")
+    parser.add_argument("--no-fixtures", action="store_true",
+                        help="Skip the 55-file correctness fixtures")
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="Runs per corpus and engine; the fastest is reported")
+    parser.add_argument("--work-dir", type=Path, default=DEFAULT_WORK_DIR,
+                        help="Where generated load corpora are cached")
+    parser.add_argument("--keep-dbs", type=Path, help="Copy each engine's DB here for inspection")
+    parser.add_argument("--output", type=Path, help="Write the JSON baseline here")
+    parser.add_argument("--baseline", type=Path, help="Compare against an earlier JSON baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Allowed files/sec drop against --baseline (default 0.2 = 20%%)")
+    parser.add_argument("--python-worker", nargs=2, metavar=("DIR", "DB"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.python_worker:
+        run_python_worker(*args.python_worker)
+        return
+
+    engines = [e.strip() for e in args.engines.split(",") if e.strip()]
+    unknown = set(engines) - set(ENGINES)
+    if unknown:
+        parser.error(f"unknown engine(s): {', '.join(sorted(unknown))}")
+    if "swift" in engines and not args.swift_bin:
+        print("No --swift-bin given; skipping the Swift engine")
+        engines.remove("swift")
+    if not engines:
+        parser.error("no engines to run")
+
+    corpora = []
+    if not args.no_fixtures:
+        if not EXPECTED_PATH.exists():
+            print(f"ERROR: {EXPECTED_PATH} not found. Run generate_entity_fixtures.py first.")
+            sys.exit(1)
+        corpora.append(fixture_corpus())
+    for size in (int(s) for s in args.sizes.split(",") if s.strip()):
+        corpora.append(load_corpus(size, args.work_dir))
+
+    result = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "environment": {
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "python": platform.python_version(),
+            "swift_bin": str(args.swift_bin) if "swift" in engines else None,
+        },
+        "load_corpus": {"seed": LOAD_SEED, "max_pages": LOAD_MAX_PAGES},
+        "corpora": [],
+    }
+    failed = False
+    for corpus in corpora:
+        print(f"\n{corpus['name']}: {corpus['files']} files, {corpus['pages']} pages")
+        runs = bench_corpus(corpus, engines, args.swift_bin, args.repeat, args.keep_dbs)
+        for run in runs:
+            if "error" in run or run["issues"]:
+                failed = True
+                for issue in run.get("issues", []):
+                    print(f"    {run['engine']}: {issue}")
+        result["corpora"].append({
+            "name": corpus["name"],
+            "files": corpus["files"],
+            "pages": corpus["pages"],
+            "expected": corpus["expected"],
+            "runs": runs,
+        })
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+            f.write("\n")
+        print(f"\nBaseline written to {args.output}")
+
+    if args.baseline:
+        regressions = compare_baseline(result, args.baseline, args.tolerance)
+        for regression in regressions:
+            print(f"  REGRESSION {regression}")
+        failed = failed or bool(regressions)
+
+    print(f"\n{'FAIL' if failed else 'PASS'}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
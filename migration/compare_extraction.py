@@ -11,17 +11,77 @@ Usage:
         --swift-bin /path/to/yiana-extract \
         --db-path /path/to/nhs_lookup.db \
         --report-dir migration/validation_report/
+
+    # Head-to-head: run the current Python cascade live instead of
+    # reading .addresses/ (needs AddressExtractor/ alongside migration/)
+    python3 compare_extraction.py --ocr-dir ... --python-live \
+        --swift-bin /path/to/yiana-extract --report-dir ... --no-cache
+
+    # OCR from a pack built by ocr_pack.py instead of one file per document
+    python3 compare_extraction.py --ocr-pack migration/.cache/ocr_results.ocrpack \
+        --addr-dir .addresses/ --swift-bin ... --report-dir ...
+
+    # Sharded: run each slice anywhere, then merge the report dirs
+    python3 compare_extraction.py ... --shard 1/4 --report-dir shard1/
+    python3 compare_extraction.py merge shard1/ shard2/ shard3/ shard4/ \
+        --report-dir migration/validation_report/
+
+Documents flow through an asyncio pipeline: file reads, Swift runs and
+comparisons for up to --concurrency documents overlap, while a single
+writer consumes results in document order, so the report is identical to
+a serial run (--concurrency 1). Extraction runs in a pool of long-lived
+`yiana-extract --batch` workers (--workers, default: one per CPU), so
+process startup and NHS DB loading are paid once per worker rather than
+once per document. Use --one-shot for binaries that predate batch mode.
+
+Runs are incremental. Swift outputs are cached in
+migration/.cache/extraction.sqlite, keyed by the OCR file, the
+yiana-extract binary and the NHS DB, and per-document comparison results
+are cached against the Swift output key and the Python address file. A
+rerun only re-extracts and re-compares documents whose inputs changed.
+Pass --no-cache to disable.
+
+Each extracted document's wall time is written to timings.jsonl with its
+extraction method and result category, and latency.txt summarises the
+distribution per method along with the slowest documents. Timings are
+kept out of summary.txt, which stays identical across runs; documents
+served from the cache are not timed, so use --no-cache for a full profile.
+
+With --python-live the Python side is not read from --addr-dir: the
+cascade from validate_extraction.py runs on the same OCR file in a
+process pool (--python-workers) while the Swift workers run, and both
+sides are timed. The live cascade does no NHS lookup, so nhs_candidates
+favours Swift when --db-path is given.
+
+With --ocr-pack, documents are read from the memory-mapped pack rather
+than opened one by one from --ocr-dir. Only page text is sent: batch
+workers receive it inline in the request, one-shot runs on stdin, and the
+live Python cascade reads the pack itself.
 """
 
 import argparse
+import asyncio
+import hashlib
+import heapq
 import json
 import os
 import re
-import subprocess
 import sys
+import time
 from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+from extraction_cache import (
+    DEFAULT_CACHE_PATH, DEFAULT_MAX_BYTES, MISS, ExtractionCache, cache_key, file_hash,
+    source_hash,
+)
+from ocr_pack import OCRPack
+
+# Part of every cache key. Bump to invalidate cached Swift outputs when the
+# CLI's behaviour changes in a way the binary hash cannot see.
+RULESET_VERSION = 1
+
 
 # Python method name -> normalised name
 METHOD_MAP = {
@@ -199,206 +259,882 @@ def classify_document(page_results):
     return "different"
 
 
-def run_swift_extraction(ocr_path, swift_bin, db_path):
-    """Run yiana-extract CLI on an OCR file. Returns parsed JSON or None."""
+async def run_swift_extraction(ocr_path, swift_bin, db_path, timeout=30, ocr=None):
+    """Run yiana-extract CLI on an OCR file, or on the OCR document ocr if
+    given. Returns parsed JSON or None."""
     try:
-        with open(ocr_path) as f:
-            ocr_data = f.read()
+        if ocr is not None:
+            ocr_data = json.dumps(ocr).encode("utf-8")
+        else:
+            ocr_data = await asyncio.to_thread(Path(ocr_path).read_bytes)
         cmd = [swift_bin]
         if db_path:
             cmd += ["--db-path", db_path]
         # Pass the filename stem as document ID (matches app behaviour)
         stem = Path(ocr_path).stem
         cmd += ["--document-id", stem]
-        result = subprocess.run(
-            cmd, input=ocr_data, capture_output=True, text=True, timeout=30
+        proc = await asyncio.create_subprocess_exec(
+            *cmd, stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL,
         )
-        if result.returncode != 0:
+        try:
+            stdout, _ = await asyncio.wait_for(proc.communicate(ocr_data), timeout)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
             return None
-        return json.loads(result.stdout)
-    except (subprocess.TimeoutExpired, json.JSONDecodeError, OSError):
+        if proc.returncode != 0:
+            return None
+        return json.loads(stdout)
+    except (json.JSONDecodeError, OSError):
         return None
 
 
+class SwiftWorker:
+    """One long-lived `yiana-extract --batch` process.
+
+    Requests are JSON lines ({"id", "path" or "ocr", "documentId"}); each
+    gets one response line ({"id", "result"} or {"id", "error"}).
+    """
+
+    # Largest response line accepted from the worker
+    LINE_LIMIT = 64 * 1024 * 1024
+
+    def __init__(self, swift_bin, db_path):
+        self.cmd = [swift_bin, "--batch"]
+        if db_path:
+            self.cmd += ["--db-path", db_path]
+        self.proc = None
+        self._last_id = 0
+
+    async def start(self):
+        self.proc = await asyncio.create_subprocess_exec(
+            *self.cmd, stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL,
+            limit=self.LINE_LIMIT,
+        )
+
+    async def extract(self, ocr_path, ocr=None):
+        """Return the parsed output, or None if the CLI reported an error.
+
+        With ocr, that document is sent inline and ocr_path only names it.
+
+        Raises if the worker itself fails (exit, garbled or mismatched
+        response); the caller should restart it.
+        """
+        self._last_id += 1
+        # Pass the filename stem as document ID (matches app behaviour)
+        request = {"id": self._last_id, "documentId": Path(ocr_path).stem}
+        if ocr is not None:
+            request["ocr"] = ocr
+        else:
+            request["path"] = str(ocr_path)
+        request = json.dumps(request)
+        self.proc.stdin.write(request.encode("utf-8") + b"\n")
+        await self.proc.stdin.drain()
+        line = await self.proc.stdout.readline()
+        if not line:
+            raise EOFError("worker exited")
+        response = json.loads(line)
+        if response.get("id") != self._last_id:
+            raise ValueError("out-of-order response")
+        return response.get("result")
+
+    async def restart(self):
+        await self.close()
+        await self.start()
+
+    async def close(self):
+        if self.proc is None or self.proc.returncode is not None:
+            return
+        try:
+            self.proc.stdin.close()
+            await asyncio.wait_for(self.proc.wait(), 5)
+        except (asyncio.TimeoutError, OSError):
+            self.proc.kill()
+            await self.proc.wait()
+
+
+class SwiftWorkerPool:
+    """Pool of SwiftWorkers, each handling one document at a time."""
+
+    def __init__(self, swift_bin, db_path, size, timeout=30):
+        self.workers = [SwiftWorker(swift_bin, db_path) for _ in range(size)]
+        self.timeout = timeout
+        self._idle = asyncio.Queue()
+        self._started = False
+        self._start_lock = asyncio.Lock()
+
+    async def start(self):
+        """Launch the workers. Called on first use, so a run served entirely
+        from the cache never starts a Swift process."""
+        async with self._start_lock:
+            if self._started:
+                return
+            for worker in self.workers:
+                await worker.start()
+                self._idle.put_nowait(worker)
+            self._started = True
+
+    async def extract(self, ocr_path, ocr=None):
+        """Return (Swift output or None on error/timeout, seconds taken).
+
+        The time covers the worker's request only, not waiting for an idle
+        worker, so it is comparable with a one-shot run minus startup.
+        """
+        await self.start()
+        worker = await self._idle.get()
+        started = time.perf_counter()
+        try:
+            doc = await asyncio.wait_for(worker.extract(ocr_path, ocr), self.timeout)
+            return doc, time.perf_counter() - started
+        except (asyncio.TimeoutError, EOFError, OSError, ValueError):
+            # Worker state is unknown after a failure: replace the process
+            elapsed = time.perf_counter() - started
+            await worker.restart()
+            return None, elapsed
+        finally:
+            self._idle.put_nowait(worker)
+
+    async def close(self):
+        for worker in self.workers:
+            await worker.close()
+
+
+async def swift_cache_key(ocr_path, salt, pack=None):
+    """Cache key for one document's Swift output.
+
+    salt identifies the binary and NHS DB (see swift_cache_salt()). With a
+    pack, the document's pack record stands in for the OCR file.
+    """
+    # The filename stem is passed as --document-id, so it is part of the input
+    if pack is not None:
+        record = pack.record(Path(ocr_path).stem)
+        digest = await asyncio.to_thread(lambda: hashlib.sha256(record).hexdigest())
+    else:
+        digest = await asyncio.to_thread(file_hash, ocr_path)
+    return cache_key(digest, Path(ocr_path).stem, salt, RULESET_VERSION)
+
+
+def primary_method(doc):
+    """Extraction method of a document's first page that has one, or None."""
+    for page in doc.get("pages", []):
+        method = (page.get("extraction", {}) or {}).get("method")
+        if method and method != "none":
+            return METHOD_MAP.get(method, method)
+    return None
+
+
+def comparison_to_json(result):
+    """Serialise a compare_document() result for the cache.
+
+    doc_index and timings are left out: they belong to the run, not the
+    inputs.
+    """
+    return {
+        **{k: v for k, v in result.items() if k != "timings"},
+        "field_counts": [[f, c, n] for (f, c), n in result["field_counts"].items()],
+        "method_pairs": [[p, s, n] for (p, s), n in result["method_pairs"].items()],
+        "differences": [
+            {k: v for k, v in d.items() if k != "doc_index"}
+            for d in result["differences"]
+        ],
+    }
+
+
+def comparison_from_json(data, doc_index):
+    """Inverse of comparison_to_json(), stamped with this run's doc_index."""
+    return {
+        **data,
+        "field_counts": Counter({(f, c): n for f, c, n in data["field_counts"]}),
+        "method_pairs": Counter({(p, s): n for p, s, n in data["method_pairs"]}),
+        "differences": [{"doc_index": doc_index, **d} for d in data["differences"]],
+    }
+
+
+def swift_cache_salt(swift_bin, db_path):
+    """Cache key component identifying the extractor binary and NHS DB."""
+    return cache_key(
+        file_hash(swift_bin), file_hash(db_path) if db_path else "no-db"
+    )
+
+
+def read_bytes(path):
+    """File contents, or None if it cannot be read."""
+    try:
+        return Path(path).read_bytes()
+    except OSError:
+        return None
+
+
+def parse_json(data):
+    """Parse JSON bytes, or None if missing or invalid."""
+    if data is None:
+        return None
+    try:
+        return json.loads(data)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None
+
+
+# Fields counted for a page only one side extracted
+EXTRA_PAGE_FIELDS = [
+    "patient.full_name", "patient.date_of_birth",
+    "address.postcode", "extraction.method",
+]
+
+
+def compare_document(doc_index, python_doc, swift_doc):
+    """Compare one document's Python and Swift outputs.
+
+    Pure function of its inputs. Returns a dict of the document's
+    contribution to the report: its category, field/method counters, page
+    tallies and anonymised difference records.
+    """
+    field_counts = Counter()  # (field, category) -> count
+    method_pairs = Counter()  # (python_method, swift_method) -> count
+    differences = []
+    pages_compared = 0
+    swift_extra = 0
+    python_extra = 0
+
+    # Build page maps (by page_number)
+    python_pages = {
+        p["page_number"]: p for p in python_doc.get("pages", [])
+    }
+    swift_pages = {
+        p["page_number"]: p for p in swift_doc.get("pages", [])
+    }
+
+    all_page_nums = sorted(set(python_pages) | set(swift_pages))
+    page_results = {}
+
+    for pn in all_page_nums:
+        py_page = python_pages.get(pn)
+        sw_page = swift_pages.get(pn)
+
+        if py_page and not sw_page:
+            python_extra += 1
+            # Count all Python fields as python_better
+            page_results[pn] = {f: "python_better" for f in EXTRA_PAGE_FIELDS}
+            field_counts.update(page_results[pn].items())
+            continue
+
+        if sw_page and not py_page:
+            swift_extra += 1
+            page_results[pn] = {f: "swift_better" for f in EXTRA_PAGE_FIELDS}
+            field_counts.update(page_results[pn].items())
+            continue
+
+        # Both have this page — compare field by field
+        pages_compared += 1
+        fields = compare_page(py_page, sw_page)
+        page_results[pn] = fields
+        field_counts.update(fields.items())
+
+        # Track method confusion
+        py_method = METHOD_MAP.get(
+            (py_page.get("extraction", {}) or {}).get("method", "none"),
+            (py_page.get("extraction", {}) or {}).get("method", "none"),
+        )
+        sw_method = (sw_page.get("extraction", {}) or {}).get("method", "none")
+        method_pairs[(py_method, sw_method)] += 1
+
+        # Record differences (anonymised — use index not filename)
+        for field, cat in fields.items():
+            if cat not in ("match", "both_empty"):
+                differences.append({
+                    "doc_index": doc_index,
+                    "page": pn,
+                    "field": field,
+                    "category": cat,
+                })
+
+    return {
+        "category": classify_document(page_results),
+        "method": primary_method(swift_doc) or primary_method(python_doc) or "none",
+        "field_counts": field_counts,
+        "method_pairs": method_pairs,
+        "pages_compared": pages_compared,
+        "swift_extra_pages": swift_extra,
+        "python_extra_pages": python_extra,
+        "differences": differences,
+    }
+
+
+async def run_ordered(items, process, concurrency, on_result):
+    """Run process(index, item) concurrently, handing results over in order.
+
+    At most `concurrency` documents are in flight or waiting to be written
+    at any time: a slot is only freed once on_result has consumed the
+    result, so memory stays bounded even when an early document is slow.
+    """
+    slots = asyncio.Semaphore(concurrency)
+    queue = asyncio.Queue()
+
+    async def feed():
+        for i, item in enumerate(items):
+            await slots.acquire()
+            queue.put_nowait(asyncio.create_task(process(i, item)))
+        queue.put_nowait(None)
+
+    feeder = asyncio.create_task(feed())
+    while (task := await queue.get()) is not None:
+        on_result(await task)
+        slots.release()
+    await feeder
+
+
+async def compare_corpus(common, indices, ocr_files, addr_files, args, cache, salt,
+                         on_result, pack=None):
+    """Compare every document in common, calling on_result(i, result) in order.
+
+    indices[i] is the doc_index recorded for common[i]. result is a
+    compare_document() dict, or None if either side could not be loaded or
+    extracted.
+
+    With a cache, Swift outputs are reused while the OCR file, binary and
+    NHS DB are unchanged, and whole comparison results are reused while
+    the Swift output key and the Python output are unchanged, so only
+    affected documents are re-extracted and re-compared. Live Python
+    extraction (--python-live) always runs, since its output is part of
+    the comparison key.
+
+    With pack, OCR is read from it and ocr_files only names documents.
+    Returns the number of reused comparisons.
+    """
+    pool = None
+    if args.one_shot:
+        async def extract(path, ocr=None):
+            started = time.perf_counter()
+            doc = await run_swift_extraction(
+                path, args.swift_bin, args.db_path, args.timeout, ocr
+            )
+            return doc, time.perf_counter() - started
+    else:
+        pool = SwiftWorkerPool(
+            args.swift_bin, args.db_path, size=args.workers, timeout=args.timeout
+        )
+        extract = pool.extract
+
+    python_pool = None
+    if args.python_live:
+        # Imported here: it needs the AddressExtractor sources, which a
+        # comparison against --addr-dir does not
+        from validate_extraction import init_worker, timed_extract_document
+        python_pool = ProcessPoolExecutor(
+            max_workers=args.python_workers, initializer=init_worker,
+            initargs=(None, DEFAULT_MAX_BYTES, args.ocr_pack),
+        )
+        loop = asyncio.get_running_loop()
+
+    async def extract_swift(ocr_path):
+        """extract() on the file, or on the document's page text from the pack."""
+        if pack is None:
+            return await extract(ocr_path)
+        ocr = await asyncio.to_thread(pack.text_document, Path(ocr_path).stem)
+        return await extract(ocr_path, ocr)
+
+    async def load_python(filename):
+        """Python output as raw JSON bytes (their hash keys the comparison)
+        and its extraction time, or None for a stored .addresses/ file."""
+        if python_pool is None:
+            return await asyncio.to_thread(read_bytes, addr_files[filename]), None
+        return await loop.run_in_executor(
+            python_pool, timed_extract_document, str(ocr_files[filename])
+        )
+
+    # This script's comparison rules are part of every comparison key
+    compare_salt = source_hash([Path(__file__)])
+    reused = 0
+
+    async def process(i, filename):
+        nonlocal reused
+        ocr_path = str(ocr_files[filename])
+        timings = {}
+
+        # The Python side runs alongside Swift extraction (or the Swift
+        # cache key's file hash)
+        if cache is None:
+            (python_raw, python_seconds), (swift_doc, timings["swift"]) = (
+                await asyncio.gather(load_python(filename), extract_swift(ocr_path))
+            )
+        else:
+            (python_raw, python_seconds), swift_key = await asyncio.gather(
+                load_python(filename), swift_cache_key(ocr_path, salt, pack)
+            )
+        if python_seconds is not None:
+            timings["python"] = python_seconds
+        if python_raw is None:
+            return i, None
+
+        if cache is None:
+            python_doc = parse_json(python_raw)
+            if python_doc is None or swift_doc is None:
+                return i, None
+            result = compare_document(indices[i], python_doc, swift_doc)
+            result["timings"] = timings
+            return i, result
+
+        # Keyed on the raw bytes, so a reused comparison never parses the
+        # Python output
+        compare_key = cache_key(
+            "comparison", swift_key, hashlib.sha256(python_raw).hexdigest(),
+            compare_salt,
+        )
+        hit = cache.get(compare_key)
+        if hit is not MISS:
+            reused += 1
+            return i, {**comparison_from_json(hit, indices[i]), "timings": timings}
+        python_doc = parse_json(python_raw)
+        if python_doc is None:
+            return i, None
+
+        # Run Swift extraction. Failed runs are not cached, so they are
+        # retried next time. Only documents extracted in this run are timed.
+        swift_doc = cache.get(swift_key)
+        if swift_doc is MISS:
+            swift_doc, timings["swift"] = await extract_swift(ocr_path)
+            if swift_doc is None:
+                return i, None
+            cache.put(swift_key, swift_doc)
+
+        result = compare_document(indices[i], python_doc, swift_doc)
+        cache.put(compare_key, comparison_to_json(result))
+        result["timings"] = timings
+        return i, result
+
+    try:
+        await run_ordered(
+            common, process, args.concurrency, lambda r: on_result(*r)
+        )
+    finally:
+        if pool:
+            await pool.close()
+        if python_pool:
+            python_pool.shutdown(cancel_futures=True)
+    return reused
+
+
+# Aggregate state written next to summary.txt, for `merge`
+STATE_FILE = "state.json"
+DIFFERENCES_FILE = "differences.jsonl"
+TIMINGS_FILE = "timings.jsonl"
+LATENCY_FILE = "latency.txt"
+SLOWEST_DOCS = 10
+
+DOC_CATEGORIES = ["match", "swift_better", "python_better", "different"]
+FIELD_CATEGORIES = ["match", "both_empty", "swift_better", "python_better", "different"]
+
+
+class ComparisonStats:
+    """Report counters, mergeable across shards.
+
+    Every counter is a sum, so merging is addition. The one order-dependent
+    part of the report, tie order in the method confusion matrix, is made
+    order-independent by remembering where each pair was first seen, as
+    (doc_index, position among that document's pairs).
+    """
+
+    def __init__(self):
+        self.documents = 0
+        self.errors = 0
+        self.pages_compared = 0
+        self.swift_extra_pages = 0
+        self.python_extra_pages = 0
+        self.doc_categories = Counter()
+        self.field_categories = defaultdict(Counter)
+        self.method_confusion = Counter()  # (python_method, swift_method) pairs
+        self.method_first_seen = {}  # pair -> (doc_index, position)
+
+    def add(self, doc_index, result):
+        """Fold in one compare_document() result (None = error)."""
+        self.documents += 1
+        if result is None:
+            self.errors += 1
+            return
+        self.doc_categories[result["category"]] += 1
+        for (field, cat), count in result["field_counts"].items():
+            self.field_categories[field][cat] += count
+        for position, (pair, count) in enumerate(result["method_pairs"].items()):
+            self.method_confusion[pair] += count
+            self.method_first_seen.setdefault(pair, (doc_index, position))
+        self.pages_compared += result["pages_compared"]
+        self.swift_extra_pages += result["swift_extra_pages"]
+        self.python_extra_pages += result["python_extra_pages"]
+
+    def merge(self, other):
+        self.documents += other.documents
+        self.errors += other.errors
+        self.pages_compared += other.pages_compared
+        self.swift_extra_pages += other.swift_extra_pages
+        self.python_extra_pages += other.python_extra_pages
+        self.doc_categories.update(other.doc_categories)
+        for field, cats in other.field_categories.items():
+            self.field_categories[field].update(cats)
+        self.method_confusion.update(other.method_confusion)
+        for pair, first in other.method_first_seen.items():
+            self.method_first_seen[pair] = min(
+                first, self.method_first_seen.get(pair, first)
+            )
+
+    def to_dict(self):
+        return {
+            "documents": self.documents,
+            "errors": self.errors,
+            "pages_compared": self.pages_compared,
+            "swift_extra_pages": self.swift_extra_pages,
+            "python_extra_pages": self.python_extra_pages,
+            "doc_categories": dict(self.doc_categories),
+            "field_categories": {f: dict(c) for f, c in self.field_categories.items()},
+            "method_confusion": [
+                [py_m, sw_m, count, list(self.method_first_seen[(py_m, sw_m)])]
+                for (py_m, sw_m), count in self.method_confusion.items()
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls()
+        stats.documents = data["documents"]
+        stats.errors = data["errors"]
+        stats.pages_compared = data["pages_compared"]
+        stats.swift_extra_pages = data["swift_extra_pages"]
+        stats.python_extra_pages = data["python_extra_pages"]
+        stats.doc_categories = Counter(data["doc_categories"])
+        for field, cats in data["field_categories"].items():
+            stats.field_categories[field] = Counter(cats)
+        for py_m, sw_m, count, first in data["method_confusion"]:
+            stats.method_confusion[(py_m, sw_m)] = count
+            stats.method_first_seen[(py_m, sw_m)] = tuple(first)
+        return stats
+
+    def write_summary(self, path):
+        total = self.documents
+        with open(path, "w") as f:
+            f.write(f"Extraction Comparison Report\n")
+            f.write(f"{'=' * 40}\n\n")
+            f.write(f"Documents compared: {total}\n")
+            f.write(f"Errors (could not compare): {self.errors}\n")
+            f.write(f"Pages compared (both have page): {self.pages_compared}\n")
+            f.write(f"Swift extra pages (Swift found, Python didn't): {self.swift_extra_pages}\n")
+            f.write(f"Python extra pages (Python found, Swift didn't): {self.python_extra_pages}\n\n")
+
+            f.write(f"Document-level results:\n")
+            for cat in DOC_CATEGORIES:
+                count = self.doc_categories.get(cat, 0)
+                pct = (count / total * 100) if total else 0
+                f.write(f"  {cat}: {count} ({pct:.1f}%)\n")
+
+            f.write(f"\nField-level breakdown:\n")
+            all_fields = sorted(self.field_categories.keys())
+            for field in all_fields:
+                cats = self.field_categories[field]
+                total_field = sum(cats.values())
+                f.write(f"\n  {field} ({total_field} comparisons):\n")
+                for cat in FIELD_CATEGORIES:
+                    count = cats.get(cat, 0)
+                    pct = (count / total_field * 100) if total_field else 0
+                    if count > 0:
+                        f.write(f"    {cat}: {count} ({pct:.1f}%)\n")
+
+            f.write(f"\nMethod confusion matrix (Python -> Swift):\n")
+            for (py_m, sw_m), count in sorted(
+                self.method_confusion.items(),
+                key=lambda x: (-x[1], self.method_first_seen[x[0]]),
+            ):
+                f.write(f"  {py_m} -> {sw_m}: {count}\n")
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an ascending list."""
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def write_latency(timings_path, path):
+    """Write latency distributions from a timings.jsonl file.
+
+    For each engine: overall and per-method count, mean, p50/p90/p99 and
+    max wall time, then the slowest documents (by doc_index, no PII).
+    """
+    by_engine = defaultdict(lambda: defaultdict(list))  # engine -> method -> s
+    both = defaultdict(list)  # method -> (python s, swift s), timed by both
+    slowest = defaultdict(list)  # engine -> heap of (seconds, -doc_index, method)
+    with open(timings_path) as f:
+        for line in f:
+            record = json.loads(line)
+            timings = record["timings"]
+            if "python" in timings and "swift" in timings:
+                both[record["method"]].append((timings["python"], timings["swift"]))
+            for engine, seconds in timings.items():
+                by_engine[engine][record["method"]].append(seconds)
+                entry = (seconds, -record["doc_index"], record["method"],
+                         record["category"])
+                if len(slowest[engine]) < SLOWEST_DOCS:
+                    heapq.heappush(slowest[engine], entry)
+                else:
+                    heapq.heappushpop(slowest[engine], entry)
+
+    def row(label, values):
+        values.sort()
+        mean = sum(values) / len(values)
+        return (f"  {label:<16} {len(values):>6} {mean * 1000:>9.1f}"
+                f" {percentile(values, 50) * 1000:>9.1f}"
+                f" {percentile(values, 90) * 1000:>9.1f}"
+                f" {percentile(values, 99) * 1000:>9.1f}"
+                f" {values[-1] * 1000:>9.1f}\n")
+
+    with open(path, "w") as f:
+        f.write(f"Extraction Latency Report (wall time per document, ms)\n")
+        f.write(f"{'=' * 40}\n")
+        if not by_engine:
+            f.write(f"\nNo documents were timed (all results came from the cache).\n")
+        for engine in sorted(by_engine):
+            methods = by_engine[engine]
+            f.write(f"\n{engine}:\n")
+            f.write(f"  {'method':<16} {'n':>6} {'mean':>9} {'p50':>9}"
+                    f" {'p90':>9} {'p99':>9} {'max':>9}\n")
+            f.write(row("all", [s for v in methods.values() for s in v]))
+            for method in sorted(methods, key=lambda m: (-len(methods[m]), m)):
+                f.write(row(method, methods[method]))
+            f.write(f"\n  Slowest documents:\n")
+            for seconds, neg_index, method, category in sorted(slowest[engine], reverse=True):
+                f.write(f"    doc {-neg_index}: {seconds * 1000:.1f} ms"
+                        f" ({method}, {category})\n")
+
+        if both:
+            f.write(f"\nPython vs Swift (documents timed by both, total ms):\n")
+            f.write(f"  {'method':<16} {'n':>6} {'python':>10} {'swift':>10}"
+                    f" {'speed-up':>9}\n")
+            rows = [("all", [p for v in both.values() for p in v])]
+            rows += [(m, both[m]) for m in sorted(both, key=lambda m: (-len(both[m]), m))]
+            for label, pairs in rows:
+                python_total = sum(p for p, _ in pairs)
+                swift_total = sum(s for _, s in pairs)
+                speedup = python_total / swift_total if swift_total else 0
+                f.write(f"  {label:<16} {len(pairs):>6} {python_total * 1000:>10.1f}"
+                        f" {swift_total * 1000:>10.1f} {speedup:>8.2f}x\n")
+
+
+def parse_shard(value):
+    """Parse --shard "i/N" (1-based) into (i, N)."""
+    try:
+        index, count = (int(x) for x in value.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected i/N, got {value!r}")
+    if not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f"shard index must be in 1..{count}")
+    return index, count
+
+
 def main():
     parser = argparse.ArgumentParser(description="Compare Swift vs Python extraction")
-    parser.add_argument("--ocr-dir", required=True)
-    parser.add_argument("--addr-dir", required=True)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--ocr-dir")
+    source.add_argument("--ocr-pack", type=Path, help="OCR pack built by ocr_pack.py")
+    parser.add_argument("--addr-dir", help="Stored Python output (.addresses/)")
     parser.add_argument("--swift-bin", required=True)
     parser.add_argument("--db-path", default=None)
     parser.add_argument("--report-dir", required=True)
     parser.add_argument("--limit", type=int, default=0, help="Limit docs for testing")
+    parser.add_argument(
+        "--cache", type=Path, default=DEFAULT_CACHE_PATH,
+        help=f"Swift output cache (default: {DEFAULT_CACHE_PATH})",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Re-run Swift on every document")
+    parser.add_argument(
+        "--workers", type=int, default=os.cpu_count() or 1,
+        help="Long-lived yiana-extract --batch workers (default: one per CPU)",
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=0,
+        help="Documents in flight at once (default: 2 x workers; 1 = serial)",
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=30,
+        help="Seconds allowed for one document's Swift extraction (default: 30)",
+    )
+    parser.add_argument(
+        "--one-shot", action="store_true",
+        help="Start yiana-extract once per document (binaries without --batch)",
+    )
+    parser.add_argument(
+        "--python-live", action="store_true",
+        help="Run the Python cascade on each OCR file instead of reading --addr-dir",
+    )
+    parser.add_argument(
+        "--python-workers", type=int, default=0,
+        help="Processes running the live Python cascade (default: --workers)",
+    )
+    parser.add_argument(
+        "--shard", type=parse_shard, default=(1, 1), metavar="i/N",
+        help="Compare only the i-th of N interleaved slices (1-based); "
+             "combine shard report dirs with the merge subcommand",
+    )
     args = parser.parse_args()
+    if not args.addr_dir and not args.python_live:
+        parser.error("--addr-dir is required unless --python-live is given")
+    args.workers = max(1, args.workers)
+    if args.python_workers <= 0:
+        args.python_workers = args.workers
+    if args.concurrency <= 0:
+        args.concurrency = 2 * args.workers
 
     os.makedirs(args.report_dir, exist_ok=True)
 
-    # Find matching OCR + addresses files
-    ocr_files = {
-        os.path.basename(f): f
-        for f in Path(args.ocr_dir).glob("*.json")
-    }
-    addr_files = {
-        os.path.basename(f): f
-        for f in Path(args.addr_dir).glob("*.json")
-    }
-    common = sorted(set(ocr_files) & set(addr_files))
+    cache = None if args.no_cache else ExtractionCache(args.cache)
+    salt = swift_cache_salt(args.swift_bin, args.db_path) if cache else ""
+
+    # Find matching OCR + addresses files. Pack documents are named as
+    # their OCR files would be, which is what the .addresses/ files match.
+    pack = None
+    if args.ocr_pack:
+        pack = OCRPack(args.ocr_pack)
+        ocr_files = {f"{doc_id}.json": Path(f"{doc_id}.json") for doc_id in pack.doc_ids()}
+    else:
+        ocr_files = {
+            os.path.basename(f): f
+            for f in Path(args.ocr_dir).glob("*.json")
+        }
+    if args.python_live:
+        addr_files = {}
+        common = sorted(ocr_files)
+    else:
+        addr_files = {
+            os.path.basename(f): f
+            for f in Path(args.addr_dir).glob("*.json")
+        }
+        common = sorted(set(ocr_files) & set(addr_files))
     if args.limit > 0:
         common = common[: args.limit]
 
-    print(f"Comparing {len(common)} documents...")
+    # doc_index stays the position in the full sorted list, so shard
+    # reports merge back into exactly what an unsharded run writes
+    shard_index, shard_count = args.shard
+    indices = list(range(shard_index - 1, len(common), shard_count))
+    common = [common[i] for i in indices]
+
+    if shard_count > 1:
+        print(f"Shard {shard_index}/{shard_count}: comparing {len(common)} documents...")
+    else:
+        print(f"Comparing {len(common)} documents...")
 
-    # Counters
-    doc_categories = Counter()
-    field_categories = defaultdict(Counter)
-    method_confusion = Counter()  # (python_method, swift_method) pairs
-    errors = 0
-    total_pages_compared = 0
-    swift_extra_pages = 0
-    python_extra_pages = 0
+    stats = ComparisonStats()
 
     # Per-document details (kept in memory, written to local file on Devon)
-    details_path = os.path.join(args.report_dir, "differences.jsonl")
+    details_path = os.path.join(args.report_dir, DIFFERENCES_FILE)
     details_file = open(details_path, "w")
+    timings_path = os.path.join(args.report_dir, TIMINGS_FILE)
+    timings_file = open(timings_path, "w")
 
-    for i, filename in enumerate(common):
+    def on_result(i, result):
+        """Single writer: fold one document's result into the report."""
+        doc_index = indices[i]
         if (i + 1) % 100 == 0:
             print(f"  {i + 1}/{len(common)}...")
+        stats.add(doc_index, result)
+        if result is None:
+            return
+        for record in result["differences"]:
+            details_file.write(json.dumps(record) + "\n")
+        if result["timings"]:
+            timings_file.write(json.dumps({
+                "doc_index": doc_index, "method": result["method"],
+                "category": result["category"], "timings": result["timings"],
+            }) + "\n")
 
-        # Load Python output
-        try:
-            with open(addr_files[filename]) as f:
-                python_doc = json.load(f)
-        except (json.JSONDecodeError, OSError):
-            errors += 1
-            continue
+    started = time.perf_counter()
+    reused = asyncio.run(compare_corpus(
+        common, indices, ocr_files, addr_files, args, cache, salt, on_result, pack
+    ))
+    elapsed = time.perf_counter() - started
+    print(f"Elapsed: {elapsed:.1f}s ({len(common) / elapsed if elapsed else 0:.1f} documents/s)")
 
-        # Run Swift extraction
-        swift_doc = run_swift_extraction(
-            str(ocr_files[filename]), args.swift_bin, args.db_path
-        )
-        if swift_doc is None:
-            errors += 1
-            continue
+    details_file.close()
+    timings_file.close()
+    if pack:
+        pack.close()
+    if cache:
+        cache.close()
+        print(f"Cache: {reused} comparisons reused, "
+              f"{cache.hits} hits, {cache.misses} misses")
 
-        # Build page maps (by page_number)
-        python_pages = {
-            p["page_number"]: p for p in python_doc.get("pages", [])
-        }
-        swift_pages = {
-            p["page_number"]: p for p in swift_doc.get("pages", [])
-        }
+    with open(os.path.join(args.report_dir, STATE_FILE), "w") as f:
+        json.dump({"shard": [shard_index, shard_count], **stats.to_dict()}, f)
 
-        all_page_nums = sorted(set(python_pages) | set(swift_pages))
-        page_results = {}
-
-        for pn in all_page_nums:
-            py_page = python_pages.get(pn)
-            sw_page = swift_pages.get(pn)
-
-            if py_page and not sw_page:
-                python_extra_pages += 1
-                # Count all Python fields as python_better
-                page_results[pn] = {
-                    f: "python_better"
-                    for f in [
-                        "patient.full_name", "patient.date_of_birth",
-                        "address.postcode", "extraction.method",
-                    ]
-                }
-                for field, cat in page_results[pn].items():
-                    field_categories[field][cat] += 1
-                continue
-
-            if sw_page and not py_page:
-                swift_extra_pages += 1
-                page_results[pn] = {
-                    f: "swift_better"
-                    for f in [
-                        "patient.full_name", "patient.date_of_birth",
-                        "address.postcode", "extraction.method",
-                    ]
-                }
-                for field, cat in page_results[pn].items():
-                    field_categories[field][cat] += 1
-                continue
-
-            # Both have this page — compare field by field
-            total_pages_compared += 1
-            fields = compare_page(py_page, sw_page)
-            page_results[pn] = fields
-
-            for field, cat in fields.items():
-                field_categories[field][cat] += 1
-
-            # Track method confusion
-            py_method = METHOD_MAP.get(
-                (py_page.get("extraction", {}) or {}).get("method", "none"),
-                (py_page.get("extraction", {}) or {}).get("method", "none"),
-            )
-            sw_method = (sw_page.get("extraction", {}) or {}).get("method", "none")
-            method_confusion[(py_method, sw_method)] += 1
-
-            # Write differences (anonymised — use index not filename)
-            for field, cat in fields.items():
-                if cat not in ("match", "both_empty"):
-                    details_file.write(
-                        json.dumps({
-                            "doc_index": i,
-                            "page": pn,
-                            "field": field,
-                            "category": cat,
-                        })
-                        + "\n"
-                    )
-
-        doc_cat = classify_document(page_results)
-        doc_categories[doc_cat] += 1
+    finish_report(stats, args.report_dir)
 
-    details_file.close()
 
-    # Write summary report
-    total = len(common)
-    summary_path = os.path.join(args.report_dir, "summary.txt")
-    with open(summary_path, "w") as f:
-        f.write(f"Extraction Comparison Report\n")
-        f.write(f"{'=' * 40}\n\n")
-        f.write(f"Documents compared: {total}\n")
-        f.write(f"Errors (could not compare): {errors}\n")
-        f.write(f"Pages compared (both have page): {total_pages_compared}\n")
-        f.write(f"Swift extra pages (Swift found, Python didn't): {swift_extra_pages}\n")
-        f.write(f"Python extra pages (Python found, Swift didn't): {python_extra_pages}\n\n")
-
-        f.write(f"Document-level results:\n")
-        for cat in ["match", "swift_better", "python_better", "different"]:
-            count = doc_categories.get(cat, 0)
-            pct = (count / total * 100) if total else 0
-            f.write(f"  {cat}: {count} ({pct:.1f}%)\n")
-
-        f.write(f"\nField-level breakdown:\n")
-        all_fields = sorted(field_categories.keys())
-        for field in all_fields:
-            cats = field_categories[field]
-            total_field = sum(cats.values())
-            f.write(f"\n  {field} ({total_field} comparisons):\n")
-            for cat in ["match", "both_empty", "swift_better", "python_better", "different"]:
-                count = cats.get(cat, 0)
-                pct = (count / total_field * 100) if total_field else 0
-                if count > 0:
-                    f.write(f"    {cat}: {count} ({pct:.1f}%)\n")
-
-        f.write(f"\nMethod confusion matrix (Python -> Swift):\n")
-        for (py_m, sw_m), count in sorted(
-            method_confusion.items(), key=lambda x: -x[1]
-        ):
-            f.write(f"  {py_m} -> {sw_m}: {count}\n")
+def finish_report(stats, report_dir):
+    """Write summary.txt and latency.txt and echo them to the console."""
+    summary_path = os.path.join(report_dir, "summary.txt")
+    latency_path = os.path.join(report_dir, LATENCY_FILE)
+    stats.write_summary(summary_path)
+    write_latency(os.path.join(report_dir, TIMINGS_FILE), latency_path)
 
     print(f"\nDone. Report written to {summary_path}")
-    print(f"Details written to {details_path}")
+    print(f"Details written to {os.path.join(report_dir, DIFFERENCES_FILE)}")
 
     # Print summary to console too
-    with open(summary_path) as f:
-        print(f.read())
+    for path in (summary_path, latency_path):
+        with open(path) as f:
+            print(f.read())
+
+
+def merge_jsonl(shard_dirs, name, out_path):
+    """Merge per-shard JSON-lines files, each already in doc_index order."""
+    shard_files = [open(os.path.join(d, name)) for d in shard_dirs]
+    try:
+        with open(out_path, "w") as out:
+            out.writelines(heapq.merge(
+                *shard_files, key=lambda line: json.loads(line)["doc_index"]
+            ))
+    finally:
+        for f in shard_files:
+            f.close()
+
+
+def merge_main(argv):
+    """`merge` subcommand: combine shard report dirs into one report."""
+    parser = argparse.ArgumentParser(
+        prog="compare_extraction.py merge",
+        description="Merge sharded comparison runs into one report",
+    )
+    parser.add_argument("shard_dirs", nargs="+", help="Report dirs written with --shard")
+    parser.add_argument("--report-dir", required=True)
+    args = parser.parse_args(argv)
+
+    stats = ComparisonStats()
+    seen = {}
+    for shard_dir in args.shard_dirs:
+        with open(os.path.join(shard_dir, STATE_FILE)) as f:
+            state = json.load(f)
+        index, count = state["shard"]
+        if (index, count) in seen:
+            print(f"ERROR: shard {index}/{count} given twice "
+                  f"({seen[(index, count)]} and {shard_dir})")
+            sys.exit(1)
+        seen[(index, count)] = shard_dir
+        stats.merge(ComparisonStats.from_dict(state))
+
+    counts = {count for _, count in seen}
+    if len(counts) != 1 or len(seen) != next(iter(counts)):
+        print(f"WARNING: incomplete shard set: {sorted(seen)}")
+
+    os.makedirs(args.report_dir, exist_ok=True)
+
+    for name in (DIFFERENCES_FILE, TIMINGS_FILE):
+        merge_jsonl(args.shard_dirs, name, os.path.join(args.report_dir, name))
+
+    with open(os.path.join(args.report_dir, STATE_FILE), "w") as f:
+        json.dump({"shard": [1, 1], **stats.to_dict()}, f)
+
+    finish_report(stats, args.report_dir)
 
 
 if __name__ == "__main__":
-    main()
+    if sys.argv[1:2] == ["merge"]:
+        merge_main(sys.argv[2:])
+    else:
+        main()
@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+Persistent metadata index of the Yiana document corpus.
+
+Records, per document, the page count, each page's extraction method,
+whether the address file has overrides, where its OCR JSON lives and
+the OCR's document-level confidence. Fixture selection and other corpus
+tools query the index instead of parsing every `.addresses/*.json` and
+walking `.ocr_results/` each run.
+
+Refreshes are incremental: an address file is only re-parsed when its
+mtime or size changes, and an OCR directory is only re-listed when its
+own mtime changes (adding, removing or renaming a file updates it).
+Unchanged directories are still descended into, at the cost of one
+stat each. Within a re-listed directory, only OCR files whose mtime or
+size changed are read again; an OCR file rewritten in place, without a
+rename, keeps its old confidence until its directory next changes.
+
+StratifiedReservoir draws seeded per-stratum samples from a single pass
+over iter_documents().
+
+The index holds real document IDs, so like the extraction cache it
+lives under migration/.cache/, which is gitignored.
+
+Usage:
+    index = CorpusIndex(DEFAULT_INDEX_PATH)
+    index.refresh(ADDRESSES_DIR, OCR_DIR)
+    index.documents(primary_method="form")
+    index.ocr_path(doc_id)
+    for doc in index.iter_documents():
+        sampler.offer(stratum_of(doc), quota, doc["doc_id"])
+    index.close()
+
+    python3 migration/corpus_index.py --addresses-dir ... --ocr-dir ...
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+from itertools import groupby
+from pathlib import Path
+
+from ocr_json import load_top_fields
+
+DEFAULT_INDEX_PATH = Path(__file__).parent / ".cache" / "corpus.sqlite"
+
+# Bump when the schema or the recorded metadata changes; the index is
+# then rebuilt from scratch on the next refresh
+SCHEMA_VERSION = 2
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS documents ("
+    "doc_id TEXT PRIMARY KEY, filename TEXT NOT NULL, "
+    "mtime_ns INTEGER NOT NULL, size INTEGER NOT NULL, "
+    "page_count INTEGER NOT NULL, has_overrides INTEGER NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS pages ("
+    "doc_id TEXT NOT NULL, page_index INTEGER NOT NULL, method TEXT NOT NULL, "
+    "PRIMARY KEY (doc_id, page_index))",
+    "CREATE INDEX IF NOT EXISTS idx_pages_method ON pages(method, page_index)",
+    "CREATE TABLE IF NOT EXISTS ocr_dirs ("
+    "path TEXT PRIMARY KEY, parent TEXT, mtime_ns INTEGER NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS ocr_files ("
+    "path TEXT PRIMARY KEY, dir TEXT NOT NULL, doc_id TEXT NOT NULL, "
+    "mtime_ns INTEGER NOT NULL, size INTEGER NOT NULL, confidence REAL)",
+    "CREATE INDEX IF NOT EXISTS idx_ocr_files_dir ON ocr_files(dir)",
+    "CREATE INDEX IF NOT EXISTS idx_ocr_files_doc ON ocr_files(doc_id)",
+)
+
+
+def page_method(page: dict) -> str:
+    """Extraction method recorded for one page of an address file."""
+    return (page.get("extraction") or {}).get("method") or "unknown"
+
+
+def ocr_confidence(path: str) -> float | None:
+    """Document-level confidence of an OCR JSON file, or None if unreadable."""
+    try:
+        confidence = load_top_fields(path).get("confidence")
+    except (OSError, ValueError):
+        return None
+    return float(confidence) if isinstance(confidence, (int, float)) else None
+
+
+class CorpusIndex:
+    """SQLite-backed metadata index over an addresses dir and an OCR dir."""
+
+    def __init__(self, path: str | Path = DEFAULT_INDEX_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(_SCHEMA[0])
+        if self._meta("schema_version") not in (None, str(SCHEMA_VERSION)):
+            # Columns may have changed, so start from empty tables
+            for table in ("meta", "documents", "pages", "ocr_dirs", "ocr_files"):
+                self._conn.execute(f"DROP TABLE IF EXISTS {table}")
+        for statement in _SCHEMA:
+            self._conn.execute(statement)
+        self._conn.commit()
+
+    def _meta(self, key: str):
+        row = self._conn.execute(
+            "SELECT value FROM meta WHERE key = ?", (key,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value))
+        )
+
+    def refresh(self, addresses_dir: str | Path, ocr_dir: str | Path | None = None) -> dict:
+        """Bring the index up to date with the corpus on disk.
+
+        Pointing an existing index at different directories, or at a new
+        SCHEMA_VERSION, discards it and rebuilds. Returns counts of what
+        was re-read: {"parsed", "unchanged", "removed", "ocr_dirs_scanned"}.
+        """
+        addresses_dir = Path(addresses_dir).resolve()
+        ocr_root = str(Path(ocr_dir).resolve()) if ocr_dir else ""
+        if (self._meta("schema_version") != str(SCHEMA_VERSION)
+                or self._meta("addresses_dir") != str(addresses_dir)
+                or self._meta("ocr_dir") != ocr_root):
+            for table in ("documents", "pages", "ocr_dirs", "ocr_files"):
+                self._conn.execute(f"DELETE FROM {table}")
+            self._set_meta("schema_version", SCHEMA_VERSION)
+            self._set_meta("addresses_dir", addresses_dir)
+            self._set_meta("ocr_dir", ocr_root)
+
+        stats = self._refresh_addresses(addresses_dir)
+        stats["ocr_dirs_scanned"] = self._refresh_ocr(ocr_root) if ocr_root else 0
+        self._conn.commit()
+        return stats
+
+    def _refresh_addresses(self, addresses_dir: Path) -> dict:
+        known = {
+            doc_id: (mtime_ns, size)
+            for doc_id, mtime_ns, size in self._conn.execute(
+                "SELECT doc_id, mtime_ns, size FROM documents"
+            )
+        }
+        parsed = unchanged = 0
+        with os.scandir(addresses_dir) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".json"):
+                    continue
+                doc_id = entry.name[:-len(".json")]
+                st = entry.stat()
+                if known.pop(doc_id, None) == (st.st_mtime_ns, st.st_size):
+                    unchanged += 1
+                    continue
+                with open(entry.path) as f:
+                    data = json.load(f)
+                pages = data.get("pages") or []
+                self._conn.execute("DELETE FROM pages WHERE doc_id = ?", (doc_id,))
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO documents "
+                    "(doc_id, filename, mtime_ns, size, page_count, has_overrides) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (doc_id, entry.name, st.st_mtime_ns, st.st_size,
+                     len(pages), int(bool(data.get("overrides")))),
+                )
+                self._conn.executemany(
+                    "INSERT INTO pages (doc_id, page_index, method) VALUES (?, ?, ?)",
+                    [(doc_id, i, page_method(page)) for i, page in enumerate(pages)],
+                )
+                parsed += 1
+
+        # Whatever is left in known was deleted from disk
+        removed = [(doc_id,) for doc_id in known]
+        self._conn.executemany("DELETE FROM documents WHERE doc_id = ?", removed)
+        self._conn.executemany("DELETE FROM pages WHERE doc_id = ?", removed)
+        return {"parsed": parsed, "unchanged": unchanged, "removed": len(removed)}
+
+    def _refresh_ocr(self, root: str) -> int:
+        """Re-list OCR directories whose mtime changed; returns how many."""
+        known = dict(self._conn.execute("SELECT path, mtime_ns FROM ocr_dirs"))
+        seen = set()
+        scanned = 0
+        stack = [(root, None)] if os.path.isdir(root) else []
+        while stack:
+            path, parent = stack.pop()
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns
+            except FileNotFoundError:
+                continue
+            seen.add(path)
+            if known.get(path) == mtime_ns:
+                stack.extend(
+                    (sub, path) for (sub,) in self._conn.execute(
+                        "SELECT path FROM ocr_dirs WHERE parent = ?", (path,)
+                    )
+                )
+                continue
+
+            scanned += 1
+            previous = {
+                file_path: (file_mtime, size, confidence)
+                for file_path, file_mtime, size, confidence in self._conn.execute(
+                    "SELECT path, mtime_ns, size, confidence FROM ocr_files WHERE dir = ?",
+                    (path,),
+                )
+            }
+            self._conn.execute("DELETE FROM ocr_files WHERE dir = ?", (path,))
+            files = []
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        stack.append((entry.path, path))
+                    elif entry.name.endswith(".json"):
+                        st = entry.stat()
+                        old = previous.get(entry.path)
+                        if old is not None and old[:2] == (st.st_mtime_ns, st.st_size):
+                            confidence = old[2]
+                        else:
+                            confidence = ocr_confidence(entry.path)
+                        files.append((entry.path, path, entry.name[:-len(".json")],
+                                      st.st_mtime_ns, st.st_size, confidence))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO ocr_files "
+                "(path, dir, doc_id, mtime_ns, size, confidence) VALUES (?, ?, ?, ?, ?, ?)",
+                files,
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ocr_dirs (path, parent, mtime_ns) VALUES (?, ?, ?)",
+                (path, parent, mtime_ns),
+            )
+
+        gone = [(path,) for path in known if path not in seen]
+        self._conn.executemany("DELETE FROM ocr_dirs WHERE path = ?", gone)
+        self._conn.executemany("DELETE FROM ocr_files WHERE dir = ?", gone)
+        return scanned
+
+    def method_distribution(self) -> list[tuple[str, int, int]]:
+        """(method, documents, pages) for every extraction method, by name."""
+        return self._conn.execute(
+            "SELECT method, COUNT(DISTINCT doc_id), COUNT(*) FROM pages "
+            "GROUP BY method ORDER BY method"
+        ).fetchall()
+
+    def documents(self, primary_method: str | None = None,
+                  any_method: str | None = None,
+                  has_overrides: bool | None = None,
+                  empty: bool | None = None) -> list[str]:
+        """Document IDs matching every given filter, in address filename order.
+
+        primary_method matches the first page's method, any_method any
+        page's; empty selects documents with (True) or without (False)
+        pages.
+        """
+        where, params = [], []
+        if primary_method is not None:
+            where.append(
+                "doc_id IN (SELECT doc_id FROM pages WHERE page_index = 0 AND method = ?)"
+            )
+            params.append(primary_method)
+        if any_method is not None:
+            where.append("doc_id IN (SELECT doc_id FROM pages WHERE method = ?)")
+            params.append(any_method)
+        if has_overrides is not None:
+            where.append("has_overrides = ?")
+            params.append(int(has_overrides))
+        if empty is not None:
+            where.append("page_count = 0" if empty else "page_count > 0")
+        sql = "SELECT doc_id FROM documents"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        return [doc_id for (doc_id,) in self._conn.execute(sql + " ORDER BY filename", params)]
+
+    def iter_documents(self):
+        """Yield every document in address filename order, streamed from the index.
+
+        Each is a dict: doc_id, page_count, has_overrides, methods (page
+        extraction methods in page order) and ocr_confidence (None without
+        an OCR file or confidence).
+        """
+        rows = self._conn.execute(
+            "SELECT d.doc_id, d.page_count, d.has_overrides, p.method, "
+            "(SELECT o.confidence FROM ocr_files o WHERE o.doc_id = d.doc_id "
+            " ORDER BY o.path LIMIT 1) "
+            "FROM documents d LEFT JOIN pages p ON p.doc_id = d.doc_id "
+            "ORDER BY d.filename, p.page_index"
+        )
+        for doc_id, doc_rows in groupby(rows, key=lambda row: row[0]):
+            doc_rows = list(doc_rows)
+            _, page_count, has_overrides, _, confidence = doc_rows[0]
+            yield {
+                "doc_id": doc_id,
+                "page_count": page_count,
+                "has_overrides": bool(has_overrides),
+                "methods": [row[3] for row in doc_rows if row[3] is not None],
+                "ocr_confidence": confidence,
+            }
+
+    def ocr_path(self, doc_id: str) -> Path | None:
+        """Path of the document's OCR JSON, or None if it has none."""
+        row = self._conn.execute(
+            "SELECT path FROM ocr_files WHERE doc_id = ? ORDER BY path LIMIT 1", (doc_id,)
+        ).fetchone()
+        return Path(row[0]) if row else None
+
+    def close(self) -> None:
+        """Commit and close the database."""
+        self._conn.commit()
+        self._conn.close()
+
+
+class StratifiedReservoir:
+    """Seeded uniform samples of a stream, one bounded reservoir per stratum.
+
+    offer() each item once with its stratum and quota; each stratum keeps
+    at most quota items (Algorithm R), so memory is bounded by the quotas,
+    not the stream. A quota of None keeps every item. Every stratum draws
+    from its own RNG seeded by (seed, stratum), so one stratum's sample
+    does not depend on how many items the others were offered.
+    """
+
+    def __init__(self, seed):
+        self.seed = seed
+        # stratum -> [quota, items offered, sample, rng]
+        self._strata: dict = {}
+
+    def offer(self, stratum: str, quota: int | None, item) -> None:
+        state = self._strata.get(stratum)
+        if state is None:
+            state = self._strata[stratum] = [quota, 0, [], random.Random(f"{self.seed}:{stratum}")]
+        quota, seen, sample, rng = state
+        state[1] = seen + 1
+        if quota is None or len(sample) < quota:
+            sample.append(item)
+        else:
+            j = rng.randrange(seen + 1)
+            if j < quota:
+                sample[j] = item
+
+    def samples(self) -> dict:
+        """stratum -> (items offered, sample), in order of first offer."""
+        return {stratum: (seen, sample) for stratum, (_, seen, sample, _) in self._strata.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh and summarise the corpus index")
+    parser.add_argument("--addresses-dir", type=Path, required=True)
+    parser.add_argument("--ocr-dir", type=Path, default=None)
+    parser.add_argument(
+        "--index", type=Path, default=DEFAULT_INDEX_PATH,
+        help=f"Index database (default: {DEFAULT_INDEX_PATH})",
+    )
+    args = parser.parse_args()
+
+    index = CorpusIndex(args.index)
+    stats = index.refresh(args.addresses_dir, args.ocr_dir)
+    print(f"Refreshed {args.index}: {stats['parsed']} parsed, "
+          f"{stats['unchanged']} unchanged, {stats['removed']} removed, "
+          f"{stats['ocr_dirs_scanned']} OCR dirs scanned")
+    for method, docs, pages in index.method_distribution():
+        print(f"  {method}: {docs} documents ({pages} pages)")
+    print(f"  has_overrides: {len(index.documents(has_overrides=True, empty=False))}")
+    print(f"  no_pages: {len(index.documents(empty=True))}")
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Content-addressed result cache for the migration extraction tools.
+
+Results are stored in a local SQLite file keyed by a hash of everything
+that determines them: the input text, a hash of the extractor's source
+(or binary), and a ruleset version. Change any of those and the key
+changes, so stale entries are never returned — they just age out.
+
+The store is size-bounded: once the total cached payload exceeds
+max_bytes, the least recently used entries are evicted.
+
+Usage:
+    cache = ExtractionCache(DEFAULT_CACHE_PATH)
+    key = cache_key(text_hash(text), extractor_hash, RULESET_VERSION)
+    hit = cache.get(key)
+    if hit is MISS:
+        hit = extract(text)
+        cache.put(key, hit)
+    cache.close()
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+from pathlib import Path
+
+DEFAULT_CACHE_PATH = Path(__file__).parent / ".cache" / "extraction.sqlite"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# Sentinel for a cache miss (None is a valid cached extraction result)
+MISS = object()
+
+# Record last_used for this many cache hits at a time; the rest are
+# recorded by flush() or close()
+_TOUCH_EVERY = 200
+
+
+def text_hash(text: str) -> str:
+    """SHA-256 of a text string."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def file_hash(path: str | Path) -> str:
+    """SHA-256 of a file's contents."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def source_hash(paths) -> str:
+    """Combined SHA-256 of several source files, independent of argument order."""
+    h = hashlib.sha256()
+    for path in sorted(Path(p) for p in paths):
+        h.update(str(path.name).encode("utf-8"))
+        h.update(file_hash(path).encode("ascii"))
+    return h.hexdigest()
+
+
+def cache_key(*parts) -> str:
+    """Combine key components into a single cache key."""
+    return hashlib.sha256("\0".join(str(p) for p in parts).encode("utf-8")).hexdigest()
+
+
+class ExtractionCache:
+    """SQLite-backed, size-bounded LRU store of JSON-serialisable results.
+
+    Safe to open from several processes at once (WAL mode); each process
+    should use its own instance. Every put() commits on its own, and get()
+    only reads: the keys it hits are remembered and their last_used times
+    written in one short transaction by flush(). So no process holds the
+    write lock for longer than a single statement or batch update.
+    """
+
+    def __init__(self, path: str | Path = DEFAULT_CACHE_PATH,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit: transactions are only ever opened explicitly
+        self._conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "size INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_entries_last_used ON entries(last_used)"
+        )
+        # Hit key -> time of its last hit, not yet written
+        self._touched: dict[str, float] = {}
+        # Running estimate of the payload total; other processes sharing the
+        # file are only accounted for when this crosses the budget
+        (self._size,) = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()
+
+    def get(self, key: str):
+        """Return the cached value for key, or MISS."""
+        row = self._conn.execute(
+            "SELECT value FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return MISS
+        self.hits += 1
+        self._touched[key] = time.time()
+        if len(self._touched) >= _TOUCH_EVERY:
+            self.flush()
+        return json.loads(row[0])
+
+    def put(self, key: str, value) -> None:
+        """Store a JSON-serialisable value under key, committed at once."""
+        payload = json.dumps(value, separators=(",", ":"))
+        self._conn.execute(
+            "INSERT OR REPLACE INTO entries (key, value, size, last_used) "
+            "VALUES (?, ?, ?, ?)",
+            (key, payload, len(payload), time.time()),
+        )
+        self._touched.pop(key, None)
+        self._size += len(payload)
+        if self._size > self.max_bytes:
+            self.flush()
+
+    def flush(self) -> None:
+        """Record last_used for hit keys, evicting old entries if over budget."""
+        if not self._touched and self._size <= self.max_bytes:
+            return
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._conn.executemany(
+                "UPDATE entries SET last_used = ? WHERE key = ?",
+                [(used, key) for key, used in self._touched.items()],
+            )
+            if self._size > self.max_bytes:
+                self._evict()
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+        self._touched.clear()
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until under 90% of max_bytes."""
+        (total,) = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()
+        self._size = total
+        if total <= self.max_bytes:
+            return
+        target = total - int(self.max_bytes * 0.9)
+        freed = 0
+        doomed = []
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM entries ORDER BY last_used"
+        ):
+            doomed.append((key,))
+            freed += size
+            if freed >= target:
+                break
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", doomed)
+        self._size = total - freed
+
+    def close(self) -> None:
+        """Record pending last_used times and close the database."""
+        self.flush()
+        self._conn.close()
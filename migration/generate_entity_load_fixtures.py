@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""
+Generate large synthetic entity fixtures for ingestion load tests.
+
+Where generate_entity_fixtures.py hand-writes 55 correctness scenarios,
+this draws any number of documents from a seeded model of the corpus,
+with controlled rates of the cases entity resolution has to handle:
+
+    --duplicate-rate    documents belonging to an already-seen patient
+    --name-variant-rate repeat documents whose filename spells the name
+                        differently (case, initial, transposed letters)
+    --dob-typo-rate     repeat documents whose filename DOB has a typo
+    --shared-gp-rate    patients whose GP is drawn from a shared pool
+    --override-rate     documents carrying an address override
+
+Files are written to <out>/addresses/ as they are generated, along with
+<out>/ground_truth.jsonl: one line per document giving the true patient
+and practitioner clusters and the variants applied, so a resolver's
+output can be scored. <out>/summary.json records the parameters and
+totals. Output is identical for the same seed and parameters.
+
+Memory stays bounded: patient and GP names are derived from a serial
+number (so they never collide and need no lookup table), and repeat
+documents are drawn from a pool of at most --patient-pool recent
+patients. Generation stops with an error rather than reuse a name once
+either name space runs out.
+
+All data is invented — no real names, addresses, or identifiers.
+
+Usage:
+    python3 migration/generate_entity_load_fixtures.py --out /tmp/entity_load \\
+        --documents 400000 --max-pages 4 --seed 1
+
+    # then e.g. `yiana-extract --ingest-all /tmp/entity_load/addresses ...`
+    # or BackendDatabase.ingest_directory("/tmp/entity_load/addresses")
+
+Documents have 1..--max-pages pages, so 400,000 documents with the
+default of 4 is about 1M pages.
+"""
+
+import argparse
+import json
+import math
+import random
+import time
+from pathlib import Path
+
+from generate_entity_fixtures import make_address_file, make_page
+
+# Invented-name building blocks; surnames are sequences of syllables
+SYLLABLES = [
+    "ab", "bel", "cor", "dun", "el", "fen", "gar", "hol", "id", "jor",
+    "kel", "lan", "mor", "nel", "or", "pen", "quil", "ros", "sel", "tor",
+    "ul", "ven", "wyn", "yar",
+]
+SURNAME_SYLLABLES = 4
+FIRST_NAMES = [
+    "Ada", "Ben", "Cara", "Dev", "Ena", "Finn", "Gail", "Hal", "Isla", "Jude",
+    "Kit", "Lara", "Milo", "Nia", "Otto", "Pia", "Rex", "Sula", "Tam", "Una",
+    "Vic", "Wren", "Yara", "Zed", "Abe", "Bea", "Cal", "Dot", "Eli", "Fay",
+    "Gus", "Hope", "Ivo", "Joy", "Kai", "Liv", "Max", "Nell", "Ora", "Pip",
+    "Quin", "Ria", "Sid", "Tess", "Ugo", "Val", "Will", "Zoe",
+]
+STREETS = ["Elm Road", "Mill Lane", "Quarry Way", "Heath Rise", "Brook Row", "Kiln Close"]
+TOWNS = ["Millbrook", "Ashcombe", "Fernley", "Harrowgate", "Oakmere", "Stonebury"]
+FILE_SUFFIXES = ["ref", "scan", "letter", "copy", "clinic"]
+METHODS = [("label", 0.55), ("spire_form", 0.3), ("form", 0.1), ("unstructured", 0.05)]
+OVERRIDE_REASONS = ["corrected", "moved", "manual"]
+
+# GP surnames: fixed-length syllable sequences, one per GP
+GP_SURNAME_SYLLABLES = 5
+GP_NAME_SPACE = len(SYLLABLES) ** GP_SURNAME_SYLLABLES
+POSTCODE_LETTERS = "ABDEFGHJLNPQRSTUWXYZ"
+GP_POSTCODE_SPACE = 99 * 10 * len(POSTCODE_LETTERS) ** 2
+
+SHARED_GP_POOL = 200
+CONSULTANT_POOL = 50
+SPECIALIST_PAGE_RATE = 0.05
+
+
+def syllable_name(n: int, syllables: int) -> str:
+    """The n-th name of `syllables` syllables; distinct n give distinct names."""
+    parts = []
+    for _ in range(syllables):
+        n, digit = divmod(n, len(SYLLABLES))
+        parts.append(SYLLABLES[digit])
+    return "".join(parts).capitalize()
+
+
+class PatientNamer:
+    """Unique (surname, firstname) for each patient serial, in shuffled order.
+
+    Serials are mapped through a seeded affine permutation of the whole
+    name space, so consecutive patients get unrelated names while no two
+    patients ever share one.
+    """
+
+    def __init__(self, rng: random.Random):
+        self.space = len(SYLLABLES) ** SURNAME_SYLLABLES * len(FIRST_NAMES)
+        self.offset = rng.randrange(self.space)
+        self.stride = rng.randrange(1, self.space)
+        while math.gcd(self.stride, self.space) != 1:
+            self.stride += 1
+
+    def name(self, serial: int) -> tuple[str, str]:
+        if serial >= self.space:
+            raise ValueError(f"more than {self.space} patients")
+        n = (serial * self.stride + self.offset) % self.space
+        surname_index, first_index = divmod(n, len(FIRST_NAMES))
+        return syllable_name(surname_index, SURNAME_SYLLABLES), FIRST_NAMES[first_index]
+
+
+def gp_postcode(n: int) -> str:
+    """The n-th GP postcode; distinct for n below GP_POSTCODE_SPACE, then repeating."""
+    n, district = divmod(n, 99)
+    n, sector = divmod(n, 10)
+    n, first = divmod(n, len(POSTCODE_LETTERS))
+    second = n % len(POSTCODE_LETTERS)
+    return f"ZZ{district + 1} {sector}{POSTCODE_LETTERS[first]}{POSTCODE_LETTERS[second]}"
+
+
+def make_gp(cluster: str, n: int) -> dict:
+    """The n-th GP. Practitioners resolve by normalised name, so every GP
+    needs a name of its own: n must be below GP_NAME_SPACE."""
+    if n >= GP_NAME_SPACE:
+        raise ValueError(f"more than {GP_NAME_SPACE} GPs")
+    return {
+        "cluster": cluster,
+        "surname": syllable_name(n, GP_SURNAME_SYLLABLES),
+        # Counted down from the top of the name space, so a practice is
+        # not named after its own GP
+        "practice": f"{syllable_name(GP_NAME_SPACE - 1 - n, GP_SURNAME_SYLLABLES)} Surgery",
+        "postcode": gp_postcode(n),
+    }
+
+
+def gp_spelling(rng: random.Random, surname: str) -> str:
+    """A GP name as it might be written on a page; all normalise to the same entity."""
+    return rng.choice([f"Dr {surname}", f"Dr. {surname}", f"DR {surname.upper()}"])
+
+
+def page_name_spelling(rng: random.Random, patient: dict) -> str:
+    """The patient's name as OCR might read it; the filename governs identity."""
+    first, surname = patient["firstname"], patient["surname"]
+    return rng.choice([
+        f"{first} {surname}",
+        f"{first} {surname}",
+        f"{first.upper()} {surname.upper()}",
+        f"{rng.choice(['Mr', 'Mrs', 'Ms'])} {first} {surname}",
+        f"{first[0]} {surname}",
+    ])
+
+
+def name_variant(rng: random.Random, surname: str, firstname: str) -> tuple[str, str, str]:
+    """A differently spelled filename name: (kind, surname, firstname)."""
+    kind = rng.choice(["case", "initial", "transposed"])
+    if kind == "case":
+        return kind, surname.upper(), firstname
+    if kind == "initial":
+        return kind, surname, firstname[0]
+    i = rng.randrange(1, len(surname) - 1)
+    swapped = surname[:i] + surname[i + 1] + surname[i] + surname[i + 2:]
+    return kind, swapped.capitalize(), firstname
+
+
+def dob_typo(rng: random.Random, dob: str) -> str:
+    """A mistyped DDMMYY: two adjacent digits swapped, or one digit changed."""
+    digits = list(dob)
+    i = rng.randrange(len(digits) - 1)
+    if digits[i] != digits[i + 1] and rng.random() < 0.5:
+        digits[i], digits[i + 1] = digits[i + 1], digits[i]
+    else:
+        digits[i] = str((int(digits[i]) + rng.randint(1, 9)) % 10)
+    return "".join(digits)
+
+
+def make_override(page: dict, rng: random.Random, address: dict) -> dict:
+    """An override entry correcting the patient address of `page`."""
+    override = {k: v for k, v in page.items() if k != "extraction"}
+    override["address"] = dict(page["address"], **address)
+    override["is_prime"] = True
+    override["match_address_type"] = page["address_type"]
+    override["override_date"] = f"2026-03-{rng.randint(1, 28):02d}T12:00:00Z"
+    override["override_reason"] = rng.choice(OVERRIDE_REASONS)
+    return override
+
+
+def random_address(rng: random.Random) -> dict:
+    return {
+        "line_1": f"{rng.randint(1, 250)} {rng.choice(STREETS)}",
+        "city": rng.choice(TOWNS),
+        "postcode": f"ZZ{rng.randint(1, 9)} {rng.randint(1, 9)}{rng.choice('ABDEFG')}{rng.choice('HJLNPQ')}",
+    }
+
+
+class LoadFixtureGenerator:
+    """Seeded stream of (filename, address file, ground truth) documents."""
+
+    def __init__(self, args):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.namer = PatientNamer(self.rng)
+        self.shared_gps = [make_gp(f"G{n:06d}", n) for n in range(SHARED_GP_POOL)]
+        self.consultants = [
+            {"cluster": f"C{n:04d}", "name": f"Mr {syllable_name(n + 7919, 3)}"}
+            for n in range(CONSULTANT_POOL)
+        ]
+        self.pool: list[dict] = []
+        self.patients = 0
+        self.unique_gps = 0
+        self.counts = {
+            "documents": 0, "pages": 0, "repeat_documents": 0,
+            "name_variants": 0, "dob_typos": 0, "overrides": 0,
+        }
+
+    def _new_patient(self) -> dict:
+        rng = self.rng
+        surname, firstname = self.namer.name(self.patients)
+        if rng.random() < self.args.shared_gp_rate:
+            gp = rng.choice(self.shared_gps)
+        else:
+            gp = make_gp(f"G{SHARED_GP_POOL + self.unique_gps:06d}", SHARED_GP_POOL + self.unique_gps)
+            self.unique_gps += 1
+        patient = {
+            "cluster": f"P{self.patients:07d}",
+            "surname": surname,
+            "firstname": firstname,
+            "dob": (rng.randint(1, 28), rng.randint(1, 12), rng.randint(1930, 2020)),
+            "address": random_address(rng),
+            "phone": f"01632{rng.randint(100000, 999999)}",
+            "gp": gp,
+            "documents": 0,
+        }
+        self.patients += 1
+
+        # Repeats come from a bounded pool; once full, a random slot is
+        # recycled so old patients gradually stop recurring
+        if len(self.pool) < self.args.patient_pool:
+            self.pool.append(patient)
+        else:
+            self.pool[rng.randrange(len(self.pool))] = patient
+        return patient
+
+    def document(self, serial: int) -> tuple[str, dict, dict]:
+        rng = self.rng
+        args = self.args
+        repeat = bool(self.pool) and rng.random() < args.duplicate_rate
+        patient = rng.choice(self.pool) if repeat else self._new_patient()
+        patient["documents"] += 1
+
+        day, month, year = patient["dob"]
+        surname, firstname = patient["surname"], patient["firstname"]
+        dob6 = f"{day:02d}{month:02d}{year % 100:02d}"
+        variants = []
+        if repeat:
+            self.counts["repeat_documents"] += 1
+            if rng.random() < args.name_variant_rate:
+                kind, surname, firstname = name_variant(rng, surname, firstname)
+                variants.append(f"name_{kind}")
+                self.counts["name_variants"] += 1
+            if rng.random() < args.dob_typo_rate:
+                dob6 = dob_typo(rng, dob6)
+                variants.append("dob_typo")
+                self.counts["dob_typos"] += 1
+
+        document_id = f"{surname}_{firstname}_{dob6}"
+        if repeat:
+            # The serial keeps every filename unique; text after the DOB
+            # is ignored when resolving the patient
+            document_id += f"_{rng.choice(FILE_SUFFIXES)}{serial}"
+
+        gp = patient["gp"]
+        dob = f"{day:02d}/{month:02d}/{year}"
+        practitioners = {gp["cluster"]}
+        methods = [m for m, _ in METHODS]
+        weights = [w for _, w in METHODS]
+        pages = []
+        for page_number in range(1, rng.randint(1, args.max_pages) + 1):
+            specialist = None
+            address_type = "patient"
+            if rng.random() < SPECIALIST_PAGE_RATE:
+                consultant = rng.choice(self.consultants)
+                specialist = consultant["name"]
+                address_type = "specialist"
+                practitioners.add(consultant["cluster"])
+            address = patient["address"]
+            pages.append(make_page(
+                page_number, page_name_spelling(rng, patient), dob,
+                phone_home=patient["phone"],
+                addr_1=address["line_1"], city=address["city"],
+                postcode=address["postcode"],
+                gp_name=gp_spelling(rng, gp["surname"]), gp_practice=gp["practice"],
+                gp_postcode=gp["postcode"],
+                method=rng.choices(methods, weights)[0],
+                confidence=round(rng.uniform(0.5, 0.95), 2),
+                address_type=address_type, specialist_name=specialist,
+            ))
+
+        overrides = None
+        patient_pages = [p for p in pages if p["address_type"] == "patient"]
+        if patient_pages and rng.random() < args.override_rate:
+            patient["address"] = random_address(rng)
+            overrides = [make_override(rng.choice(patient_pages), rng, patient["address"])]
+            self.counts["overrides"] += 1
+
+        self.counts["documents"] += 1
+        self.counts["pages"] += len(pages)
+        truth = {
+            "file": f"{document_id}.json",
+            "patient": patient["cluster"],
+            "filename_key": f"{surname}_{firstname}_{dob6}".lower(),
+            "variants": variants,
+            "practitioners": sorted(practitioners),
+            "pages": len(pages),
+            "override": overrides is not None,
+        }
+        return f"{document_id}.json", make_address_file(document_id, pages, overrides), truth
+
+    def summary(self) -> dict:
+        return {
+            "description": "Synthetic entity load-test corpus; see ground_truth.jsonl",
+            "parameters": {k: v for k, v in vars(self.args).items() if k != "out"},
+            "totals": dict(
+                self.counts,
+                patients=self.patients,
+                gps=SHARED_GP_POOL + self.unique_gps,
+                consultants=CONSULTANT_POOL,
+            ),
+        }
+
+
+def rate(value: str) -> float:
+    r = float(value)
+    if not 0 <= r <= 1:
+        raise argparse.ArgumentTypeError(f"rate must be in [0, 1], got {value}")
+    return r
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate entity load-test fixtures")
+    parser.add_argument("--out", type=Path, required=True, help="Output directory")
+    parser.add_argument("--documents", type=int, default=10000)
+    parser.add_argument("--max-pages", type=int, default=4, help="Pages per document: 1..N")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--duplicate-rate", type=rate, default=0.4)
+    parser.add_argument("--name-variant-rate", type=rate, default=0.05)
+    parser.add_argument("--dob-typo-rate", type=rate, default=0.02)
+    parser.add_argument("--shared-gp-rate", type=rate, default=0.8)
+    parser.add_argument("--override-rate", type=rate, default=0.03)
+    parser.add_argument(
+        "--patient-pool", type=int, default=10000,
+        help="Recent patients that repeat documents are drawn from (bounds memory)",
+    )
+    parser.add_argument("--indent", type=int, default=2, help="JSON indent (0 = compact)")
+    args = parser.parse_args()
+    if args.documents < 0 or args.max_pages < 1 or args.patient_pool < 1:
+        parser.error("--documents must be >= 0, --max-pages and --patient-pool >= 1")
+
+    addresses_dir = args.out / "addresses"
+    addresses_dir.mkdir(parents=True, exist_ok=True)
+
+    # Clean previous fixtures
+    for f in addresses_dir.glob("*.json"):
+        f.unlink()
+
+    generator = LoadFixtureGenerator(args)
+    indent = args.indent or None
+    start = time.perf_counter()
+    with open(args.out / "ground_truth.jsonl", "w") as truth_file:
+        for serial in range(args.documents):
+            filename, data, truth = generator.document(serial)
+            with open(addresses_dir / filename, "w") as f:
+                json.dump(data, f, indent=indent)
+            truth_file.write(json.dumps(truth) + "\n")
+            if serial and serial % 50000 == 0:
+                print(f"  {serial} documents...")
+
+    summary = generator.summary()
+    with open(args.out / "summary.json", "w") as f:
+        json.dump(summary, f, indent=2)
+
+    totals = summary["totals"]
+    print(f"Generated {totals['documents']} documents ({totals['pages']} pages, "
+          f"{totals['patients']} patients, {totals['gps']} GPs) in {addresses_dir} "
+          f"in {time.perf_counter() - start:.1f}s")
+    print(f"Ground truth: {args.out / 'ground_truth.jsonl'}")
+
+
+if __name__ == "__main__":
+    main()
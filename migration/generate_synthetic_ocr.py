@@ -6,14 +6,36 @@ Reads each expected address file, extracts the extraction method and data,
 then generates OCR text that would trigger the correct extractor path.
 
 The generated OCR text is synthetic — no real data is used.
+
+Scale mode (--scale N) instead draws N invented documents for benchmarks:
+page counts and extraction methods follow the extraction fixtures (which
+oversample forms, so this is not the production mix), and pages carry
+the noise production scans have — OCR character confusions, lines
+wrapped or run together, two-column letterheads, low-quality scans and
+address-free continuation pages. Word boxes are laid out from the text
+(width by character count, per-word confidence), so files are about the
+size of real ones. Documents are generated in a process pool and written
+as compact JSON; each is seeded from (--seed, its index), so the corpus is
+identical for any --workers.
+
+Usage:
+    python3 migration/generate_synthetic_ocr.py
+    python3 migration/generate_synthetic_ocr.py --scale 100000 --out /tmp/ocr_scale --seed 1
 """
 
+import argparse
 import json
 import os
 import random
 import sys
+import time
+from collections import Counter
+from multiprocessing import Pool
 from pathlib import Path
 
+from generate_entity_fixtures import make_page
+from generate_entity_load_fixtures import FIRST_NAMES, STREETS, SYLLABLES, TOWNS, syllable_name
+
 EXTRACTION_DIR = Path(__file__).parent / "fixtures" / "extraction"
 EXPECTED_DIR = EXTRACTION_DIR / "expected_addresses"
 INPUT_DIR = EXTRACTION_DIR / "input_ocr"
@@ -314,6 +336,350 @@ GENERATORS = {
 }
 
 
+# --- Scale mode ---
+
+# Address pages per document and extraction method per page, as counted in
+# fixtures/extraction/expected_addresses. That set was picked by quota and
+# deliberately oversamples forms and clearwater forms, so these weights are
+# fixture-derived, not the production distribution
+SCALE_PAGE_COUNTS = [(0, 4), (1, 17), (2, 14), (3, 8), (4, 2), (5, 2), (6, 2),
+                     (7, 2), (9, 1), (10, 1)]
+SCALE_METHODS = [("label", 94), ("form", 17), ("clearwater_form", 16), ("unstructured", 5)]
+
+CONTINUATION_PAGE_RATE = 0.3   # address-free page after an address page
+TWO_COLUMN_RATE = 0.2          # letterhead column beside the address block
+INTERLEAVED_COLUMNS_RATE = 0.5  # two-column text read across, not down
+LOW_QUALITY_RATE = 0.1         # faint or skewed scan: low confidence, more typos
+TYPO_RATE = 0.01               # per word; x5 on low-quality pages
+LINE_SPLIT_RATE = 0.03         # long line wrapped in two
+LINE_JOIN_RATE = 0.02          # line break lost between two lines
+
+# Characters OCR commonly confuses, both ways
+OCR_CONFUSIONS = [("O", "0"), ("l", "1"), ("I", "l"), ("S", "5"), ("B", "8"),
+                  ("rn", "m"), ("e", "c"), ("a", "o"), ("h", "b")]
+COUNTIES = ["Surrey", "Kent", "Essex", "Dorset", "Devon", ""]
+PRACTICE_WORDS = ["Surgery", "Medical Centre", "Health Centre", "Practice"]
+CONTINUATION_SENTENCES = [
+    "On examination there was no tenderness and the wound had healed well.",
+    "I have explained the findings and the options for further management.",
+    "Blood tests taken in clinic were within normal limits.",
+    "We discussed the risks and benefits of surgery in some detail.",
+    "The patient would like some time to consider the options.",
+    "I would be grateful if you could continue the current medication.",
+    "A repeat scan has been requested and I will review the results.",
+    "There were no concerning features on today's assessment.",
+    "Physiotherapy has been arranged locally.",
+    "Please do not hesitate to contact me if there are any concerns.",
+]
+
+
+def pick(rng: random.Random, weighted: list[tuple]) -> object:
+    return rng.choices([v for v, _ in weighted], [w for _, w in weighted])[0]
+
+
+def synthetic_address_page(rng: random.Random, page_number: int, person: dict) -> dict:
+    """An expected-address page for `person`, in the fixture format."""
+    return make_page(
+        page_number, person["name"], person["dob"], mrn=person["mrn"],
+        phone_home=person["phone_home"], phone_mobile=person["phone_mobile"],
+        addr_1=person["address"][0], addr_2=person["address"][1],
+        city=person["address"][2], county=person["address"][3] or None,
+        postcode=person["postcode"],
+        gp_name=person["gp"][0], gp_practice=person["gp"][1],
+        gp_address=person["gp"][2], gp_postcode=person["gp"][3],
+        method=pick(rng, SCALE_METHODS),
+    )
+
+
+def synthetic_person(rng: random.Random) -> dict:
+    """An invented patient with address, phones and GP."""
+    surname = syllable_name(rng.randrange(len(SYLLABLES) ** 3), 3)
+    gp_surname = syllable_name(rng.randrange(10000), 3)
+    postcode = f"ZZ{rng.randint(1, 99)} {rng.randint(1, 9)}{rng.choice('ABDEFGHJ')}{rng.choice('LNPQRSTU')}"
+    return {
+        "surname": surname,
+        "firstname": rng.choice(FIRST_NAMES),
+        "name": None,
+        "dob": f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/{rng.randint(1930, 2020)}",
+        "mrn": f"{rng.choice('HKM')}{rng.randint(100000, 999999)}" if rng.random() < 0.6 else None,
+        "phone_home": f"01632 {rng.randint(100000, 999999)}" if rng.random() < 0.7 else None,
+        "phone_mobile": f"07700 {rng.randint(100000, 999999)}" if rng.random() < 0.5 else None,
+        "address": (
+            f"{rng.randint(1, 250)} {rng.choice(STREETS)}",
+            f"{syllable_name(rng.randrange(500), 2)} Estate" if rng.random() < 0.2 else None,
+            rng.choice(TOWNS),
+            rng.choice(COUNTIES),
+        ),
+        "postcode": postcode,
+        "gp": (
+            f"Dr {gp_surname}",
+            f"{syllable_name(rng.randrange(500), 2)} {rng.choice(PRACTICE_WORDS)}",
+            f"{rng.randint(1, 99)} {rng.choice(STREETS)}, {rng.choice(TOWNS)}",
+            f"ZZ{rng.randint(1, 99)} {rng.randint(1, 9)}GP",
+        ),
+    }
+
+
+def continuation_text(rng: random.Random, page_number: int, page_count: int) -> str:
+    """Prose for a letter page with no address on it."""
+    paragraphs = []
+    for _ in range(rng.randint(2, 4)):
+        paragraphs.append(" ".join(rng.sample(CONTINUATION_SENTENCES, rng.randint(2, 4))))
+    return "\n\n".join(paragraphs) + f"\n\nPage {page_number} of {page_count}"
+
+
+def letterhead_column(rng: random.Random, person: dict) -> list[str]:
+    """Right-hand column of a two-column letter: sender and references."""
+    return [
+        person["gp"][1],
+        person["gp"][2],
+        f"Tel: 01632 {rng.randint(100000, 999999)}",
+        "",
+        f"Date: {rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/2025",
+        f"Our ref: {rng.choice('ABCDEFGH')}{rng.randint(1000, 9999)}",
+        f"NHS No: {rng.randint(100, 999)} {rng.randint(100, 999)} {rng.randint(1000, 9999)}",
+    ]
+
+
+def ocr_typo(rng: random.Random, word: str) -> str:
+    """`word` with one OCR character confusion, if any applies."""
+    options = []
+    for a, b in OCR_CONFUSIONS:
+        for src, dst in ((a, b), (b, a)):
+            i = word.find(src)
+            if i >= 0:
+                options.append((i, src, dst))
+    if not options:
+        return word
+    i, src, dst = rng.choice(options)
+    return word[:i] + dst + word[i + len(src):]
+
+
+def add_line_noise(rng: random.Random, lines: list[str], typo_rate: float,
+                   counts: Counter) -> list[str]:
+    """Apply typos, wrapped lines and lost line breaks to a column of lines."""
+    noisy = []
+    for line in lines:
+        words = []
+        for word in line.split():
+            if rng.random() < typo_rate:
+                word = ocr_typo(rng, word)
+                counts["typos"] += 1
+            words.append(word)
+        line = " ".join(words)
+        if len(line) > 30 and rng.random() < LINE_SPLIT_RATE:
+            cut = line.find(" ", len(line) // 2)
+            if cut > 0:
+                noisy += [line[:cut], line[cut + 1:]]
+                counts["split_lines"] += 1
+                continue
+        if line and noisy and noisy[-1] and rng.random() < LINE_JOIN_RATE:
+            noisy[-1] += " " + line
+            counts["joined_lines"] += 1
+            continue
+        noisy.append(line)
+    return noisy
+
+
+def layout_column(rng: random.Random, lines: list[str], x0: float, width: float,
+                  y0: float, confidence: float) -> tuple[list[dict], list[list[str]]]:
+    """Blocks for a column of lines, one block per paragraph.
+
+    Word boxes are sized by character count and wrap nothing: a line wider
+    than the column is squeezed to fit, and a column too long for the page
+    gets a smaller line pitch. Returns the blocks and the (y, text) of each
+    line, for building the page text.
+    """
+    blocks = []
+    rows = []
+    y = y0
+    pitch = min(0.0232, (0.95 - y0) / max(len(lines), 1))
+    paragraph: list[dict] = []
+
+    def box(x, y, w, h):
+        return {"x": round(x, 4), "y": round(y, 4), "width": round(w, 4), "height": round(h, 4)}
+
+    def close_paragraph():
+        if not paragraph:
+            return
+        bx = min(l["boundingBox"]["x"] for l in paragraph)
+        by = paragraph[0]["boundingBox"]["y"]
+        right = max(l["boundingBox"]["x"] + l["boundingBox"]["width"] for l in paragraph)
+        bottom = paragraph[-1]["boundingBox"]["y"] + paragraph[-1]["boundingBox"]["height"]
+        words = [w for l in paragraph for w in l["words"]]
+        blocks.append({
+            "boundingBox": box(bx, by, right - bx, bottom - by),
+            "confidence": round(sum(w["confidence"] for w in words) / len(words), 3),
+            "text": "\n".join(l["text"] for l in paragraph),
+            "lines": list(paragraph),
+        })
+        paragraph.clear()
+
+    for line in lines:
+        if not line.strip():
+            close_paragraph()
+            y += pitch * 0.65
+            continue
+        height = pitch / 1.45 * rng.uniform(0.9, 1.1)
+        char_width = min(0.0075, width / max(len(line), 1))
+        x = x0 + rng.uniform(0, 0.004)
+        words = []
+        for text in line.split():
+            w = char_width * len(text)
+            words.append({
+                "boundingBox": box(x, y + rng.uniform(-0.001, 0.001), w, height),
+                "confidence": round(min(1.0, max(0.05, rng.gauss(confidence, 0.05))), 3),
+                "text": text,
+            })
+            x += w + char_width
+        paragraph.append({
+            "boundingBox": box(words[0]["boundingBox"]["x"], y,
+                               x - char_width - words[0]["boundingBox"]["x"], height),
+            "text": line,
+            "words": words,
+        })
+        rows.append((round(y, 3), line))
+        y += pitch
+    close_paragraph()
+    return blocks, rows
+
+
+def scale_page(rng: random.Random, page_number: int, main_text: str,
+               side_lines: list[str] | None, counts: Counter) -> dict:
+    """An OCR page with realistic geometry and noise for `main_text`."""
+    low_quality = rng.random() < LOW_QUALITY_RATE
+    confidence = rng.uniform(0.35, 0.6) if low_quality else rng.uniform(0.75, 0.98)
+    typo_rate = TYPO_RATE * (5 if low_quality else 1)
+    counts["low_quality_pages"] += low_quality
+
+    main_lines = add_line_noise(rng, main_text.split("\n"), typo_rate, counts)
+    if side_lines is None:
+        blocks, rows = layout_column(rng, main_lines, 0.08, 0.84, 0.05, confidence)
+        text = "\n".join(line for _, line in rows)
+    else:
+        counts["two_column_pages"] += 1
+        side = add_line_noise(rng, side_lines, typo_rate, counts)
+        side_blocks, side_rows = layout_column(rng, side, 0.6, 0.32, 0.05, confidence)
+        blocks, rows = layout_column(rng, main_lines, 0.08, 0.46, 0.05, confidence)
+        blocks = side_blocks + blocks
+        if rng.random() < INTERLEAVED_COLUMNS_RATE:
+            # Read across: lines at the same height from both columns alternate
+            merged = sorted(side_rows + rows, key=lambda r: r[0])
+            text = "\n".join(line for _, line in merged)
+            counts["interleaved_pages"] += 1
+        else:
+            text = "\n".join(line for _, line in side_rows + rows)
+
+    return {
+        "pageNumber": page_number,
+        "confidence": round(confidence, 3),
+        "text": text,
+        "textBlocks": blocks,
+    }
+
+
+def scale_document(seed: int, index: int, width: int) -> tuple[str, dict, Counter]:
+    """Document `index` of the scale corpus; depends only on seed and index."""
+    rng = random.Random(f"{seed}:{index}")
+    counts = Counter(documents=1)
+    person = synthetic_person(rng)
+    person["name"] = f"{person['firstname']} {person['surname']}"
+    dob = person["dob"].split("/")
+    doc_id = f"{person['surname']}_{person['firstname']}_{dob[0]}{dob[1]}{dob[2][2:]}_{index:0{width}d}"
+
+    address_pages = pick(rng, SCALE_PAGE_COUNTS)
+    plan = []
+    for _ in range(address_pages):
+        plan.append("address")
+        if rng.random() < CONTINUATION_PAGE_RATE:
+            plan.append("continuation")
+    if not plan:
+        plan = ["continuation"]
+        counts["no_address_documents"] += 1
+
+    pages = []
+    for page_number, kind in enumerate(plan, start=1):
+        if kind == "address":
+            expected = synthetic_address_page(rng, page_number, person)
+            method = expected["extraction"]["method"]
+            counts[f"method_{method}"] += 1
+            text = GENERATORS[method](expected)
+            side = letterhead_column(rng, person) if rng.random() < TWO_COLUMN_RATE else None
+        else:
+            counts["continuation_pages"] += 1
+            text = continuation_text(rng, page_number, len(plan))
+            side = None
+        pages.append(scale_page(rng, page_number, text, side, counts))
+    counts["pages"] += len(pages)
+
+    doc = {
+        "documentId": doc_id,
+        "confidence": round(sum(p["confidence"] for p in pages) / len(pages), 3),
+        "engineVersion": "1.0.0",
+        "id": f"SYNTH-{doc_id}",
+        "metadata": {
+            "detectedLanguages": ["en-GB"],
+            "options": {
+                "recognitionLevel": "accurate",
+                "useLanguageCorrection": True,
+                "languages": ["en-GB"],
+            },
+            "pageCount": len(pages),
+            "processingTime": round(rng.uniform(0.4, 1.5) * len(pages), 2),
+            "warnings": [],
+        },
+        "processedAt": "2026-03-16T00:00:00Z",
+        "pages": pages,
+    }
+    return doc_id, doc, counts
+
+
+def write_scale_batch(task: tuple) -> Counter:
+    """Worker: generate and write documents [start, stop)."""
+    out_dir, seed, start, stop, width = task
+    totals = Counter()
+    for index in range(start, stop):
+        doc_id, doc, counts = scale_document(seed, index, width)
+        data = json.dumps(doc, separators=(",", ":"))
+        with open(os.path.join(out_dir, f"{doc_id}.json"), "w") as f:
+            f.write(data)
+        counts["bytes"] += len(data.encode())
+        totals += counts
+    return totals
+
+
+def generate_scale(args):
+    out_dir = args.out / "input_ocr"
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for f in out_dir.glob("*.json"):
+        f.unlink()
+
+    width = max(6, len(str(max(args.scale - 1, 0))))
+    tasks = [
+        (str(out_dir), args.seed, start, min(start + args.batch, args.scale), width)
+        for start in range(0, args.scale, args.batch)
+    ]
+    totals = Counter()
+    start = time.perf_counter()
+    with Pool(args.workers) as pool:
+        for done, counts in enumerate(pool.imap_unordered(write_scale_batch, tasks), 1):
+            totals += counts
+            if done % 50 == 0:
+                print(f"  {totals['documents']} documents...")
+    elapsed = time.perf_counter() - start
+
+    summary = {
+        "description": "Synthetic OCR scale corpus from generate_synthetic_ocr.py --scale",
+        "parameters": {"documents": args.scale, "seed": args.seed},
+        "totals": dict(sorted(totals.items())),
+    }
+    with open(args.out / "summary.json", "w") as f:
+        json.dump(summary, f, indent=2)
+    print(f"Generated {totals['documents']} documents ({totals['pages']} pages, "
+          f"{totals['bytes'] / 1e6:.0f} MB) in {out_dir} in {elapsed:.1f}s "
+          f"with {args.workers} workers")
+
+
 def generate_all():
     if not EXPECTED_DIR.exists():
         print(f"ERROR: expected addresses not found: {EXPECTED_DIR}")
@@ -396,5 +762,25 @@ def generate_all():
     print(f"Generated {generated} synthetic OCR files in {INPUT_DIR}")
 
 
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic OCR inputs")
+    parser.add_argument("--scale", type=int, metavar="N",
+                        help="Generate N random documents instead of one per fixture")
+    parser.add_argument("--out", type=Path, help="Output directory for --scale")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch", type=int, default=200, help="Documents per worker task")
+    args = parser.parse_args()
+
+    if args.scale is None:
+        generate_all()
+        return
+    if args.out is None:
+        parser.error("--scale needs --out")
+    if args.scale < 0 or args.workers < 1 or args.batch < 1:
+        parser.error("--scale must be >= 0, --workers and --batch >= 1")
+    generate_scale(args)
+
+
 if __name__ == "__main__":
-    generate_all()
+    main()
@@ -0,0 +1,456 @@
+#!/usr/bin/env python3
+"""
+Compact columnar encoding of YianaOCRService `.ocr_results` JSON.
+
+OCR JSON repeats boundingBox/confidence/text keys for every word, so files
+are mostly key names and punctuation. This format keeps the document and
+page fields (page text included) as a small JSON header and stores each
+page's block -> line -> word hierarchy column-wise:
+
+    b"YOCR", u16 version, u16 reserved
+    u32 length, header JSON    document fields, page fields, page layouts
+    u32 length, strings JSON   string table: block, line and word texts
+    column data, per page, for blocks then lines then words:
+        boxes       float[4n]   if the items have a boundingBox
+        confidence  float[n]    if the items have a confidence
+        text        u32[n]      string table index, if the items have text
+        children    u32[n + 1]  start of each item's lines/words, then the end
+
+Numbers are little-endian. Floats are float32 when that loses nothing:
+either every value already is a float32 (Vision's output) or every value
+is a short decimal that float32 recovers at 7 significant digits
+(make_ocr_page and other synthetic data). Otherwise the page is stored as
+float64. Integer values (Swift's JSONEncoder writes 1.0 as 1) are stored
+as floats and their positions listed in the page layout, so they decode
+as ints again. A page whose hierarchy is irregular — items at one level
+with different keys, unknown keys, non-numeric boxes, integers a double
+cannot hold — keeps its textBlocks as JSON. Either way
+decode(encode(doc)) serialises to the same JSON as doc.
+
+Page text lives in the header, so reading it touches neither the columns
+nor the string table. ocr_json.load_page_texts() and load_top_fields()
+recognise this format by its magic bytes and read it that way.
+
+Usage:
+    from ocr_columnar import encode, decode, read_document, write_document
+
+    python3 migration/ocr_columnar.py convert SRC_DIR DST_DIR            # JSON -> .ocrc
+    python3 migration/ocr_columnar.py convert SRC_DIR DST_DIR --to json  # .ocrc -> JSON
+    python3 migration/ocr_columnar.py bench migration/fixtures/extraction/input_ocr
+"""
+
+import argparse
+import json
+import mmap
+import struct
+import sys
+import time
+from array import array
+from pathlib import Path
+
+MAGIC = b"YOCR"
+VERSION = 1
+SUFFIX = ".ocrc"
+
+_PREAMBLE = struct.Struct("<4sHHI")
+_LENGTH = struct.Struct("<I")
+
+# (child key, allowed keys) for blocks, lines and words
+_LEVELS = (
+    ("lines", ("boundingBox", "confidence", "text", "lines")),
+    ("words", ("boundingBox", "confidence", "text", "words")),
+    (None, ("boundingBox", "confidence", "text")),
+)
+_BOX_KEYS = frozenset(("x", "y", "width", "height"))
+_SWAP = sys.byteorder == "big"
+
+
+def is_columnar(buf) -> bool:
+    return bytes(buf[:4]) == MAGIC
+
+
+# --- Encoding ---
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _flatten(blocks):
+    """Items per level and layout keys, or None if the hierarchy is irregular."""
+    if not isinstance(blocks, list):
+        return None
+    levels = []
+    items = blocks
+    for child, allowed in _LEVELS:
+        keys = tuple(items[0]) if items and isinstance(items[0], dict) else ()
+        if not set(keys) <= set(allowed):
+            return None
+        box_keys = ()
+        if "boundingBox" in keys:
+            first = items[0]["boundingBox"]
+            if not isinstance(first, dict) or set(first) != _BOX_KEYS:
+                return None
+            box_keys = tuple(first)
+        children = []
+        starts = [0]
+        for item in items:
+            if not isinstance(item, dict) or tuple(item) != keys:
+                return None
+            if box_keys:
+                box = item["boundingBox"]
+                if not isinstance(box, dict) or tuple(box) != box_keys:
+                    return None
+                if not all(_is_number(box[k]) for k in box_keys):
+                    return None
+            if "confidence" in keys and not _is_number(item["confidence"]):
+                return None
+            if "text" in keys and not isinstance(item["text"], str):
+                return None
+            if child in keys:
+                kids = item[child]
+                if not isinstance(kids, list):
+                    return None
+                children.extend(kids)
+                starts.append(len(children))
+        levels.append({"items": items, "keys": keys, "box": box_keys,
+                       "starts": starts if child in keys else None})
+        items = children
+    return levels
+
+
+def _float_mode(values: list[float]) -> str:
+    """'f' if float32 holds every value exactly, 'g' if float32 plus 7
+    significant digits recovers every value, else 'd'."""
+    try:
+        narrowed = array("f", values).tolist()
+    except OverflowError:
+        return "d"
+    if narrowed == values:
+        return "f"
+    if all(float(format(n, ".7g")) == v for n, v in zip(narrowed, values)):
+        return "g"
+    return "d"
+
+
+def _pack(typecode: str, values) -> bytes:
+    a = array(typecode, values)
+    if _SWAP:
+        a.byteswap()
+    return a.tobytes()
+
+
+def _encode_json(blocks, data: bytearray) -> dict:
+    raw = json.dumps(blocks, separators=(",", ":")).encode()
+    layout = {"json": [len(data), len(raw)]}
+    data += raw
+    return layout
+
+
+def _encode_blocks(blocks, strings: dict, data: bytearray) -> dict:
+    levels = _flatten(blocks)
+    if levels is None:
+        return _encode_json(blocks, data)
+
+    numbers = []
+    for level in levels:
+        for item in level["items"]:
+            if level["box"]:
+                box = item["boundingBox"]
+                numbers.extend(box[k] for k in level["box"])
+        if "confidence" in level["keys"]:
+            numbers.extend(item["confidence"] for item in level["items"])
+    floats = [float(n) for n in numbers]
+    ints = [i for i, n in enumerate(numbers) if isinstance(n, int)]
+    if any(floats[i] != numbers[i] for i in ints):
+        return _encode_json(blocks, data)
+    mode = _float_mode(floats)
+    typecode = "d" if mode == "d" else "f"
+
+    layout = {
+        "offset": len(data),
+        "float": mode,
+        "counts": [len(level["items"]) for level in levels],
+        "keys": [list(level["keys"]) for level in levels],
+        "box": [list(level["box"]) for level in levels],
+    }
+    if ints:
+        # Positions in the page's float columns, in the order written
+        layout["ints"] = True if len(ints) == len(numbers) else ints
+    for level in levels:
+        items = level["items"]
+        if level["box"]:
+            data += _pack(typecode, [
+                float(item["boundingBox"][k]) for item in items for k in level["box"]
+            ])
+        if "confidence" in level["keys"]:
+            data += _pack(typecode, [float(item["confidence"]) for item in items])
+        if "text" in level["keys"]:
+            data += _pack("I", [strings.setdefault(item["text"], len(strings)) for item in items])
+        if level["starts"] is not None:
+            data += _pack("I", level["starts"])
+    return layout
+
+
+def encode(doc: dict) -> bytes:
+    """Encode a parsed OCR JSON document."""
+    strings: dict[str, int] = {}
+    data = bytearray()
+    pages = []
+    for page in doc.get("pages") or []:
+        fields = dict(page)
+        entry = {"fields": fields}
+        if "textBlocks" in fields:
+            entry["layout"] = _encode_blocks(fields["textBlocks"], strings, data)
+            fields["textBlocks"] = None
+        pages.append(entry)
+
+    document = dict(doc)
+    if "pages" in document:
+        document["pages"] = None
+    header = json.dumps({"document": document, "pages": pages},
+                        separators=(",", ":")).encode()
+    table = json.dumps(list(strings), separators=(",", ":")).encode()
+    return b"".join([
+        _PREAMBLE.pack(MAGIC, VERSION, 0, len(header)), header,
+        _LENGTH.pack(len(table)), table, data,
+    ])
+
+
+# --- Decoding ---
+
+def _read_header(buf) -> tuple[dict, int]:
+    """The header and the offset just past it."""
+    magic, version, _, length = _PREAMBLE.unpack_from(buf, 0)
+    if magic != MAGIC:
+        raise ValueError("not a columnar OCR file")
+    if version != VERSION:
+        raise ValueError(f"unsupported columnar OCR version {version}")
+    end = _PREAMBLE.size + length
+    return json.loads(bytes(buf[_PREAMBLE.size:end])), end
+
+
+def _unpack(typecode: str, buf, offset: int, count: int) -> tuple[list, int]:
+    a = array(typecode)
+    end = offset + count * a.itemsize
+    a.frombytes(buf[offset:end])
+    if _SWAP:
+        a.byteswap()
+    return a.tolist(), end
+
+
+def _short_decimals(values: list) -> list:
+    """float32 values back to the short decimals they were encoded from."""
+    lookup = {v: float(format(v, ".7g")) for v in set(values)}
+    return [lookup[v] for v in values]
+
+
+def _int_restorer(ints):
+    """A function turning the listed positions of successive float
+    columns back into ints; ints is a position list, or True for all."""
+    if not ints:
+        return lambda values: values
+    if ints is True:
+        return lambda values: [int(v) for v in values]
+    pending = iter(ints)
+    next_int = next(pending, None)
+    start = 0
+
+    def restore(values):
+        nonlocal next_int, start
+        end = start + len(values)
+        while next_int is not None and next_int < end:
+            values[next_int - start] = int(values[next_int - start])
+            next_int = next(pending, None)
+        start = end
+        return values
+    return restore
+
+
+def _decode_blocks(layout: dict, strings: list, buf, base: int) -> list:
+    if "json" in layout:
+        offset, length = layout["json"]
+        return json.loads(bytes(buf[base + offset:base + offset + length]))
+
+    mode = layout["float"]
+    typecode = "d" if mode == "d" else "f"
+    pos = base + layout["offset"]
+    ints = layout.get("ints", ())
+    restore = _int_restorer(ints)
+    levels = []
+    for count, keys, box_keys in zip(layout["counts"], layout["keys"], layout["box"]):
+        columns = {}
+        if box_keys:
+            values, pos = _unpack(typecode, buf, pos, 4 * count)
+            if mode == "g":
+                values = _short_decimals(values)
+            values = restore(values)
+            k0, k1, k2, k3 = box_keys
+            it = iter(values)
+            columns["boundingBox"] = [
+                {k0: a, k1: b, k2: c, k3: d} for a, b, c, d in zip(it, it, it, it)
+            ]
+        if "confidence" in keys:
+            values, pos = _unpack(typecode, buf, pos, count)
+            if mode == "g":
+                values = _short_decimals(values)
+            columns["confidence"] = restore(values)
+        if "text" in keys:
+            indexes, pos = _unpack("I", buf, pos, count)
+            columns["text"] = [strings[i] for i in indexes]
+        child = next((k for k in ("lines", "words") if k in keys), None)
+        starts = None
+        if child:
+            starts, pos = _unpack("I", buf, pos, count + 1)
+        levels.append((count, keys, child, starts, columns))
+
+    below = []
+    for count, keys, child, starts, columns in reversed(levels):
+        if child:
+            columns[child] = [below[a:b] for a, b in zip(starts, starts[1:])]
+        if keys:
+            below = [dict(zip(keys, row)) for row in zip(*(columns[k] for k in keys))]
+        else:
+            below = [{} for _ in range(count)]
+    return below
+
+
+def decode(buf) -> dict:
+    """Decode a columnar OCR file held in a bytes-like buffer."""
+    header, pos = _read_header(buf)
+    (length,) = _LENGTH.unpack_from(buf, pos)
+    pos += _LENGTH.size
+    strings = json.loads(bytes(buf[pos:pos + length]))
+    base = pos + length
+
+    pages = []
+    for entry in header["pages"]:
+        page = entry["fields"]
+        if "layout" in entry:
+            page["textBlocks"] = _decode_blocks(entry["layout"], strings, buf, base)
+        pages.append(page)
+    doc = header["document"]
+    if "pages" in doc:
+        doc["pages"] = pages
+    return doc
+
+
+def parse_page_fields(buf, fields) -> list[dict]:
+    """The named fields of each page (e.g. pageNumber, text), from the header only."""
+    header, _ = _read_header(buf)
+    return [
+        {k: entry["fields"][k] for k in fields if k in entry["fields"]}
+        for entry in header["pages"]
+    ]
+
+
+def parse_top_fields(buf, fields) -> dict:
+    """The named top-level document fields, from the header only."""
+    header, _ = _read_header(buf)
+    document = header["document"]
+    return {k: document[k] for k in fields if k in document and k != "pages"}
+
+
+def read_document(path: str | Path) -> dict:
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return decode(mm)
+
+
+def write_document(path: str | Path, doc: dict) -> None:
+    Path(path).write_bytes(encode(doc))
+
+
+def round_trips(doc: dict, buf) -> bool:
+    """Whether buf decodes to doc. Compared as JSON text, since 1 == 1.0."""
+    return json.dumps(decode(buf)) == json.dumps(doc)
+
+
+# --- Command line ---
+
+def convert(src: Path, dst: Path, to_json: bool, indent: int | None) -> None:
+    dst.mkdir(parents=True, exist_ok=True)
+    pattern = f"*{SUFFIX}" if to_json else "*.json"
+    converted = src_bytes = dst_bytes = 0
+    for path in sorted(src.glob(pattern)):
+        raw = path.read_bytes()
+        if to_json:
+            out = json.dumps(decode(raw), indent=indent).encode()
+            target = dst / f"{path.stem}.json"
+        else:
+            doc = json.loads(raw)
+            out = encode(doc)
+            if not round_trips(doc, out):
+                raise SystemExit(f"{path.name}: round trip mismatch")
+            target = dst / f"{path.stem}{SUFFIX}"
+        target.write_bytes(out)
+        converted += 1
+        src_bytes += len(raw)
+        dst_bytes += len(out)
+    ratio = src_bytes / dst_bytes if dst_bytes else 0
+    print(f"Converted {converted} files: {src_bytes / 1e6:.1f} MB -> "
+          f"{dst_bytes / 1e6:.1f} MB ({ratio:.1f}x)")
+
+
+def bench(src: Path, limit: int, repeat: int) -> None:
+    # Imported here: ocr_json imports this module
+    from ocr_json import PAGE_FIELDS, parse_page_texts
+
+    files = sorted(src.glob("*.json"))
+    if limit:
+        files = files[:limit]
+    json_blobs = [f.read_bytes() for f in files]
+    docs = [json.loads(b) for b in json_blobs]
+    col_blobs = [encode(d) for d in docs]
+    mismatches = sum(not round_trips(d, b) for b, d in zip(col_blobs, docs))
+
+    def best(fn, blobs) -> float:
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for b in blobs:
+                fn(b)
+            times.append(time.perf_counter() - start)
+        return min(times)
+
+    json_size = sum(map(len, json_blobs))
+    compact_size = sum(len(json.dumps(d, separators=(",", ":"))) for d in docs)
+    col_size = sum(map(len, col_blobs))
+    rows = [
+        ("full decode", best(json.loads, json_blobs), best(decode, col_blobs)),
+        ("page text", best(parse_page_texts, json_blobs),
+         best(lambda b: parse_page_fields(b, PAGE_FIELDS), col_blobs)),
+    ]
+
+    print(f"{len(files)} documents from {src}")
+    print(f"  size   JSON {json_size / 1e6:8.2f} MB   compact JSON {compact_size / 1e6:8.2f} MB   "
+          f"columnar {col_size / 1e6:8.2f} MB   ({json_size / max(col_size, 1):.1f}x smaller)")
+    for name, t_json, t_col in rows:
+        print(f"  {name:<12} JSON {t_json * 1e3:8.1f} ms   columnar {t_col * 1e3:8.1f} ms   "
+              f"({t_json / max(t_col, 1e-9):.1f}x faster)")
+    print(f"  round trip mismatches: {mismatches}")
+    if mismatches:
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Columnar OCR format tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("convert", help="Convert a directory between JSON and columnar")
+    p.add_argument("src", type=Path)
+    p.add_argument("dst", type=Path)
+    p.add_argument("--to", choices=("columnar", "json"), default="columnar")
+    p.add_argument("--indent", type=int, default=None, help="JSON indent for --to json")
+    p = sub.add_parser("bench", help="Compare size and parse time against JSON")
+    p.add_argument("src", type=Path, help="Directory of OCR JSON files")
+    p.add_argument("--limit", type=int, default=0)
+    p.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.command == "convert":
+        convert(args.src, args.dst, args.to == "json", args.indent)
+    else:
+        bench(args.src, args.limit, max(1, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
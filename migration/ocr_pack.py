@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+Single-file pack of a corpus's OCR results, with random access by document ID.
+
+The migration tools otherwise glob and open one small JSON file per
+document, and every open on the iCloud-backed `.ocr_results/` is slow. A
+pack holds every document in one file, each in the columnar encoding of
+ocr_columnar.py, followed by an index from document ID to its byte range:
+
+    b"YOCRPACK", u32 version, u32 reserved
+    records        one ocr_columnar document after another
+    index JSON     {doc_id: [offset, length, page count, source, mtime_ns, size]}
+    u64 index offset, u64 index length, b"YOCRPACK"
+
+OCRPack memory-maps the file: looking a document up reads only its own
+record, and page text only that record's header. Iterating yields
+documents in file order, so a corpus-wide pass is one sequential read.
+
+build_pack() updates a pack from a directory tree incrementally. Source
+files whose mtime and size match the index are kept as they are. Changed
+and new files are encoded and appended, followed by a fresh index and
+footer. The footer is read from the end of the file, so the pack has no
+valid index while an append is under way; an append that raises is
+truncated back to the old end, which brings the previous footer back.
+A build killed mid-append leaves a pack that fails to open, and the
+next build_pack() rewrites it from scratch. Once superseded records and indexes make up more than half the
+file, it is rewritten in document ID order instead. A document ID found
+in several files comes from the first path in sorted order, as in
+corpus_index.py.
+
+The pack holds real OCR text, so by default it lives under
+migration/.cache/, which is gitignored.
+
+Usage:
+    with OCRPack(DEFAULT_PACK_PATH) as pack:
+        pack.page_texts(doc_id)     # [{"pageNumber", "confidence", "text"}, ...]
+        pack.document(doc_id)       # the full OCR JSON document
+        for doc_id, doc in pack.iter_documents(): ...
+
+    python3 migration/ocr_pack.py build --ocr-dir ~/.../.ocr_results [--jobs 8]
+    python3 migration/ocr_pack.py info
+    python3 migration/ocr_pack.py show DOC_ID
+"""
+
+import argparse
+import heapq
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+from multiprocessing import Pool
+from pathlib import Path
+
+import ocr_columnar
+from ocr_json import PAGE_FIELDS
+
+DEFAULT_PACK_PATH = Path(__file__).parent / ".cache" / "ocr_results.ocrpack"
+
+MAGIC = b"YOCRPACK"
+VERSION = 1
+SOURCE_SUFFIXES = (".json", ocr_columnar.SUFFIX)
+
+_HEADER = struct.Struct("<8sII")
+_FOOTER = struct.Struct("<QQ8s")
+
+# Rewrite the pack once superseded bytes exceed this share of the file
+COMPACT_RATIO = 0.5
+
+
+class OCRPack:
+    """Read-only, memory-mapped view of a pack file."""
+
+    def __init__(self, path: str | Path = DEFAULT_PACK_PATH):
+        self.path = Path(path)
+        self._file = open(self.path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"{self.path}: empty pack file")
+        self._view = memoryview(self._mm)
+        try:
+            self.index = _read_index(self._mm)
+        except ValueError:
+            self.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        self._view.release()
+        self._mm.close()
+        self._file.close()
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self.index
+
+    def doc_ids(self) -> list[str]:
+        return sorted(self.index)
+
+    def page_count(self, doc_id: str) -> int:
+        return self.index[doc_id][2]
+
+    def record(self, doc_id: str) -> memoryview:
+        """The document's columnar encoding, without copying."""
+        offset, length = self.index[doc_id][:2]
+        return self._view[offset:offset + length]
+
+    def document(self, doc_id: str) -> dict:
+        """The full OCR JSON document."""
+        return ocr_columnar.decode(self.record(doc_id))
+
+    def page_texts(self, doc_id: str) -> list[dict]:
+        """pageNumber/confidence/text per page, as ocr_json.load_page_texts()."""
+        return ocr_columnar.parse_page_fields(self.record(doc_id), PAGE_FIELDS)
+
+    def top_fields(self, doc_id: str, fields=("confidence",)) -> dict:
+        """Selected top-level fields, as ocr_json.load_top_fields()."""
+        return ocr_columnar.parse_top_fields(self.record(doc_id), fields)
+
+    def text_document(self, doc_id: str) -> dict:
+        """documentId and page texts only: what the extractors read."""
+        top = self.top_fields(doc_id, ("documentId",))
+        return {"documentId": top.get("documentId", doc_id), "pages": self.page_texts(doc_id)}
+
+    def iter_documents(self):
+        """(doc_id, document) for every document, in file order."""
+        for doc_id in sorted(self.index, key=lambda d: self.index[d][0]):
+            yield doc_id, self.document(doc_id)
+
+
+def _read_index(buf) -> dict:
+    if len(buf) < _HEADER.size + _FOOTER.size:
+        raise ValueError("truncated pack")
+    magic, version, _ = _HEADER.unpack_from(buf, 0)
+    if magic != MAGIC:
+        raise ValueError("not an OCR pack")
+    if version != VERSION:
+        raise ValueError(f"unsupported OCR pack version {version}")
+    offset, length, magic = _FOOTER.unpack_from(buf, len(buf) - _FOOTER.size)
+    if magic != MAGIC or offset + length > len(buf) - _FOOTER.size:
+        raise ValueError("pack has no valid index (interrupted build?)")
+    return json.loads(bytes(buf[offset:offset + length]))
+
+
+# --- Building ---
+
+def scan_sources(ocr_dir: Path) -> dict:
+    """doc_id -> (path relative to ocr_dir, mtime_ns, size) for every OCR file."""
+    found = {}
+    for root, dirs, files in os.walk(ocr_dir):
+        dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+        for name in sorted(files):
+            stem, suffix = os.path.splitext(name)
+            if suffix not in SOURCE_SUFFIXES or name.startswith("."):
+                continue
+            path = os.path.join(root, name)
+            rel = os.path.relpath(path, ocr_dir)
+            if stem in found and found[stem][0] < rel:
+                continue
+            st = os.stat(path)
+            found[stem] = (rel, st.st_mtime_ns, st.st_size)
+    return found
+
+
+def encode_file(path: str) -> tuple[bytes, int]:
+    """A source file as a columnar record, and its page count."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if ocr_columnar.is_columnar(data):
+        return data, len(ocr_columnar.parse_page_fields(data, ()))
+    doc = json.loads(data)
+    return ocr_columnar.encode(doc), len(doc.get("pages") or [])
+
+
+def _write_tail(f, index: dict) -> None:
+    data = json.dumps(index, separators=(",", ":")).encode()
+    offset = f.tell()
+    f.write(data)
+    f.write(_FOOTER.pack(offset, len(data), MAGIC))
+
+
+def build_pack(ocr_dir: str | Path, pack_path: str | Path = DEFAULT_PACK_PATH,
+               jobs: int = 1) -> dict:
+    """Bring the pack at pack_path up to date with the OCR files under ocr_dir.
+
+    Returns counts: {"unchanged", "encoded", "removed", "failed", "rewritten"}.
+    A pack that is already up to date is left untouched.
+    """
+    ocr_dir = Path(ocr_dir)
+    pack_path = Path(pack_path)
+    pack_path.parent.mkdir(parents=True, exist_ok=True)
+    sources = scan_sources(ocr_dir)
+
+    old = None
+    if pack_path.exists():
+        try:
+            old = OCRPack(pack_path)
+        except ValueError as e:
+            print(f"Rebuilding {pack_path}: {e}")
+    old_index = old.index if old else {}
+
+    kept = {
+        doc_id: entry for doc_id, entry in old_index.items()
+        if doc_id in sources and tuple(entry[3:6]) == sources[doc_id]
+    }
+    changed = sorted(doc_id for doc_id in sources if doc_id not in kept)
+    stats = {
+        "unchanged": len(kept), "encoded": 0, "failed": 0,
+        "removed": sum(1 for doc_id in old_index if doc_id not in sources),
+    }
+
+    def records():
+        """(doc_id, record, page count) for changed documents, in order."""
+        paths = [str(ocr_dir / sources[doc_id][0]) for doc_id in changed]
+        results = _encoded_safely(paths, jobs)
+        for doc_id, result in zip(changed, results):
+            if result is None:
+                stats["failed"] += 1
+                continue
+            stats["encoded"] += 1
+            yield doc_id, result[0], result[1]
+
+    if old is not None and not changed and not stats["removed"]:
+        old.close()
+        stats["rewritten"] = False
+        return stats
+
+    live = sum(entry[1] for entry in kept.values())
+    size = pack_path.stat().st_size if old else 0
+    superseded = size - _HEADER.size - live
+    rewrite = old is None or superseded > COMPACT_RATIO * size
+    stats["rewritten"] = rewrite
+
+    try:
+        if rewrite:
+            _rewrite(pack_path, old, kept, records(), sources)
+        else:
+            _append(pack_path, kept, records(), sources, old_index)
+    finally:
+        if old:
+            old.close()
+    return stats
+
+
+def _encoded_safely(paths: list[str], jobs: int):
+    """encode_file() results for paths, in order; None where a file is unreadable."""
+    if jobs <= 1 or len(paths) <= 1:
+        return map(_encode_or_none, paths)
+    pool = Pool(jobs)
+    chunksize = max(1, len(paths) // (jobs * 8))
+    return _closing_imap(pool, paths, chunksize)
+
+
+def _encode_or_none(path: str):
+    try:
+        return encode_file(path)
+    except (OSError, ValueError):
+        return None
+
+
+def _closing_imap(pool, paths, chunksize):
+    try:
+        yield from pool.imap(_encode_or_none, paths, chunksize)
+    finally:
+        pool.terminate()
+
+
+def _entry(offset: int, length: int, pages: int, source: tuple) -> list:
+    return [offset, length, pages, *source]
+
+
+def _append(pack_path: Path, kept: dict, records, sources: dict, old_index: dict) -> None:
+    """Append changed records and a new index after the current end.
+
+    Nothing is written if every changed file failed to encode and none of
+    them was in the old index either. On any error the file is truncated
+    back to its old size, so the old footer is at the end again.
+    """
+    index = dict(kept)
+    with open(pack_path, "r+b") as f:
+        end = f.seek(0, os.SEEK_END)
+        try:
+            for doc_id, record, pages in records:
+                index[doc_id] = _entry(f.tell(), len(record), pages, sources[doc_id])
+                f.write(record)
+            if index == old_index:
+                return
+            _write_tail(f, index)
+            f.flush()
+            os.fsync(f.fileno())
+        except BaseException:
+            f.truncate(end)
+            raise
+
+
+def _rewrite(pack_path: Path, old, kept: dict, records, sources: dict) -> None:
+    """Write a fresh pack in doc ID order and swap it in."""
+    copied = ((doc_id, None, None) for doc_id in sorted(kept))
+    tmp = pack_path.with_name(pack_path.name + ".tmp")
+    index = {}
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, 0))
+        for doc_id, record, pages in heapq.merge(copied, records, key=lambda r: r[0]):
+            if record is None:
+                record, pages = old.record(doc_id), kept[doc_id][2]
+            index[doc_id] = _entry(f.tell(), len(record), pages, sources[doc_id])
+            f.write(record)
+        _write_tail(f, index)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, pack_path)
+
+
+# --- Command line ---
+
+def main():
+    parser = argparse.ArgumentParser(description="Build and inspect OCR corpus packs")
+    parser.add_argument("--pack", type=Path, default=DEFAULT_PACK_PATH,
+                        help=f"Pack file (default: {DEFAULT_PACK_PATH})")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("build", help="Create or incrementally update the pack")
+    p.add_argument("--ocr-dir", type=Path, required=True, help="Directory tree of OCR files")
+    p.add_argument("--jobs", "-j", type=int, default=1,
+                   help="Encoding processes (0 = one per CPU, default: 1)")
+    sub.add_parser("info", help="Document, page and byte counts")
+    p = sub.add_parser("show", help="Print one document as JSON")
+    p.add_argument("doc_id")
+    p.add_argument("--text", action="store_true", help="Page texts only")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+        started = time.perf_counter()
+        stats = build_pack(args.ocr_dir, args.pack, jobs)
+        print(f"{args.pack}: {stats['encoded']} encoded, {stats['unchanged']} unchanged, "
+              f"{stats['removed']} removed, {stats['failed']} unreadable"
+              f"{' (rewritten)' if stats['rewritten'] else ''} "
+              f"in {time.perf_counter() - started:.1f}s")
+        return
+
+    with OCRPack(args.pack) as pack:
+        if args.command == "info":
+            live = sum(entry[1] for entry in pack.index.values())
+            size = args.pack.stat().st_size
+            pages = sum(entry[2] for entry in pack.index.values())
+            print(f"{args.pack}: {len(pack)} documents, {pages} pages, "
+                  f"{size / 1e6:.1f} MB ({live / 1e6:.1f} MB live)")
+        elif args.doc_id not in pack:
+            sys.exit(f"{args.doc_id}: not in pack")
+        else:
+            doc = pack.text_document(args.doc_id) if args.text else pack.document(args.doc_id)
+            print(json.dumps(doc, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -7,17 +7,33 @@ address JSON, replaces all PII with synthetic equivalents while preserving
 structure, field types, and extraction method distribution.
 
 Usage:
-    python3 migration/scrub_fixtures.py --select   # pick 50 documents, copy raw
-    python3 migration/scrub_fixtures.py --scrub     # anonymise the raw copies
+    python3 migration/scrub_fixtures.py --select   # pick ~50 documents, copy raw
+    python3 migration/scrub_fixtures.py --scrub     # anonymise the raw copies (-j N workers)
     python3 migration/scrub_fixtures.py --verify    # check no real PII remains
 
 The --select step writes raw (unscrubbed) files to migration/fixtures/_raw/.
 The --scrub step reads from _raw/, writes scrubbed files to the final directories.
 The _raw/ directory is gitignored and must be deleted after inspection.
+
+--select reads per-document metadata (page methods, overrides, OCR file
+location and confidence) from the corpus index in
+migration/.cache/corpus.sqlite (see corpus_index.py), re-parsing only
+address files changed since last run. Documents are drawn in one pass by
+seeded reservoir sampling, per quota (--quota, default SELECTION_QUOTAS)
+and optionally per stratum, for larger balanced sets:
+
+    python3 migration/scrub_fixtures.py --select --quota method=form:100 \
+        --strata method,pages,confidence --per-stratum 5
+
+With --ocr-pack, --select first brings that OCR pack (see ocr_pack.py) up
+to date with .ocr_results/, then writes the selected OCR documents from
+it instead of copying each file out of iCloud.
 """
 
 import argparse
+import fnmatch
 import hashlib
+import heapq
 import json
 import os
 import random
@@ -25,8 +41,12 @@ import re
 import shutil
 import string
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+from corpus_index import DEFAULT_INDEX_PATH, CorpusIndex, StratifiedReservoir
+from ocr_pack import DEFAULT_PACK_PATH, OCRPack, build_pack
+
 # --- Paths ---
 ICLOUD_BASE = Path.home() / "Library/Mobile Documents/iCloud~com~vitygas~Yiana/Documents"
 ADDRESSES_DIR = ICLOUD_BASE / ".addresses"
@@ -114,6 +134,8 @@ class SyntheticMapper:
         self._used_last = set()
         self._used_streets = set()
         self._postcode_map: dict[str, str] = {}
+        # Compiled OCR-text replacer and the map sizes it was built from
+        self._replacer: tuple[tuple[int, int, int], "OcrReplacer"] | None = None
 
     def _pick(self, pool: list[str], used: set[str]) -> str:
         available = [x for x in pool if x not in used]
@@ -376,173 +398,611 @@ def scrub_address_file(data: dict, mapper: SyntheticMapper) -> dict:
     return scrubbed
 
 
-def scrub_ocr_text(text: str, mapper: SyntheticMapper) -> str:
-    """Replace known PII patterns in OCR full text.
+class PatternTrie:
+    """Character trie over a list of literal patterns, matched in one pass.
 
-    This is necessarily imperfect — OCR text is free-form. We replace:
-    - Names that we've already mapped (from address data)
-    - UK postcodes
-    - Phone numbers
-    - Date patterns that look like DOBs
+    Offsets whose character can start a pattern are found with one regex
+    character class; the trie is then walked from each of them. A
+    pattern's end node lists every index it was given at, so duplicates
+    are kept.
+    """
+
+    def __init__(self, patterns: list[str]):
+        self.root: dict = {}
+        for index, pattern in enumerate(patterns):
+            node = self.root
+            for char in pattern:
+                node = node.setdefault(char, {})
+            # "" marks the end of a pattern
+            node.setdefault("", []).append(index)
+        first_chars = "".join(sorted(c for c in self.root if c))
+        self.starts = re.compile(f"[{re.escape(first_chars)}]") if first_chars else None
+
+    def matches(self, text: str, start: int):
+        """Yield (indices, end) for every pattern occurring at start."""
+        node = self.root
+        for pos in range(start, len(text)):
+            node = node.get(text[pos])
+            if node is None:
+                return
+            if "" in node:
+                yield node[""], pos + 1
+
+    def finditer(self, text: str):
+        """Yield (start, end, indices) for every occurrence, overlaps included."""
+        if self.starts is None:
+            return
+        for m in self.starts.finditer(text):
+            start = m.start()
+            for indices, end in self.matches(text, start):
+                yield start, end, indices
+
+
+class OcrReplacer:
+    """All of a mapper's literal replacements, applied as edits.
+
+    Gives exactly the result of the old chain of str.replace() calls, one
+    per pattern in priority order, without running the patterns that
+    cannot change anything:
+
+    - One PatternTrie pass over the text finds the patterns that occur.
+      Only those are replaced, in priority order, each over the whole
+      current text as str.replace() would.
+    - A replacement can create new occurrences only where it inserted
+      text: its synthetic value and the characters either side, within
+      one pattern length. Those windows are rescanned and any later
+      pattern found there is queued.
+    - Replaced text is tracked as segments of the original (see _resub()),
+      so the result maps back onto the original characters. This matters
+      for the maps that chain (a phone number rewritten by the phone regex
+      is mapped again) and for a synthetic name that is a mapped real one.
+    """
+
+    def __init__(self, replacements: list[tuple[str, str]]):
+        # Index in the trie = priority
+        self.replacements = replacements
+        self.trie = PatternTrie([real for real, _ in replacements])
+        # Characters either side of an insertion a new match can reach
+        self.reach = max((len(real) for real, _ in replacements), default=1) - 1
+        self._compiled: dict[str, re.Pattern] = {}
+
+    def _found(self, text: str, start: int, end: int, after: int) -> set[int]:
+        """Priorities above `after` of patterns starting in text[start:end]."""
+        return {
+            priority
+            for pos in range(max(start, 0), min(end, len(text)))
+            for priorities, _ in self.trie.matches(text, pos)
+            for priority in priorities
+            if priority > after
+        }
+
+    def edits(self, text: str) -> list[tuple[int, int, str]]:
+        """The replacements as (start, end, synthetic) edits, in text order."""
+        pending = {
+            priority for _, _, priorities in self.trie.finditer(text) for priority in priorities
+        }
+        if not pending:
+            return []
+        queue = sorted(pending)
+        segments = [(0, len(text), text, False)]
+        current = text
+        while queue:
+            priority = heapq.heappop(queue)
+            real, synth = self.replacements[priority]
+            if real not in current:
+                continue
+            pattern = self._compiled.get(real)
+            if pattern is None:
+                pattern = self._compiled[real] = re.compile(re.escape(real))
+            inserted = []
+            shift = 0
+            for m in pattern.finditer(current):
+                inserted.append(m.start() + shift)
+                shift += len(synth) - len(real)
+            segments = _resub(segments, pattern, lambda m: synth)
+            current = current.replace(real, synth)
+            found = set()
+            for start in inserted:
+                found |= self._found(
+                    current, start - self.reach, start + len(synth) + self.reach, priority
+                )
+            for later in found - pending:
+                pending.add(later)
+                heapq.heappush(queue, later)
+        return [(start, end, new) for start, end, new, replaced in segments if replaced]
+
+    def sub(self, text: str) -> str:
+        return apply_edits(text, self.edits(text))
+
+
+def apply_edits(text: str, edits: list[tuple[int, int, str]]) -> str:
+    """Apply non-overlapping (start, end, replacement) edits, in text order."""
+    if not edits:
+        return text
+    parts = []
+    pos = 0
+    for start, end, new in edits:
+        parts.append(text[pos:start])
+        parts.append(new)
+        pos = end
+    parts.append(text[pos:])
+    return "".join(parts)
+
+
+def ocr_replacements(mapper: SyntheticMapper) -> list[tuple[str, str]]:
+    """Literal OCR-text replacements for a mapper, highest priority first.
+
+    Order: mapped names longest first, each as-is, upper and title case;
+    then postcodes with and without their space; then address lines. A
+    real value can appear more than once (e.g. a name already in upper
+    case); later entries still count when chaining.
     """
-    result = text
+    replacements = []
 
-    # Replace all mapped names (longest first to avoid partial replacement)
+    # Mapped names (longest first to avoid partial replacement)
     for real, synth in sorted(mapper.name_map.items(), key=lambda x: -len(x[0])):
         if real and len(real) > 2:  # Skip very short strings
-            result = result.replace(real, synth)
+            replacements.append((real, synth))
             # Also try case variants
-            result = result.replace(real.upper(), synth.upper())
-            result = result.replace(real.title(), synth.title())
+            replacements.append((real.upper(), synth.upper()))
+            replacements.append((real.title(), synth.title()))
 
-    # Replace mapped postcodes
     for real_pc, synth_pc in mapper._postcode_map.items():
         if real_pc:
-            result = result.replace(real_pc, synth_pc)
-            result = result.replace(real_pc.replace(" ", ""), synth_pc.replace(" ", ""))
+            replacements.append((real_pc, synth_pc))
+            replacements.append((real_pc.replace(" ", ""), synth_pc.replace(" ", "")))
 
-    # Replace mapped addresses
     for real_addr, synth_addr in mapper.address_map.items():
         if real_addr and len(real_addr) > 3:
-            result = result.replace(real_addr, synth_addr)
+            replacements.append((real_addr, synth_addr))
 
-    # Replace any remaining UK phone numbers not already mapped
-    result = re.sub(r'0\d{3,4}\s?\d{6,7}', lambda m: mapper.map_phone(m.group()), result)
-    result = re.sub(r'07\d{3}\s?\d{6}', lambda m: mapper.map_phone(m.group()), result)
+    return replacements
 
-    return result
 
+def get_ocr_replacer(mapper: SyntheticMapper) -> OcrReplacer:
+    """The mapper's compiled replacer, rebuilt only when its maps have grown.
 
-def scrub_ocr_file(data: dict, mapper: SyntheticMapper) -> dict:
-    """Scrub OCR JSON — replace text content while preserving structure."""
-    scrubbed = dict(data)
+    Maps only ever gain entries (phone numbers are added while scrubbing),
+    so their sizes identify the state the replacer was built from.
+    """
+    sizes = (len(mapper.name_map), len(mapper._postcode_map), len(mapper.address_map))
+    if mapper._replacer is None or mapper._replacer[0] != sizes:
+        mapper._replacer = (sizes, OcrReplacer(ocr_replacements(mapper)))
+    return mapper._replacer[1]
 
-    if "pages" in scrubbed:
-        scrubbed_pages = []
-        for page in scrubbed["pages"]:
-            sp = dict(page)
-            # Scrub full page text
-            if "text" in sp and sp["text"]:
-                sp["text"] = scrub_ocr_text(sp["text"], mapper)
-            # Scrub textBlocks
-            if "textBlocks" in sp:
-                scrubbed_blocks = []
-                for block in sp["textBlocks"]:
-                    sb = dict(block)
-                    if "text" in sb and sb["text"]:
-                        sb["text"] = scrub_ocr_text(sb["text"], mapper)
-                    if "lines" in sb:
-                        scrubbed_lines = []
-                        for line in sb["lines"]:
-                            sl = dict(line)
-                            if "text" in sl and sl["text"]:
-                                sl["text"] = scrub_ocr_text(sl["text"], mapper)
-                            if "words" in sl:
-                                scrubbed_words = []
-                                for word in sl["words"]:
-                                    sw = dict(word)
-                                    if "text" in sw and sw["text"]:
-                                        sw["text"] = scrub_ocr_text(sw["text"], mapper)
-                                    scrubbed_words.append(sw)
-                                sl["words"] = scrubbed_words
-                            scrubbed_lines.append(sl)
-                        sb["lines"] = scrubbed_lines
-                    scrubbed_blocks.append(sb)
-                sp["textBlocks"] = scrubbed_blocks
-            scrubbed_pages.append(sp)
-        scrubbed["pages"] = scrubbed_pages
 
-    return scrubbed
+def _resub(segments: list, pattern: re.Pattern, repl) -> list:
+    """pattern.sub(repl) over the text spelled out by segments.
 
+    Segments are (start, end, text, replaced) pieces of the scrubbed text
+    with the span of the original each came from; unreplaced pieces are
+    the original verbatim. A match is merged with any replaced pieces it
+    touches, so the result still maps back onto the original.
+    """
+    current = "".join(seg[2] for seg in segments)
+    bounds = []
+    offset = 0
+    for seg in segments:
+        bounds.append(offset)
+        offset += len(seg[2])
+
+    out = []
+    i = 0  # first segment not yet emitted
+    done = 0  # characters of segments[i] already emitted
+    tail_end = -1  # end, in current, of the merged match at out[-1]
+
+    for m in pattern.finditer(current):
+        match_start, match_end = m.span()
+        new = repl(m)
+
+        if match_start < tail_end:
+            # Starts in the unreplaced remainder of a replaced piece that
+            # the previous match also touched: extend that merged piece
+            orig_start, orig_end, merged, _ = out.pop()
+            prefix = merged[:len(merged) - (tail_end - match_start)]
+            if match_end <= tail_end:
+                suffix = merged[len(merged) - (tail_end - match_end):]
+                out.append((orig_start, orig_end, prefix + new + suffix, True))
+                tail_end = match_end + len(suffix)
+                continue
+        else:
+            while bounds[i] + len(segments[i][2]) <= match_start:
+                if segments[i][3] or done < len(segments[i][2]):
+                    seg = segments[i]
+                    out.append(seg if seg[3] else
+                               (seg[0] + done, seg[1], seg[2][done:], False))
+                i, done = i + 1, 0
+            start, _, seg_text, replaced = segments[i]
+            local = match_start - bounds[i]
+            if replaced:
+                orig_start, prefix = start, seg_text[:local]
+            else:
+                if local > done:
+                    out.append((start + done, start + local, seg_text[done:local], False))
+                orig_start, prefix = start + local, ""
+
+        j = i
+        while bounds[j] + len(segments[j][2]) < match_end:
+            j += 1
+        start, end, seg_text, replaced = segments[j]
+        local = match_end - bounds[j]
+        if replaced:
+            orig_end, suffix = end, seg_text[local:]
+            i, done = j + 1, 0
+        else:
+            orig_end, suffix = start + local, ""
+            i, done = j, local
+        out.append((orig_start, orig_end, prefix + new + suffix, True))
+        tail_end = match_end + len(suffix)
+
+    for seg in segments[i:]:
+        if seg[3]:
+            out.append(seg)  # Never part-emitted; may be empty
+        elif done < len(seg[2]):
+            out.append((seg[0] + done, seg[1], seg[2][done:], False))
+        done = 0
+    return out
+
+
+# UK phone numbers not already mapped; the second pass also rewrites
+# mobile numbers produced by the first, as it always has
+PHONE_PATTERNS = [
+    re.compile(r'0\d{3,4}\s?\d{6,7}'),
+    re.compile(r'07\d{3}\s?\d{6}'),
+]
 
-def select_documents():
-    """Select 50 representative documents and copy raw files."""
-    if not ADDRESSES_DIR.exists():
-        print(f"ERROR: addresses dir not found: {ADDRESSES_DIR}")
-        sys.exit(1)
 
-    # Categorise all documents by extraction method
-    by_method: dict[str, list[str]] = {}
-    has_overrides = []
-    no_pages = []
+def scrub_ocr_edits(text: str, mapper: SyntheticMapper) -> list[tuple[int, int, str]]:
+    """scrub_ocr_text() as (start, end, replacement) edits to text.
 
-    for f in sorted(ADDRESSES_DIR.iterdir()):
-        if not f.name.endswith(".json"):
-            continue
-        with open(f) as fh:
-            data = json.load(fh)
-        doc_id = f.stem
+    Knowing which original characters each replacement covers lets
+    scrub_ocr_file() scrub a line once and hand the result back to the
+    line's words.
+    """
+    segments = []
+    pos = 0
+    for start, end, new in get_ocr_replacer(mapper).edits(text):
+        if pos < start:
+            segments.append((pos, start, text[pos:start], False))
+        segments.append((start, end, new, True))
+        pos = end
+    if pos < len(text):
+        segments.append((pos, len(text), text[pos:], False))
 
-        pages = data.get("pages", [])
-        if not pages:
-            no_pages.append(doc_id)
-            continue
+    for pattern in PHONE_PATTERNS:
+        segments = _resub(segments, pattern, lambda m: mapper.map_phone(m.group()))
 
-        if data.get("overrides"):
-            has_overrides.append(doc_id)
+    return [(start, end, new) for start, end, new, replaced in segments if replaced]
 
-        for page in pages:
-            method = page.get("extraction", {}).get("method", "unknown")
-            by_method.setdefault(method, []).append(doc_id)
 
-    print("Distribution:")
-    for method, docs in sorted(by_method.items()):
-        unique = list(set(docs))
-        print(f"  {method}: {len(unique)} documents ({len(docs)} pages)")
-    print(f"  has_overrides: {len(has_overrides)}")
-    print(f"  no_pages: {len(no_pages)}")
-
-    # Select sample targeting balanced coverage across extractor methods.
-    # Real corpus distribution: ~880 registration, ~527 label, ~35 form-only,
-    # 3 unstructured, 4 empty. We prioritise under-represented methods.
-    rng = random.Random(42)  # reproducible selection
-    selected = set()
+def scrub_ocr_text(text: str, mapper: SyntheticMapper) -> str:
+    """Replace known PII patterns in OCR full text.
 
-    # Identify documents by PRIMARY method (first page) to avoid pulling in
-    # registration-form documents when we want form-based ones.
-    doc_primary_method = {}
-    for f in sorted(ADDRESSES_DIR.iterdir()):
-        if not f.name.endswith(".json"):
-            continue
-        with open(f) as fh:
-            data = json.load(fh)
-        pages = data.get("pages", [])
-        if not pages:
-            doc_primary_method[f.stem] = "empty"
+    This is necessarily imperfect — OCR text is free-form. We replace:
+    - Names that we've already mapped (from address data)
+    - UK postcodes
+    - Phone numbers
+    - Date patterns that look like DOBs
+
+    Mapped names, postcodes and addresses are replaced in a single pass
+    (see OcrReplacer) with the same result as one str.replace() pass per
+    pattern.
+    """
+    return apply_edits(text, scrub_ocr_edits(text, mapper))
+
+
+def _locate(text: str, parts: list[str]) -> list[int] | None:
+    """Offsets of parts appearing in order in text, or None if they don't."""
+    offsets = []
+    pos = 0
+    for part in parts:
+        found = text.find(part, pos)
+        if found < 0:
+            return None
+        offsets.append(found)
+        pos = found + len(part)
+    return offsets
+
+
+def _splice(text: str, parts: list[str], scrubbed: list[str],
+            mapper: SyntheticMapper) -> str:
+    """Rebuild text from its already-scrubbed parts.
+
+    Text between the parts (normally just newlines) is scrubbed on its own.
+    If the parts can't be found in text, the whole text is scrubbed.
+    """
+    offsets = _locate(text, parts)
+    if offsets is None:
+        return scrub_ocr_text(text, mapper)
+    out = []
+    pos = 0
+    for offset, part, new in zip(offsets, parts, scrubbed):
+        gap = text[pos:offset]
+        out.append(scrub_ocr_text(gap, mapper) if gap.strip() else gap)
+        out.append(new)
+        pos = offset + len(part)
+    gap = text[pos:]
+    out.append(scrub_ocr_text(gap, mapper) if gap.strip() else gap)
+    return "".join(out)
+
+
+def _union_box(boxes: list[dict]) -> dict:
+    """Smallest bounding box containing all of boxes."""
+    x = min(b["x"] for b in boxes)
+    y = min(b["y"] for b in boxes)
+    return {
+        "x": x,
+        "y": y,
+        "width": max(b["x"] + b["width"] for b in boxes) - x,
+        "height": max(b["y"] + b["height"] for b in boxes) - y,
+    }
+
+
+def scrub_ocr_line(line: dict, mapper: SyntheticMapper) -> str:
+    """Scrub one OCR line in place and return its scrubbed text.
+
+    The line is scrubbed once and the result handed back to its words, so
+    a name or address spanning several words is replaced as a whole. When
+    a replacement has a different number of words than the text it
+    replaces, the last affected word takes any extra words, or the surplus
+    words are dropped and their boxes merged into the last one kept.
+    """
+    text = line.get("text") or ""
+    words = line.get("words") or []
+    word_texts = [w.get("text") or "" for w in words]
+    offsets = _locate(text, word_texts)
+    if offsets is None:
+        # Words don't spell out the line: scrub each on its own
+        for word in words:
+            if word.get("text"):
+                word["text"] = scrub_ocr_text(word["text"], mapper)
+        if text:
+            line["text"] = scrub_ocr_text(text, mapper)
+        return line.get("text") or ""
+
+    edits = scrub_ocr_edits(text, mapper)
+    if not edits:
+        return text
+    line["text"] = apply_edits(text, edits)
+
+    # Group words with the edits touching them: each group is a run of
+    # consecutive words whose combined text is rewritten together
+    groups = []  # [region start, region end, first word, last word, edits]
+    k = 0
+    for edit in edits:
+        start, end, _ = edit
+        while k < len(words) and offsets[k] + len(word_texts[k]) <= start:
+            k += 1
+        touched = []
+        i = k
+        while i < len(words) and offsets[i] < end:
+            if offsets[i] + len(word_texts[i]) > start:
+                touched.append(i)
+            i += 1
+        if not touched:
+            continue  # Only whitespace between words changed
+        first, last = touched[0], touched[-1]
+        region_start = min(start, offsets[first])
+        region_end = max(end, offsets[last] + len(word_texts[last]))
+        if groups and groups[-1][3] >= first:
+            group = groups[-1]
+            group[1] = max(group[1], region_end)
+            group[3] = max(group[3], last)
+            group[4].append(edit)
         else:
-            doc_primary_method[f.stem] = pages[0].get("extraction", {}).get("method", "unknown")
-
-    by_primary = {}
-    for doc_id, method in doc_primary_method.items():
-        by_primary.setdefault(method, []).append(doc_id)
-
-    # Registration forms: 10
-    reg = by_primary.get("spire_form", [])
-    rng.shuffle(reg)
-    selected.update(reg[:10])
-
-    # Form-based (primary method = form): 15 (or all if fewer — only ~29 exist)
-    form = by_primary.get("form", [])
-    rng.shuffle(form)
-    selected.update(form[:15])
-
-    # Label-based (primary): 15
-    label = by_primary.get("label", [])
-    rng.shuffle(label)
-    selected.update(label[:15])
-
-    # Unstructured: all (only 1-3 exist as primary)
-    unstructured = by_primary.get("unstructured", [])
-    selected.update(unstructured)
-    # Also add documents that contain unstructured on any page
-    for doc_id in by_method.get("unstructured", []):
-        selected.add(doc_id)
-
-    # Edge cases: empty documents + documents with overrides
-    selected.update(no_pages[:4])
-    override_extra = [d for d in has_overrides if d not in selected]
-    rng.shuffle(override_extra)
-    selected.update(override_extra[:6])
+            groups.append([region_start, region_end, first, last, [edit]])
+
+    dropped = set()
+    for region_start, region_end, first, last, group_edits in groups:
+        local = [(s - region_start, e - region_start, new) for s, e, new in group_edits]
+        tokens = apply_edits(text[region_start:region_end], local).split()
+        count = last - first + 1
+        if len(tokens) >= count:
+            tokens[count - 1:] = [" ".join(tokens[count - 1:])]
+        else:
+            keep = first + max(len(tokens), 1) - 1
+            boxes = [w["boundingBox"] for w in words[keep:last + 1] if w.get("boundingBox")]
+            if len(boxes) == last - keep + 1 and len(boxes) > 1:
+                words[keep]["boundingBox"] = _union_box(boxes)
+            dropped.update(range(keep + 1, last + 1))
+            tokens = tokens or [""]
+        for word, token in zip(words[first:last + 1], tokens):
+            word["text"] = token
+
+    if dropped:
+        line["words"] = [w for i, w in enumerate(words) if i not in dropped]
+    return line["text"]
+
+
+def scrub_ocr_file(data: dict, mapper: SyntheticMapper) -> dict:
+    """Scrub OCR JSON in place — replace text content, preserving structure.
+
+    Each line is scrubbed once (see scrub_ocr_line()) and block and page
+    text are rebuilt from the scrubbed lines, so every level agrees and the
+    work is linear in the text. Blocks or pages whose text doesn't contain
+    their lines or blocks are scrubbed directly instead.
+
+    The mapper therefore meets phone numbers in line order. Before lines
+    were scrubbed first, the page text was scrubbed on its own first, so
+    fixtures regenerated now can get different synthetic phone numbers
+    (and name_map entries) than earlier ones: 11 of the 136 fixture page
+    texts differ. That older page text also disagreed with its own
+    blocks and lines, so it cannot be reproduced.
+    """
+    for page in data.get("pages") or []:
+        block_texts = []
+        scrubbed_blocks = []
+        for block in page.get("textBlocks") or []:
+            lines = block.get("lines") or []
+            line_texts = [line.get("text") or "" for line in lines]
+            scrubbed_lines = [scrub_ocr_line(line, mapper) for line in lines]
+            text = block.get("text") or ""
+            if text:
+                block["text"] = _splice(text, line_texts, scrubbed_lines, mapper)
+            block_texts.append(text)
+            scrubbed_blocks.append(block.get("text") or "")
+        if page.get("text"):
+            page["text"] = _splice(page["text"], block_texts, scrubbed_blocks, mapper)
+
+    return data
+
+
+# --- Fixture selection ---
+
+# Per-document fields that quotas and strata select on. any_method holds
+# every page's method; the others have exactly one value per document.
+SELECTION_FIELDS = ("method", "any_method", "pages", "overrides", "confidence")
+STRATUM_FIELDS = ("method", "pages", "overrides", "confidence")
+
+
+def page_count_band(page_count: int) -> str:
+    if page_count <= 1:
+        return str(page_count)
+    if page_count <= 3:
+        return "2-3"
+    if page_count <= 7:
+        return "4-7"
+    return "8+"
+
+
+def confidence_band(confidence: float | None) -> str:
+    """OCR confidence band: none (no OCR), low (< 0.6), medium (< 0.8) or high."""
+    if confidence is None:
+        return "none"
+    if confidence < 0.6:
+        return "low"
+    if confidence < 0.8:
+        return "medium"
+    return "high"
+
+
+def selection_fields(doc: dict) -> dict:
+    """SELECTION_FIELDS values for a CorpusIndex.iter_documents() row."""
+    methods = doc["methods"]
+    return {
+        "method": methods[0] if methods else "empty",
+        "any_method": set(methods),
+        "pages": page_count_band(doc["page_count"]),
+        "overrides": "yes" if doc["has_overrides"] else "no",
+        "confidence": confidence_band(doc["ocr_confidence"]),
+    }
+
+
+def parse_quota(spec: str):
+    """Parse "field=glob[,field=glob...]:N" (N or "all") into (spec, conditions, quota)."""
+    conditions_part, sep, quota_part = spec.rpartition(":")
+    if not sep:
+        raise argparse.ArgumentTypeError(f"expected CONDITIONS:N, got {spec!r}")
+    if quota_part == "all":
+        quota = None
+    elif quota_part.isdigit():
+        quota = int(quota_part)
+    else:
+        raise argparse.ArgumentTypeError(f"quota must be a count or 'all', got {quota_part!r}")
+    conditions = {}
+    for condition in conditions_part.split(","):
+        field, sep, pattern = condition.partition("=")
+        if not sep or field not in SELECTION_FIELDS:
+            raise argparse.ArgumentTypeError(
+                f"expected FIELD=GLOB with FIELD one of {', '.join(SELECTION_FIELDS)}, "
+                f"got {condition!r}"
+            )
+        conditions[field] = pattern
+    return spec, conditions, quota
+
+
+def parse_strata(value: str) -> tuple[str, ...]:
+    """Parse --strata "field,field" into a tuple of STRATUM_FIELDS."""
+    fields = tuple(f for f in value.split(",") if f)
+    for field in fields:
+        if field not in STRATUM_FIELDS:
+            raise argparse.ArgumentTypeError(
+                f"stratum field must be one of {', '.join(STRATUM_FIELDS)}, got {field!r}"
+            )
+    return fields
+
+
+def quota_matches(conditions: dict, fields: dict) -> bool:
+    for field, pattern in conditions.items():
+        value = fields[field]
+        values = value if isinstance(value, set) else (value,)
+        if not any(fnmatch.fnmatchcase(v, pattern) for v in values):
+            return False
+    return True
+
+
+# Default --select quotas, targeting balanced coverage across extractor
+# methods. Real corpus distribution: ~880 registration, ~527 label, ~35
+# form-only, 3 unstructured, 4 empty, so under-represented methods are
+# prioritised. method is the PRIMARY (first page) method, to avoid pulling
+# in registration-form documents when we want form-based ones; unstructured
+# is taken from any page, since only 1-3 documents have it first.
+SELECTION_QUOTAS = [parse_quota(spec) for spec in (
+    "method=spire_form:10",
+    "method=form:15",
+    "method=label:15",
+    "any_method=unstructured:all",
+    "method=empty:4",
+    "overrides=yes:6",
+)]
+SELECTION_SEED = 42
+
+
+def select_documents(index_path: Path = DEFAULT_INDEX_PATH, quotas=SELECTION_QUOTAS,
+                     strata: tuple[str, ...] = (), per_stratum: int = 0,
+                     seed: int = SELECTION_SEED, ocr_pack: Path | None = None):
+    """Select representative documents and copy raw files.
+
+    Documents are drawn in one pass over the corpus index. Each document
+    is offered to every quota it matches, and with per_stratum > 0 also
+    to its stratum: the combination of its `strata` field values. Each
+    quota and stratum keeps a seeded reservoir sample of at most its
+    size, and the selection is their union.
+
+    With ocr_pack, OCR documents are read from that pack, refreshed first.
+    """
+    if not ADDRESSES_DIR.exists():
+        print(f"ERROR: addresses dir not found: {ADDRESSES_DIR}")
+        sys.exit(1)
+
+    # Only address files changed since the last run are re-parsed
+    index = CorpusIndex(index_path)
+    stats = index.refresh(ADDRESSES_DIR, OCR_DIR)
+    print(f"Corpus index: {stats['parsed']} parsed, {stats['unchanged']} unchanged, "
+          f"{stats['removed']} removed")
+
+    print("Distribution:")
+    for method, doc_count, page_count in index.method_distribution():
+        print(f"  {method}: {doc_count} documents ({page_count} pages)")
+    print(f"  has_overrides: {len(index.documents(has_overrides=True, empty=False))}")
+    print(f"  no_pages: {len(index.documents(empty=True))}")
+
+    pack = None
+    if ocr_pack is not None:
+        stats = build_pack(OCR_DIR, ocr_pack, jobs=os.cpu_count() or 1)
+        print(f"OCR pack: {stats['encoded']} encoded, {stats['unchanged']} unchanged, "
+              f"{stats['removed']} removed")
+        pack = OCRPack(ocr_pack)
+
+    sampler = StratifiedReservoir(seed)
+    for doc in index.iter_documents():
+        fields = selection_fields(doc)
+        for spec, conditions, quota in quotas:
+            if quota_matches(conditions, fields):
+                sampler.offer(spec, quota, doc["doc_id"])
+        if per_stratum > 0 and strata:
+            stratum = "/".join(f"{field}={fields[field]}" for field in strata)
+            sampler.offer(stratum, per_stratum, doc["doc_id"])
+
+    # Quotas in the order given, then strata
+    samples = sampler.samples()
+    ordered = [(spec, samples.pop(spec, (0, []))) for spec, _, _ in quotas]
+    ordered += sorted(samples.items())
+    print("\nSamples:")
+    selected = set()
+    for stratum, (seen, sample) in ordered:
+        print(f"  {stratum}: {len(sample)} of {seen}")
+        selected.update(sample)
 
     print(f"\nSelected {len(selected)} documents")
 
@@ -553,12 +1013,6 @@ def select_documents():
     raw_addresses.mkdir(exist_ok=True)
     raw_ocr.mkdir(exist_ok=True)
 
-    # Find OCR files — they're in subdirectories
-    ocr_index = {}
-    if OCR_DIR.exists():
-        for ocr_file in OCR_DIR.rglob("*.json"):
-            ocr_index[ocr_file.stem] = ocr_file
-
     copied_addr = 0
     copied_ocr = 0
     for doc_id in sorted(selected):
@@ -568,16 +1022,28 @@ def select_documents():
             shutil.copy2(addr_src, raw_addresses / f"{doc_id}.json")
             copied_addr += 1
 
-        # OCR file
-        if doc_id in ocr_index:
-            shutil.copy2(ocr_index[doc_id], raw_ocr / f"{doc_id}.json")
+        # OCR file — they're in subdirectories
+        if pack is not None and doc_id in pack:
+            with open(raw_ocr / f"{doc_id}.json", "w") as f:
+                json.dump(pack.document(doc_id), f, indent=2)
             copied_ocr += 1
+            continue
+        ocr_src = index.ocr_path(doc_id)
+        if ocr_src is not None:
+            shutil.copy2(ocr_src, raw_ocr / f"{doc_id}.json")
+            copied_ocr += 1
+    index.close()
+    if pack is not None:
+        pack.close()
 
     # Write manifest
     manifest = {
         "selected_documents": sorted(selected),
         "count": len(selected),
-        "selection_seed": 42,
+        "selection_seed": seed,
+        "quotas": [spec for spec, _, _ in quotas],
+        "strata": list(strata),
+        "per_stratum": per_stratum,
         "copied_addresses": copied_addr,
         "copied_ocr": copied_ocr,
     }
@@ -589,10 +1055,60 @@ def select_documents():
     print(f"\n>>> NOW: inspect {RAW_DIR} then run --scrub <<<")
 
 
-def scrub_documents():
-    """Read raw files, scrub PII, write to final fixture directories."""
+def scrub_document(doc_id: str, ordinal: int):
+    """Scrub one raw document into (doc_id, synth_doc_id, address JSON, OCR JSON).
+
+    The OCR JSON is None when the document has no raw OCR file. ordinal is
+    the document's position among those with an address file, used for
+    the fallback ID when doc_id doesn't parse. Runs in a worker process:
+    the mapper is seeded per document, so the result doesn't depend on
+    which process scrubs it or in what order.
+    """
+    # Create mapper seeded per-document for consistency
+    mapper = SyntheticMapper(seed=f"yiana-fixture-{doc_id}")
+
+    # Scrub address file first (builds the name map)
+    with open(RAW_DIR / "addresses" / f"{doc_id}.json") as f:
+        addr_data = json.load(f)
+
+    # Generate synthetic document_id from original
+    parts = doc_id.split("_")
+    if len(parts) >= 3:
+        synth_last = mapper.map_lastname(parts[0])
+        synth_first = mapper.map_firstname(parts[1])
+        synth_dob_part = parts[2]  # Keep DOB code format but replace
+        day = mapper._rng.randint(1, 28)
+        month = mapper._rng.randint(1, 12)
+        year = mapper._rng.randint(40, 99)
+        synth_dob_part = f"{day:02d}{month:02d}{year:02d}"
+        synth_doc_id = f"{synth_last}_{synth_first}_{synth_dob_part}"
+    else:
+        synth_doc_id = f"TestDoc_{ordinal:03d}"
+
+    addr_data["document_id"] = synth_doc_id
+    scrubbed_addr = json.dumps(scrub_address_file(addr_data, mapper), indent=2)
+
+    # Scrub OCR file (uses same mapper so name replacements are consistent)
+    scrubbed_ocr = None
+    ocr_raw = RAW_DIR / "ocr" / f"{doc_id}.json"
+    if ocr_raw.exists():
+        with open(ocr_raw) as f:
+            ocr_data = json.load(f)
+        ocr_data["documentId"] = synth_doc_id
+        scrubbed_ocr = json.dumps(scrub_ocr_file(ocr_data, mapper), indent=2)
+
+    return doc_id, synth_doc_id, scrubbed_addr, scrubbed_ocr
+
+
+def scrub_documents(jobs: int = 1):
+    """Read raw files, scrub PII, write to final fixture directories.
+
+    With jobs > 1 documents are scrubbed in a process pool. Files are
+    written by this process in manifest order, so the output is identical
+    to a serial run (including which document wins if two synthetic IDs
+    collide).
+    """
     raw_addresses = RAW_DIR / "addresses"
-    raw_ocr = RAW_DIR / "ocr"
 
     if not raw_addresses.exists():
         print("ERROR: run --select first")
@@ -608,68 +1124,211 @@ def scrub_documents():
     with open(manifest_path) as f:
         manifest = json.load(f)
 
-    scrubbed_count = 0
-    for doc_id in manifest["selected_documents"]:
-        # Create mapper seeded per-document for consistency
-        mapper = SyntheticMapper(seed=f"yiana-fixture-{doc_id}")
-
-        # Scrub address file first (builds the name map)
-        addr_raw = raw_addresses / f"{doc_id}.json"
-        if addr_raw.exists():
-            with open(addr_raw) as f:
-                addr_data = json.load(f)
-
-            # Generate synthetic document_id from original
-            parts = doc_id.split("_")
-            if len(parts) >= 3:
-                synth_last = mapper.map_lastname(parts[0])
-                synth_first = mapper.map_firstname(parts[1])
-                synth_dob_part = parts[2]  # Keep DOB code format but replace
-                day = mapper._rng.randint(1, 28)
-                month = mapper._rng.randint(1, 12)
-                year = mapper._rng.randint(40, 99)
-                synth_dob_part = f"{day:02d}{month:02d}{year:02d}"
-                synth_doc_id = f"{synth_last}_{synth_first}_{synth_dob_part}"
-            else:
-                synth_doc_id = f"TestDoc_{scrubbed_count:03d}"
+    # Documents without an address file are skipped
+    doc_ids = [
+        doc_id for doc_id in manifest["selected_documents"]
+        if (raw_addresses / f"{doc_id}.json").exists()
+    ]
+
+    # Mapping file (real doc_id → synthetic doc_id, for your inspection).
+    # This file is gitignored
+    mapping_file = RAW_DIR / "id_mapping.json"
+    mapping = {}
+    if mapping_file.exists():
+        with open(mapping_file) as f:
+            mapping = json.load(f)
+
+    if jobs <= 1 or len(doc_ids) <= 1:
+        results = map(scrub_document, doc_ids, range(len(doc_ids)))
+        pool = None
+    else:
+        pool = ProcessPoolExecutor(max_workers=jobs)
+        # Small chunks keep workers busy when document sizes vary widely
+        chunksize = max(1, len(doc_ids) // (jobs * 8))
+        results = pool.map(scrub_document, doc_ids, range(len(doc_ids)), chunksize=chunksize)
 
-            addr_data["document_id"] = synth_doc_id
-            scrubbed_addr = scrub_address_file(addr_data, mapper)
+    scrubbed_count = 0
+    try:
+        for doc_id, synth_doc_id, scrubbed_addr, scrubbed_ocr in results:
             with open(expected_dir / f"{synth_doc_id}.json", "w") as f:
-                json.dump(scrubbed_addr, f, indent=2)
-
-            # Scrub OCR file (uses same mapper so name replacements are consistent)
-            ocr_raw = raw_ocr / f"{doc_id}.json"
-            if ocr_raw.exists():
-                with open(ocr_raw) as f:
-                    ocr_data = json.load(f)
-                ocr_data["documentId"] = synth_doc_id
-                scrubbed_ocr = scrub_ocr_file(ocr_data, mapper)
+                f.write(scrubbed_addr)
+            if scrubbed_ocr is not None:
                 with open(input_dir / f"{synth_doc_id}.json", "w") as f:
-                    json.dump(scrubbed_ocr, f, indent=2)
-
-            # Write mapping file (real doc_id → synthetic doc_id, for your inspection)
-            # This file is gitignored
-            mapping_file = RAW_DIR / "id_mapping.json"
-            mapping = {}
-            if mapping_file.exists():
-                with open(mapping_file) as f:
-                    mapping = json.load(f)
+                    f.write(scrubbed_ocr)
             mapping[doc_id] = synth_doc_id
-            with open(mapping_file, "w") as f:
-                json.dump(mapping, f, indent=2)
-
             scrubbed_count += 1
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    # Written once, via a rename, so an interrupted run never leaves a
+    # truncated mapping behind
+    tmp_path = mapping_file.with_name(mapping_file.name + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(mapping, f, indent=2)
+    os.replace(tmp_path, mapping_file)
 
     print(f"Scrubbed {scrubbed_count} documents")
     print(f"  OCR inputs:        {input_dir}")
     print(f"  Expected addresses: {expected_dir}")
-    print(f"  ID mapping:        {RAW_DIR / 'id_mapping.json'}")
+    print(f"  ID mapping:        {mapping_file}")
     print(f"\n>>> INSPECT scrubbed files, then delete {RAW_DIR} <<<")
 
 
-def verify_scrubbed():
-    """Check scrubbed files for remaining real PII patterns."""
+# Name parts that are titles rather than identifying
+NAME_TITLES = {"mr", "mrs", "ms", "miss", "mx", "dr", "prof", "rev", "sir", "master"}
+
+
+def real_pii_tokens(doc_id: str, addr_data: dict | None) -> list[tuple[str, str]]:
+    """(token, kind) for every identifying value of one raw document.
+
+    Covers the document ID and its name parts and, from the raw address
+    data, patient names (whole and by part), dates of birth, phones, MRNs,
+    address lines and postcodes on every page and override, plus the
+    enriched patient. Names need 3+ characters, other values 4+.
+    """
+    tokens = []
+
+    def add(value, kind, min_len=4):
+        if value is None:
+            return
+        value = str(value).strip()
+        if len(value) >= min_len:
+            tokens.append((value, kind))
+
+    def add_name(name, kind):
+        if not name:
+            return
+        add(name, kind, 3)
+        for part in re.split(r"[\s,.]+", str(name)):
+            if part.lower() not in NAME_TITLES:
+                add(part, kind, 3)
+
+    add(doc_id, "document ID")
+    for part in doc_id.split("_")[:-1]:  # Skip DOB part
+        add_name(part, "document ID name")
+
+    if not addr_data:
+        return tokens
+
+    for entry in (addr_data.get("pages") or []) + (addr_data.get("overrides") or []):
+        patient = entry.get("patient") or {}
+        add_name(patient.get("full_name"), "patient name")
+        add(patient.get("date_of_birth"), "date of birth")
+        add(patient.get("mrn"), "MRN")
+        for phone in (patient.get("phones") or {}).values():
+            if phone:
+                add(phone, "phone")
+                add(re.sub(r"\s", "", str(phone)), "phone")
+        address = entry.get("address") or {}
+        add(address.get("line_1"), "address")
+        add(address.get("line_2"), "address")
+        postcode = address.get("postcode")
+        if postcode:
+            add(postcode, "postcode", 5)
+            add(str(postcode).replace(" ", ""), "postcode", 5)
+
+    enriched = addr_data.get("enriched") or {}
+    ep = enriched.get("patient")
+    if isinstance(ep, dict):
+        for field in ("full_name", "surname", "firstname"):
+            add_name(ep.get(field), "patient name")
+        add(ep.get("date_of_birth"), "date of birth")
+    add_name(enriched.get("patient_canonical"), "patient name")
+    add(enriched.get("patient_id"), "MRN")
+    return tokens
+
+
+class PiiScanner:
+    """Case-insensitive search for every known real PII token at once.
+
+    All tokens share one PatternTrie, so a text is scanned once however
+    many tokens there are. Texts are decoded values, not raw JSON, so
+    escapes (\\n, \\uXXXX) never hide a token or its boundary. A hit must
+    not have a letter or digit either side, so "Ann" doesn't flag
+    "Annual".
+    """
+
+    def __init__(self, tokens: list[tuple[str, str]]):
+        kinds: dict[str, set[str]] = {}
+        display: dict[str, str] = {}
+        for token, kind in tokens:
+            form = token.lower()
+            kinds.setdefault(form, set()).add(kind)
+            display.setdefault(form, token)
+        self.patterns = list(kinds)
+        self.labels = [(", ".join(sorted(kinds[p])), display[p]) for p in self.patterns]
+        self.trie = PatternTrie(self.patterns)
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def scan(self, text: str) -> list[tuple[int, str, str]]:
+        """(offset, kinds, token) for every hit in text."""
+        lowered = text.lower()
+        hits = []
+        for start, end, indices in self.trie.finditer(lowered):
+            if start > 0 and lowered[start - 1].isalnum():
+                continue
+            if end < len(lowered) and lowered[end].isalnum():
+                continue
+            for index in indices:
+                hits.append((start, *self.labels[index]))
+        return hits
+
+
+_scanner: PiiScanner | None = None
+
+
+def init_scanner(scanner: PiiScanner) -> None:
+    """Install the scanner used by scan_file() in this process."""
+    global _scanner
+    _scanner = scanner
+
+
+def json_strings(value, path: str = ""):
+    """Yield (path, text) for every key and scalar value in decoded JSON.
+
+    Paths look like pages[0].text; a key is reported at its own path.
+    """
+    if isinstance(value, dict):
+        for key, item in value.items():
+            child = f"{path}.{key}" if path else key
+            yield child, key
+            yield from json_strings(item, child)
+    elif isinstance(value, list):
+        for i, item in enumerate(value):
+            yield from json_strings(item, f"{path}[{i}]")
+    elif isinstance(value, str):
+        yield path, value
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        # MRNs and phone numbers are sometimes stored as numbers
+        yield path, str(value)
+
+
+def scan_file(path: Path) -> list[tuple[str, int, str, str]]:
+    """(JSON path, column, kinds, token) for every hit in a file.
+
+    Every key and value is scanned decoded, so a token at the start of an
+    OCR text line is seen after a newline rather than after the "n" of a
+    JSON escape. Columns are 1-based within the value.
+    """
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    hits = []
+    for location, text in json_strings(data):
+        for offset, kinds, token in _scanner.scan(text):
+            hits.append((location, offset + 1, kinds, token))
+    return hits
+
+
+def verify_scrubbed(jobs: int = 1):
+    """Check scrubbed files for remaining real PII.
+
+    Every identifying value in the raw address files (see real_pii_tokens)
+    is searched for in every scrubbed fixture, with files spread over a
+    process pool when jobs > 1.
+    """
     input_dir = EXTRACTION_DIR / "input_ocr"
     expected_dir = EXTRACTION_DIR / "expected_addresses"
 
@@ -681,36 +1340,42 @@ def verify_scrubbed():
     manifest_path = RAW_DIR / "manifest.json"
     if not manifest_path.exists():
         print("WARNING: raw manifest not found — can only check format, not PII leakage")
-        real_doc_ids = set()
+        real_doc_ids = []
     else:
         with open(manifest_path) as f:
             manifest = json.load(f)
-        real_doc_ids = set(manifest["selected_documents"])
+        real_doc_ids = manifest["selected_documents"]
 
-    issues = []
+    tokens = []
+    for doc_id in real_doc_ids:
+        addr_raw = RAW_DIR / "addresses" / f"{doc_id}.json"
+        addr_data = None
+        if addr_raw.exists():
+            with open(addr_raw) as f:
+                addr_data = json.load(f)
+        tokens.extend(real_pii_tokens(doc_id, addr_data))
+    scanner = PiiScanner(tokens)
+
+    files = [f for d in [input_dir, expected_dir] if d.exists() for f in sorted(d.glob("*.json"))]
+    if jobs <= 1 or len(files) <= 1:
+        init_scanner(scanner)
+        results = map(scan_file, files)
+        pool = None
+    else:
+        pool = ProcessPoolExecutor(max_workers=jobs, initializer=init_scanner, initargs=(scanner,))
+        chunksize = max(1, len(files) // (jobs * 8))
+        results = pool.map(scan_file, files, chunksize=chunksize)
 
-    def check_text(text: str, filepath: str, context: str):
-        """Check a text string for potential PII leakage."""
-        if not text:
-            return
-        # Check for real document IDs (which contain real names)
-        for real_id in real_doc_ids:
-            parts = real_id.split("_")
-            for part in parts[:-1]:  # Skip DOB part
-                if len(part) > 2 and part.lower() in text.lower():
-                    issues.append(f"  {filepath} [{context}]: possible real name fragment '{part}'")
-
-    # Check all scrubbed files
-    for d in [input_dir, expected_dir]:
-        for f in sorted(d.iterdir()):
-            if not f.name.endswith(".json"):
-                continue
-            with open(f) as fh:
-                content = fh.read()
-            # Quick check: does any real doc ID appear in the file?
-            for real_id in real_doc_ids:
-                if real_id in content:
-                    issues.append(f"  {f.name}: contains real document ID '{real_id}'")
+    issues = []
+    try:
+        for path, hits in zip(files, results):
+            for location, column, kinds, token in hits:
+                issues.append(
+                    f"  {path.parent.name}/{path.name}:{location}:{column}: {kinds} '{token}'"
+                )
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
 
     if issues:
         print(f"POTENTIAL ISSUES ({len(issues)}):")
@@ -722,21 +1387,57 @@ def verify_scrubbed():
         print("No obvious PII leakage detected in scrubbed files.")
 
     print(f"\nChecked {len(list(input_dir.glob('*.json')))} OCR files, "
-          f"{len(list(expected_dir.glob('*.json')))} address files")
+          f"{len(list(expected_dir.glob('*.json')))} address files "
+          f"against {len(scanner)} real tokens")
     print(">>> YOU must still personally inspect every file <<<")
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Scrub PHI from test fixtures")
     group = parser.add_mutually_exclusive_group(required=True)
-    group.add_argument("--select", action="store_true", help="Select 50 documents and copy raw")
+    group.add_argument("--select", action="store_true", help="Select documents and copy raw")
     group.add_argument("--scrub", action="store_true", help="Anonymise raw copies")
     group.add_argument("--verify", action="store_true", help="Check for remaining PII")
+    parser.add_argument(
+        "--jobs", "-j", type=int, default=0,
+        help="Worker processes for --scrub and --verify (0 = one per CPU, default; 1 = serial)",
+    )
+    parser.add_argument(
+        "--index", type=Path, default=DEFAULT_INDEX_PATH,
+        help=f"Corpus metadata index used by --select (default: {DEFAULT_INDEX_PATH})",
+    )
+    parser.add_argument(
+        "--quota", type=parse_quota, action="append", metavar="FIELD=GLOB[,...]:N",
+        help="--select quota, repeatable; replaces the defaults. Fields: "
+             f"{', '.join(SELECTION_FIELDS)}; N may be 'all' "
+             "(e.g. method=form:15, pages=8+,confidence=low:5)",
+    )
+    parser.add_argument(
+        "--strata", type=parse_strata, default=(), metavar="FIELD[,FIELD...]",
+        help=f"Fields defining --per-stratum strata, from: {', '.join(STRATUM_FIELDS)}",
+    )
+    parser.add_argument(
+        "--per-stratum", type=int, default=0,
+        help="Documents to sample from every --strata combination (default: 0)",
+    )
+    parser.add_argument(
+        "--seed", type=int, default=SELECTION_SEED,
+        help=f"--select sampling seed (default: {SELECTION_SEED})",
+    )
+    parser.add_argument(
+        "--ocr-pack", type=Path, metavar="PACK",
+        help="--select reads OCR from this pack, refreshing it first "
+             f"(e.g. {DEFAULT_PACK_PATH})",
+    )
     args = parser.parse_args()
 
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
     if args.select:
-        select_documents()
+        if args.per_stratum > 0 and not args.strata:
+            parser.error("--per-stratum needs --strata")
+        select_documents(args.index, args.quota or SELECTION_QUOTAS,
+                         args.strata, args.per_stratum, args.seed, args.ocr_pack)
     elif args.scrub:
-        scrub_documents()
+        scrub_documents(jobs)
     elif args.verify:
-        verify_scrubbed()
+        verify_scrubbed(jobs)
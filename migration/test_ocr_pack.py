@@ -0,0 +1,44 @@
+"""
+Tests for ocr_pack.py.
+
+Run from the repository root:
+    python3 -m pytest migration/
+"""
+
+import shutil
+from pathlib import Path
+
+import pytest
+
+import ocr_pack
+from ocr_pack import OCRPack, build_pack
+
+FIXTURE_OCR = Path(__file__).parent / "fixtures" / "extraction" / "input_ocr"
+
+
+def test_failed_append_leaves_previous_pack_readable(tmp_path, monkeypatch):
+    ocr_dir = tmp_path / "ocr"
+    ocr_dir.mkdir()
+    sources = sorted(FIXTURE_OCR.glob("*.json"))[:4]
+    for path in sources[:3]:
+        shutil.copy(path, ocr_dir)
+    pack_path = tmp_path / "ocr.ocrpack"
+    build_pack(ocr_dir, pack_path)
+    before = pack_path.read_bytes()
+
+    shutil.copy(sources[3], ocr_dir)
+
+    def fail(f, index):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(ocr_pack, "_write_tail", fail)
+    with pytest.raises(RuntimeError):
+        build_pack(ocr_dir, pack_path)
+    monkeypatch.undo()
+
+    assert pack_path.read_bytes() == before
+    with OCRPack(pack_path) as pack:
+        assert pack.doc_ids() == sorted(path.stem for path in sources[:3])
+
+    stats = build_pack(ocr_dir, pack_path)
+    assert (stats["unchanged"], stats["encoded"], stats["rewritten"]) == (3, 1, False)
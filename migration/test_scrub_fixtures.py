@@ -0,0 +1,106 @@
+"""
+Tests for scrub_fixtures.py.
+
+Run from the repository root:
+    python3 -m pytest migration/
+"""
+
+import json
+import random
+import re
+
+from scrub_fixtures import (
+    FIRST_NAMES, LAST_NAMES, OcrReplacer, PiiScanner, SyntheticMapper, init_scanner,
+    ocr_replacements, scan_file, scrub_ocr_text,
+)
+
+
+def chained_scrub(text: str, mapper: SyntheticMapper) -> str:
+    """scrub_ocr_text() as it was: one str.replace() per pattern, then phones."""
+    for real, synth in ocr_replacements(mapper):
+        text = text.replace(real, synth)
+    text = re.sub(r'0\d{3,4}\s?\d{6,7}', lambda m: mapper.map_phone(m.group()), text)
+    text = re.sub(r'07\d{3}\s?\d{6}', lambda m: mapper.map_phone(m.group()), text)
+    return text
+
+
+def test_shorter_pattern_used_when_best_loses_overlap():
+    mapper = SyntheticMapper("s")
+    mapper.map_practice("Chase Medical Centre")
+    mapper.map_name("Mary Chase")
+    mapper.map_firstname("Mary")
+    text = "Patient Mary Chase Medical Centre"
+    assert scrub_ocr_text(text, mapper) == chained_scrub(text, mapper)
+    assert "Mary" not in scrub_ocr_text(text, mapper)
+
+
+def test_replacer_matches_chain_on_overlapping_patterns():
+    # A tiny alphabet makes overlaps, self-overlaps and matches formed
+    # across an inserted value common
+    rng = random.Random(1)
+    alphabet = "abAB "
+
+    def word(low, high):
+        return "".join(rng.choice(alphabet) for _ in range(rng.randint(low, high)))
+
+    for _ in range(5000):
+        replacements = [(word(1, 4), word(0, 4)) for _ in range(rng.randint(1, 6))]
+        text = word(0, 25)
+        expected = text
+        for real, synth in replacements:
+            expected = expected.replace(real, synth)
+        assert OcrReplacer(replacements).sub(text) == expected, (replacements, text)
+
+
+def test_scrub_matches_chain_on_mapped_values():
+    # Phone numbers join the maps as they are scrubbed, so each side gets
+    # its own, identically seeded mapper
+    rng = random.Random(2)
+    names = FIRST_NAMES[:6] + LAST_NAMES[:6]
+    for case in range(3000):
+        calls = []
+        values = []
+        for _ in range(rng.randint(1, 5)):
+            first, last = rng.choice(names), rng.choice(names)
+            kind = rng.randrange(5)
+            if kind == 0:
+                calls.append(("map_name", f"{first} {last}"))
+            elif kind == 1:
+                calls.append(("map_firstname", first))
+            elif kind == 2:
+                calls.append(("map_practice", f"{last} Medical Centre"))
+            elif kind == 3:
+                calls.append(("map_postcode", "ZZ1 1AA"))
+                values.append("ZZ11AA")
+            else:
+                calls.append(("map_address_line", f"1 {last} Road"))
+            values.append(calls[-1][1])
+        pieces = values + names[:4] + ["01234 567890", "\n", " "]
+        text = " ".join(rng.choice(pieces) for _ in range(rng.randint(1, 12)))
+        text = rng.choice([text, text.upper(), text.title()])
+
+        mappers = []
+        for _ in range(2):
+            mapper = SyntheticMapper(str(case))
+            for method, value in calls:
+                getattr(mapper, method)(value)
+            mappers.append(mapper)
+        assert scrub_ocr_text(text, mappers[0]) == chained_scrub(text, mappers[1]), (case, text)
+
+
+def test_scan_finds_tokens_at_line_starts(tmp_path):
+    scanner = PiiScanner([("Mary", "first"), ("Chase", "surname"), ("01/02/1980", "dob")])
+    path = tmp_path / "doc.json"
+    text = "Dear Sir\nMary\nDOB\n01/02/1980\nRe: Chase"
+    path.write_text(json.dumps({"pages": [{"text": text}]}, indent=2))
+
+    init_scanner(scanner)
+    hits = scan_file(path)
+    assert sorted(token for _, _, _, token in hits) == ["01/02/1980", "Chase", "Mary"]
+    assert {location for location, _, _, _ in hits} == {"pages[0].text"}
+
+
+def test_scan_sees_non_ascii_decoded():
+    scanner = PiiScanner([("Zoë", "first")])
+    assert scanner.scan("Dear Zoë,")
+    assert not scanner.scan("Zoëlla")
@@ -38,146 +38,113 @@ def run_ingestion(db_path: str) -> BackendDatabase:
     return db
 
 
-def query_patients(db_path: str) -> list[dict]:
-    """Get all patients from DB."""
-    with sqlite3.connect(db_path) as conn:
-        conn.row_factory = sqlite3.Row
-        rows = conn.execute(
-            "SELECT id, full_name, full_name_normalized, date_of_birth, "
-            "document_count FROM patients ORDER BY id"
-        ).fetchall()
-    return [dict(r) for r in rows]
-
-
-def query_practitioners(db_path: str) -> list[dict]:
-    """Get all practitioners from DB."""
-    with sqlite3.connect(db_path) as conn:
-        conn.row_factory = sqlite3.Row
-        rows = conn.execute(
-            "SELECT id, full_name, full_name_normalized, type, practice_name, "
-            "document_count FROM practitioners ORDER BY id"
-        ).fetchall()
-    return [dict(r) for r in rows]
-
-
-def query_patient_documents(db_path: str) -> list[dict]:
-    """Get patient-document links."""
-    with sqlite3.connect(db_path) as conn:
-        conn.row_factory = sqlite3.Row
-        rows = conn.execute(
-            "SELECT pd.patient_id, pd.document_id, p.full_name_normalized "
-            "FROM patient_documents pd "
-            "JOIN patients p ON p.id = pd.patient_id "
-            "ORDER BY pd.patient_id, pd.document_id"
-        ).fetchall()
-    return [dict(r) for r in rows]
-
-
-def query_patient_practitioners(db_path: str) -> list[dict]:
-    """Get patient-practitioner links."""
-    with sqlite3.connect(db_path) as conn:
-        conn.row_factory = sqlite3.Row
-        rows = conn.execute(
-            "SELECT pp.patient_id, pp.practitioner_id, pp.relationship_type, "
-            "pp.document_count, p.full_name_normalized as patient_name, "
-            "pr.full_name_normalized as practitioner_name "
-            "FROM patient_practitioners pp "
-            "JOIN patients p ON p.id = pp.patient_id "
-            "JOIN practitioners pr ON pr.id = pp.practitioner_id "
-            "ORDER BY pp.patient_id, pp.practitioner_id"
-        ).fetchall()
-    return [dict(r) for r in rows]
-
-
-def query_documents(db_path: str) -> list[dict]:
-    """Get all documents."""
-    with sqlite3.connect(db_path) as conn:
-        conn.row_factory = sqlite3.Row
-        rows = conn.execute(
-            "SELECT document_id, page_count FROM documents ORDER BY document_id"
-        ).fetchall()
-    return [dict(r) for r in rows]
-
-
-def query_extractions(db_path: str) -> list[dict]:
-    """Get all extractions with entity FKs."""
-    with sqlite3.connect(db_path) as conn:
-        conn.row_factory = sqlite3.Row
-        rows = conn.execute(
-            "SELECT document_id, page_number, patient_id, practitioner_id "
-            "FROM extractions ORDER BY document_id, page_number"
-        ).fetchall()
-    return [dict(r) for r in rows]
-
-
-def get_scenario_entities(
-    scenario: dict,
-    patients: list[dict],
-    practitioners: list[dict],
-    pat_docs: list[dict],
-    pat_pracs: list[dict],
-    documents: list[dict],
-    extractions: list[dict],
-) -> dict:
-    """Extract entities relevant to a scenario's files."""
+# Lookups by document and patient that scenario scoping relies on
+ENTITY_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_validate_patient_documents_document "
+    "ON patient_documents(document_id)",
+    "CREATE INDEX IF NOT EXISTS idx_validate_extractions_document "
+    "ON extractions(document_id)",
+    "CREATE INDEX IF NOT EXISTS idx_validate_patient_practitioners_patient "
+    "ON patient_practitioners(patient_id)",
+)
+
+
+def open_validation_db(db_path: str) -> sqlite3.Connection:
+    """Open the one connection used for all validation queries.
+
+    Adds the indexes in ENTITY_INDEXES, and temp tables that hold the
+    current scenario's document, patient and practitioner IDs.
+    """
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    for statement in ENTITY_INDEXES:
+        conn.execute(statement)
+    conn.execute("CREATE TEMP TABLE scenario_documents (document_id PRIMARY KEY)")
+    conn.execute("CREATE TEMP TABLE scenario_patients (id PRIMARY KEY)")
+    conn.execute("CREATE TEMP TABLE scenario_practitioners (id PRIMARY KEY)")
+    conn.commit()
+    return conn
+
+
+def count_rows(conn: sqlite3.Connection, table: str) -> int:
+    (count,) = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()
+    return count
+
+
+def get_scenario_entities(conn: sqlite3.Connection, scenario: dict) -> dict:
+    """Extract entities relevant to a scenario's files.
+
+    Every query is restricted to the scenario's documents, so the cost
+    follows the scenario's size rather than the size of the DB.
+    """
     # Map filenames to document_ids (strip .json)
-    scenario_doc_ids = set()
-    for f in scenario["files"]:
-        doc_id = f.replace(".json", "")
-        scenario_doc_ids.add(doc_id)
-
-    # Find patients linked to these documents
-    scenario_patient_ids = set()
-    for pd in pat_docs:
-        if pd["document_id"] in scenario_doc_ids:
-            scenario_patient_ids.add(pd["patient_id"])
-
-    # Also find patients from extractions (covers cases where
-    # patient_documents might not have an entry)
-    for ext in extractions:
-        if ext["document_id"] in scenario_doc_ids and ext["patient_id"]:
-            scenario_patient_ids.add(ext["patient_id"])
-
-    scenario_patients = [p for p in patients if p["id"] in scenario_patient_ids]
-
-    # Find practitioners linked to scenario patients via patient_practitioners
-    scenario_prac_ids = set()
-    for pp in pat_pracs:
-        if pp["patient_id"] in scenario_patient_ids:
-            scenario_prac_ids.add(pp["practitioner_id"])
-
-    # Also find practitioners directly from extractions for these documents
-    # (they may not be linked to patients if no patient was resolved)
-    for ext in extractions:
-        if ext["document_id"] in scenario_doc_ids and ext["practitioner_id"]:
-            scenario_prac_ids.add(ext["practitioner_id"])
+    conn.execute("DELETE FROM scenario_documents")
+    conn.executemany(
+        "INSERT OR IGNORE INTO scenario_documents (document_id) VALUES (?)",
+        [(f.replace(".json", ""),) for f in scenario["files"]],
+    )
 
-    scenario_practitioners = [p for p in practitioners if p["id"] in scenario_prac_ids]
+    # Patients linked to these documents, plus patients from extractions
+    # (covers cases where patient_documents might not have an entry)
+    conn.execute("DELETE FROM scenario_patients")
+    conn.execute(
+        "INSERT INTO scenario_patients (id) "
+        "SELECT patient_id FROM patient_documents "
+        "WHERE document_id IN (SELECT document_id FROM scenario_documents) "
+        "UNION "
+        "SELECT patient_id FROM extractions "
+        "WHERE document_id IN (SELECT document_id FROM scenario_documents) "
+        "AND patient_id IS NOT NULL"
+    )
 
-    # Count links for this scenario
-    scenario_links = [
-        pp for pp in pat_pracs if pp["patient_id"] in scenario_patient_ids
-    ]
+    # Practitioners linked to scenario patients via patient_practitioners,
+    # plus practitioners directly from extractions for these documents
+    # (they may not be linked to patients if no patient was resolved)
+    conn.execute("DELETE FROM scenario_practitioners")
+    conn.execute(
+        "INSERT INTO scenario_practitioners (id) "
+        "SELECT practitioner_id FROM patient_practitioners "
+        "WHERE patient_id IN (SELECT id FROM scenario_patients) "
+        "UNION "
+        "SELECT practitioner_id FROM extractions "
+        "WHERE document_id IN (SELECT document_id FROM scenario_documents) "
+        "AND practitioner_id IS NOT NULL"
+    )
+
+    patients = conn.execute(
+        "SELECT id, full_name, full_name_normalized, date_of_birth, "
+        "document_count FROM patients "
+        "WHERE id IN (SELECT id FROM scenario_patients) ORDER BY id"
+    ).fetchall()
+    practitioners = conn.execute(
+        "SELECT id, full_name, full_name_normalized, type, practice_name, "
+        "document_count FROM practitioners "
+        "WHERE id IN (SELECT id FROM scenario_practitioners) ORDER BY id"
+    ).fetchall()
+    # Links for this scenario
+    links = conn.execute(
+        "SELECT pp.patient_id, pp.practitioner_id, pp.relationship_type, "
+        "pp.document_count, p.full_name_normalized as patient_name, "
+        "pr.full_name_normalized as practitioner_name "
+        "FROM patient_practitioners pp "
+        "JOIN patients p ON p.id = pp.patient_id "
+        "JOIN practitioners pr ON pr.id = pp.practitioner_id "
+        "WHERE pp.patient_id IN (SELECT id FROM scenario_patients) "
+        "ORDER BY pp.patient_id, pp.practitioner_id"
+    ).fetchall()
 
     return {
-        "patients": scenario_patients,
-        "practitioners": scenario_practitioners,
-        "links": scenario_links,
+        "patients": [dict(r) for r in patients],
+        "practitioners": [dict(r) for r in practitioners],
+        "links": [dict(r) for r in links],
     }
 
 
-def validate_scenario(
-    scenario: dict, db_path: str, patients: list, practitioners: list,
-    pat_docs: list, pat_pracs: list, documents: list, extractions: list,
-    verbose: bool,
-) -> list[str]:
+def validate_scenario(scenario: dict, conn: sqlite3.Connection, verbose: bool) -> list[str]:
     """Validate a single scenario. Returns list of issues."""
     issues = []
 
-    entities = get_scenario_entities(
-        scenario, patients, practitioners, pat_docs, pat_pracs, documents,
-        extractions,
-    )
+    entities = get_scenario_entities(conn, scenario)
 
     # Check patient count
     expected_patients = scenario.get("expected_patients", 0)
@@ -266,25 +233,19 @@ def main():
     with tempfile.NamedTemporaryFile(suffix=".db", delete=False) as tmp:
         db_path = tmp.name
 
+    conn = None
     try:
         print(f"Ingesting {expected['total_files']} files into {db_path}...")
         db = run_ingestion(db_path)
-
-        # Query all entities
-        patients = query_patients(db_path)
-        practitioners = query_practitioners(db_path)
-        pat_docs = query_patient_documents(db_path)
-        pat_pracs = query_patient_practitioners(db_path)
-        documents = query_documents(db_path)
-        extractions = query_extractions(db_path)
+        conn = open_validation_db(db_path)
 
         if args.verbose:
             print(f"\nDB contents:")
-            print(f"  Patients: {len(patients)}")
-            print(f"  Practitioners: {len(practitioners)}")
-            print(f"  Patient-Document links: {len(pat_docs)}")
-            print(f"  Patient-Practitioner links: {len(pat_pracs)}")
-            print(f"  Documents: {len(documents)}")
+            print(f"  Patients: {count_rows(conn, 'patients')}")
+            print(f"  Practitioners: {count_rows(conn, 'practitioners')}")
+            print(f"  Patient-Document links: {count_rows(conn, 'patient_documents')}")
+            print(f"  Patient-Practitioner links: {count_rows(conn, 'patient_practitioners')}")
+            print(f"  Documents: {count_rows(conn, 'documents')}")
 
         # Validate scenarios
         scenarios = expected["scenarios"]
@@ -299,10 +260,7 @@ def main():
         all_issues = []
 
         for scenario in scenarios:
-            issues = validate_scenario(
-                scenario, db_path, patients, practitioners,
-                pat_docs, pat_pracs, documents, extractions, args.verbose
-            )
+            issues = validate_scenario(scenario, conn, args.verbose)
             if issues:
                 failed += 1
                 for issue in issues:
@@ -329,6 +287,8 @@ def main():
             sys.exit(0)
 
     finally:
+        if conn is not None:
+            conn.close()
         os.unlink(db_path)
 
 
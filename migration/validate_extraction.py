@@ -11,24 +11,94 @@ Usage:
     python3 migration/validate_extraction.py
     python3 migration/validate_extraction.py --verbose
     python3 migration/validate_extraction.py --doc Anderson_Noah_090976
+    python3 migration/validate_extraction.py --jobs 8
+    python3 migration/validate_extraction.py --no-cache
+    python3 migration/validate_extraction.py --ocr-pack migration/.cache/fixtures.ocrpack
+
+Page results are cached in migration/.cache/extraction.sqlite, keyed by
+page text, the extractor source and RULESET_VERSION, so a rerun only
+re-extracts pages whose input or extractor code changed.
+
+With --ocr-pack, OCR input is read from a pack built by ocr_pack.py
+rather than from one file per document in input_ocr/.
 """
 
 import argparse
 import json
 import os
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
 
 # Add AddressExtractor to path so we can import extractors
-sys.path.insert(0, str(Path(__file__).parent.parent / "AddressExtractor"))
+EXTRACTOR_DIR = Path(__file__).parent.parent / "AddressExtractor"
+sys.path.insert(0, str(EXTRACTOR_DIR))
 
 from address_extractor import AddressExtractor
 from spire_form_extractor import extract_from_spire_form
+from extraction_cache import (
+    DEFAULT_CACHE_PATH, DEFAULT_MAX_BYTES, MISS, ExtractionCache,
+    cache_key, source_hash, text_hash,
+)
+from ocr_json import load_page_texts
+from ocr_columnar import SUFFIX as OCR_COLUMNAR_SUFFIX
+from ocr_pack import OCRPack
 
 FIXTURES_DIR = Path(__file__).parent / "fixtures" / "extraction"
 INPUT_DIR = FIXTURES_DIR / "input_ocr"
 EXPECTED_DIR = FIXTURES_DIR / "expected_addresses"
 
+# Part of every cache key. Bump to invalidate cached page results when
+# extraction behaviour changes outside the hashed source files (e.g. a
+# dependency upgrade).
+RULESET_VERSION = 1
+
+# One extractor per process, created on first use. In --jobs mode each pool
+# worker builds its own on startup and keeps it warm for every document it
+# is handed.
+_extractor: AddressExtractor | None = None
+
+
+def get_extractor() -> AddressExtractor:
+    """Return this process's extractor, creating it on first call."""
+    global _extractor
+    if _extractor is None:
+        # In-memory DB: extraction never needs to persist anything
+        _extractor = AddressExtractor(db_path=":memory:")
+    return _extractor
+
+
+# Per-process result cache and the extractor source hash that salts its keys
+_cache: ExtractionCache | None = None
+_cache_salt: str = ""
+
+# Per-process OCR pack, when input is read from one (--ocr-pack)
+_ocr_pack: OCRPack | None = None
+
+
+def init_worker(cache_path: Path | None = None, cache_max_bytes: int = DEFAULT_MAX_BYTES,
+                ocr_pack: Path | None = None):
+    """Per-process setup: warm the extractor and open the result cache and OCR pack."""
+    global _cache, _cache_salt, _ocr_pack
+    get_extractor()
+    if ocr_pack is not None:
+        _ocr_pack = OCRPack(ocr_pack)
+    if cache_path is not None:
+        _cache = ExtractionCache(cache_path, cache_max_bytes)
+        # This script's own cascade (trigger swap, method order) counts as
+        # extractor source too
+        _cache_salt = source_hash([*EXTRACTOR_DIR.glob("*.py"), Path(__file__)])
+
+
+def ocr_page_texts(ocr_path: Path) -> list[dict]:
+    """Page texts for an OCR file, from the open pack when it holds the document."""
+    doc_id = Path(ocr_path).stem
+    if _ocr_pack is not None and doc_id in _ocr_pack:
+        return _ocr_pack.page_texts(doc_id)
+    return load_page_texts(ocr_path)
+
 
 def extract_from_ocr_page(text: str, page_num: int) -> dict | None:
     """Run the extraction cascade on a single page of OCR text.
@@ -36,8 +106,7 @@ def extract_from_ocr_page(text: str, page_num: int) -> dict | None:
     Mirrors the logic in AddressExtractor.extract_from_ocr_json() and
     extraction_service.py but without database or file I/O.
     """
-    # Use a throwaway in-memory DB for the extractor
-    extractor = AddressExtractor(db_path=":memory:")
+    extractor = get_extractor()
     diagnostics = []
 
     result = None
@@ -73,6 +142,97 @@ def extract_from_ocr_page(text: str, page_num: int) -> dict | None:
     return result, diagnostics
 
 
+def cached_extract(text: str, page_num: int):
+    """extract_from_ocr_page(), served from the result cache when possible."""
+    if _cache is None:
+        return extract_from_ocr_page(text, page_num)
+    key = cache_key(text_hash(text), page_num, _cache_salt, RULESET_VERSION)
+    hit = _cache.get(key)
+    if hit is not MISS:
+        result, diagnostics = hit
+        return result, diagnostics
+    result, diagnostics = extract_from_ocr_page(text, page_num)
+    _cache.put(key, [result, diagnostics])
+    return result, diagnostics
+
+
+def to_address_page(result: dict, page_num: int) -> dict:
+    """Shape a flat cascade result like a page of a `.addresses/` file."""
+    return {
+        "page_number": page_num,
+        "patient": {
+            "full_name": result.get("full_name"),
+            "date_of_birth": result.get("date_of_birth"),
+            "phones": {
+                "home": result.get("phone_home"),
+                "work": result.get("phone_work"),
+                "mobile": result.get("phone_mobile"),
+            },
+            "mrn": result.get("mrn"),
+        },
+        "address": {
+            "line_1": result.get("address_line_1"),
+            "line_2": result.get("address_line_2"),
+            "city": result.get("city"),
+            "county": result.get("county"),
+            "postcode": result.get("postcode"),
+            "postcode_valid": None,
+            "postcode_district": None,
+        },
+        # NHS lookup lives in extraction_service.py, not the cascade
+        "gp": {
+            "name": result.get("gp_name"),
+            "practice": result.get("gp_practice"),
+            "address": result.get("gp_address"),
+            "postcode": result.get("gp_postcode"),
+            "ods_code": None,
+            "official_name": None,
+            "nhs_candidates": None,
+        },
+        "extraction": {
+            "method": result.get("extraction_method"),
+            "confidence": result.get("confidence"),
+        },
+        "address_type": "patient",
+        "is_prime": None,
+        "specialist_name": None,
+    }
+
+
+def extract_document(ocr_path: Path) -> dict:
+    """Run the cascade over every page of an OCR file.
+
+    Returns the document in `.addresses/` form, one page per page that
+    produced a result.
+    """
+    pages = []
+    for ocr_page in ocr_page_texts(ocr_path):
+        page_num = ocr_page.get("pageNumber", 1)
+        result, _ = cached_extract(ocr_page.get("text", ""), page_num)
+        if result:
+            pages.append(to_address_page(result, page_num))
+    return {
+        "schema_version": 1,
+        "document_id": Path(ocr_path).stem,
+        "page_count": len(pages),
+        "pages": pages,
+    }
+
+
+def timed_extract_document(ocr_path: str) -> tuple[bytes | None, float]:
+    """extract_document() for a process pool: (JSON bytes or None, seconds).
+
+    The time is measured in the worker, so it excludes pool queueing.
+    """
+    started = time.perf_counter()
+    try:
+        doc = extract_document(Path(ocr_path))
+    except (OSError, ValueError):
+        return None, time.perf_counter() - started
+    elapsed = time.perf_counter() - started
+    return json.dumps(doc).encode("utf-8"), elapsed
+
+
 def compare_fields(expected_page: dict, actual: dict | None, verbose: bool = False) -> list[str]:
     """Compare expected address fields against actual extraction result.
 
@@ -144,27 +304,39 @@ def compare_fields(expected_page: dict, actual: dict | None, verbose: bool = Fal
 
 def validate_document(doc_id: str, verbose: bool = False) -> tuple[int, int, list[str]]:
     """Validate a single document. Returns (pages_passed, pages_total, issues)."""
+    try:
+        return _validate_document(doc_id, verbose)
+    finally:
+        # Pool workers exit without running atexit, so record hits per document
+        if _cache is not None:
+            _cache.flush()
+
+
+def _validate_document(doc_id: str, verbose: bool) -> tuple[int, int, list[str]]:
     ocr_path = INPUT_DIR / f"{doc_id}.json"
+    if not ocr_path.exists():
+        # A corpus converted with ocr_columnar.py
+        ocr_path = INPUT_DIR / f"{doc_id}{OCR_COLUMNAR_SUFFIX}"
     expected_path = EXPECTED_DIR / f"{doc_id}.json"
 
-    if not ocr_path.exists():
+    in_pack = _ocr_pack is not None and doc_id in _ocr_pack
+    if not in_pack and not ocr_path.exists():
         return 0, 0, [f"{doc_id}: OCR input file missing"]
     if not expected_path.exists():
         return 0, 0, [f"{doc_id}: expected address file missing"]
 
-    with open(ocr_path) as f:
-        ocr_data = json.load(f)
+    # Only page text is needed, so skip decoding the block/line/word tree
+    ocr_pages = ocr_page_texts(ocr_path)
     with open(expected_path) as f:
         expected_data = json.load(f)
 
     expected_pages = expected_data.get("pages", [])
-    ocr_pages = ocr_data.get("pages", [])
 
     if not expected_pages:
         # Empty document — just check extraction produces nothing
         for ocr_page in ocr_pages:
             text = ocr_page.get("text", "")
-            result, _ = extract_from_ocr_page(text, ocr_page.get("pageNumber", 1))
+            result, _ = cached_extract(text, ocr_page.get("pageNumber", 1))
             if result:
                 return 0, 1, [f"{doc_id}: expected no extraction but got result"]
         return 1, 1, []
@@ -188,7 +360,7 @@ def validate_document(doc_id: str, verbose: bool = False) -> tuple[int, int, lis
             continue
 
         text = ocr_page.get("text", "")
-        result, diagnostics = extract_from_ocr_page(text, page_num)
+        result, diagnostics = cached_extract(text, page_num)
 
         issues = compare_fields(exp_page, result, verbose=verbose)
 
@@ -204,12 +376,54 @@ def validate_document(doc_id: str, verbose: bool = False) -> tuple[int, int, lis
     return pages_passed, pages_total, all_issues
 
 
+def validate_documents(doc_ids: list[str], verbose: bool = False, jobs: int = 1,
+                       cache_path: Path | None = None, ocr_pack: Path | None = None):
+    """Yield validate_document() results for doc_ids, in doc_ids order.
+
+    With jobs > 1 documents are spread over a process pool. Results are
+    streamed back as they complete but yielded in submission order, so the
+    report is identical to a serial run.
+    """
+    if jobs <= 1 or len(doc_ids) <= 1:
+        init_worker(cache_path, ocr_pack=ocr_pack)
+        for doc_id in doc_ids:
+            yield validate_document(doc_id, verbose=verbose)
+        return
+
+    # Small chunks keep workers busy when document sizes vary widely
+    chunksize = max(1, len(doc_ids) // (jobs * 8))
+    with ProcessPoolExecutor(
+        max_workers=jobs, initializer=init_worker,
+        initargs=(cache_path, DEFAULT_MAX_BYTES, ocr_pack),
+    ) as pool:
+        yield from pool.map(
+            partial(validate_document, verbose=verbose), doc_ids, chunksize=chunksize
+        )
+
+
 def main():
     parser = argparse.ArgumentParser(description="Validate extraction against fixtures")
     parser.add_argument("--verbose", "-v", action="store_true", help="Show detailed diagnostics")
     parser.add_argument("--doc", type=str, help="Validate a single document by ID")
+    parser.add_argument(
+        "--jobs", "-j", type=int, default=1,
+        help="Worker processes (0 = one per CPU, default: 1 = serial)",
+    )
+    parser.add_argument(
+        "--cache", type=Path, default=DEFAULT_CACHE_PATH,
+        help=f"Page result cache (default: {DEFAULT_CACHE_PATH})",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Re-extract every page")
+    parser.add_argument(
+        "--ocr-pack", type=Path,
+        help="Read OCR input from this pack (see ocr_pack.py) instead of input_ocr/",
+    )
     args = parser.parse_args()
 
+    cache_path = None if args.no_cache else args.cache
+
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+
     if args.doc:
         doc_ids = [args.doc]
     else:
@@ -247,8 +461,10 @@ def main():
     all_issues = []
     divergences_hit = []
 
-    for doc_id in doc_ids:
-        pp, pt, issues = validate_document(doc_id, verbose=args.verbose)
+    for pp, pt, issues in validate_documents(
+        doc_ids, verbose=args.verbose, jobs=jobs, cache_path=cache_path,
+        ocr_pack=args.ocr_pack,
+    ):
         total_docs += 1
         total_pages += pt
         pages_passed += pp